@@ -0,0 +1,212 @@
+"""
+One interface for every speech-to-text model in this folder.
+
+The scripts each load and call their model differently (mlx_whisper through
+whisper/model_registry.py, a transformers pipeline in distil-whisper/demo.py,
+parakeet_mlx.from_pretrained, Whisper + pyannote for diarization) and return
+different formats. The adapters below expose the same two calls:
+
+    backend = create_backend("whisper:large-v3-turbo")
+    backend.load()
+    transcript = backend.transcribe(audio)   # float32 16 kHz array or file path
+    for segment in transcript.segments:
+        print(segment.start, segment.end, segment.speaker, segment.text)
+
+Backend specs are "<adapter>[:<model>]":
+- "whisper:<name>": model_registry models, mlx on Apple Silicon, faster-whisper on CPU
+- "distil-whisper[:<hf id>]": transformers pipeline (CPU by default)
+- "parakeet[:<hf id>]": parakeet-mlx (Apple Silicon)
+- "whisper-diarized:<name>": Whisper + pyannote, one speaker per segment ($HF_TOKEN)
+- "fake": Whisper adapter on the fake backend, no model
+
+Installation (only what the backends you use need):
+$ uv add numpy faster-whisper transformers torch parakeet-mlx pyannote.audio
+"""
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+# Shared helpers live next to the Whisper scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent / "whisper"))
+from audio_io import SAMPLE_RATE
+from audio_stream import open_audio
+
+Audio = Union[str, np.ndarray]
+
+
+@dataclass
+class Segment:
+    start: float
+    end: float
+    text: str
+    speaker: Optional[str] = None
+
+
+@dataclass
+class Transcript:
+    segments: List[Segment]
+    language: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        return " ".join(s.text.strip() for s in self.segments if s.text.strip())
+
+
+def load_audio(path: str) -> np.ndarray:
+    """Decodes a file to float32 16 kHz mono (ffmpeg, or WAV without it)"""
+    with open_audio(path) as source:
+        chunks = [chunk for _, chunk in source.chunks(60)]
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+
+def whisper_segments(result: dict) -> List[Segment]:
+    """Segments of an mlx_whisper-format result"""
+    return [Segment(s["start"], s["end"], s["text"].strip()) for s in result.get("segments", [])]
+
+
+class ASRBackend:
+    """Interface of an adapter: load() once, then transcribe() any number of times"""
+    name = "base"
+
+    def __init__(self, model: Optional[str] = None, language: Optional[str] = "fr"):
+        self.model = model
+        self.language = language
+        self.load_seconds: Optional[float] = None
+
+    def load(self):
+        """Loads the model (timed in load_seconds)"""
+        start = time.perf_counter()
+        self._load()
+        self.load_seconds = time.perf_counter() - start
+
+    def _load(self):
+        raise NotImplementedError
+
+    def transcribe(self, audio: Audio) -> Transcript:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{self.name}:{self.model}" if self.model else self.name
+
+
+class WhisperBackend(ASRBackend):
+    """Whisper through the shared ModelCache (whisper/model_registry.py)"""
+    name = "whisper"
+
+    def __init__(self, model: Optional[str] = "base", language: Optional[str] = "fr",
+                 speech_backend: Optional[str] = None, **backend_options):
+        super().__init__(model or "base", language)
+        self.speech_backend = speech_backend
+        self.backend_options = backend_options
+
+    def _load(self):
+        from model_registry import get_model_cache, resolve_model
+        self.model = resolve_model(self.model)
+        self.cache = get_model_cache(self.speech_backend, **self.backend_options)
+        self.cache.warmup([self.model])
+
+    def transcribe(self, audio):
+        if isinstance(audio, str):
+            audio = load_audio(audio)
+        result = self.cache.transcribe(self.model, audio, language=self.language)
+        return Transcript(whisper_segments(result), result.get("language"))
+
+
+class DistilWhisperBackend(ASRBackend):
+    """distil-whisper with the transformers pipeline of distil-whisper/demo.py"""
+    name = "distil-whisper"
+    LANGUAGES = {"fr": "french", "en": "english"}
+
+    def __init__(self, model: Optional[str] = None, language: Optional[str] = "fr", device: str = "cpu"):
+        super().__init__(model or "distil-whisper/distil-large-v3", language)
+        self.device = device
+
+    def _load(self):
+        from transformers import pipeline
+        self.pipeline = pipeline("automatic-speech-recognition", model=self.model, device=self.device)
+
+    def transcribe(self, audio):
+        if isinstance(audio, str):
+            audio = load_audio(audio)
+        kwargs = {}
+        if self.language:
+            kwargs["language"] = self.LANGUAGES.get(self.language, self.language)
+        output = self.pipeline({"raw": audio, "sampling_rate": SAMPLE_RATE}, return_timestamps=True,
+                               chunk_length_s=30, generate_kwargs=kwargs)
+        segments = []
+        for chunk in output.get("chunks", []):
+            start, end = chunk["timestamp"]
+            segments.append(Segment(start or 0.0, end if end is not None else start or 0.0, chunk["text"].strip()))
+        if not segments:
+            segments = [Segment(0.0, len(audio) / SAMPLE_RATE, output["text"].strip())]
+        return Transcript(segments, self.language)
+
+
+class ParakeetBackend(ASRBackend):
+    """parakeet-mlx (the model picks the language itself)"""
+    name = "parakeet"
+
+    def __init__(self, model: Optional[str] = None, language: Optional[str] = None):
+        super().__init__(model or "mlx-community/parakeet-tdt-0.6b-v3", language)
+
+    def _load(self):
+        from parakeet_mlx import from_pretrained
+        self.parakeet = from_pretrained(self.model)
+
+    def transcribe(self, audio):
+        if isinstance(audio, str):
+            result = self.parakeet.transcribe(audio)
+        else:
+            import mlx.core as mx
+            from parakeet_mlx.audio import get_logmel
+            result = self.parakeet.generate(get_logmel(mx.array(audio), self.parakeet.preprocessor_config))[0]
+        return Transcript([Segment(s.start, s.end, s.text.strip()) for s in result.sentences], self.language)
+
+
+class DiarizedWhisperBackend(WhisperBackend):
+    """Whisper + pyannote, merged like transcribe-with-diarization.py"""
+    name = "whisper-diarized"
+
+    def _load(self):
+        super()._load()
+        from pyannote.audio import Pipeline
+        token = os.getenv("HF_TOKEN")
+        if not token:
+            raise RuntimeError("HF_TOKEN is required for pyannote, see transcribe-with-diarization.py")
+        self.pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization-3.0", token=token)
+
+    def transcribe(self, audio):
+        import torch
+        from speaker_index import SpeakerIndex, split_by_speaker
+
+        if isinstance(audio, str):
+            audio = load_audio(audio)
+        result = self.cache.transcribe(self.model, audio, language=self.language, word_timestamps=True)
+        diarization = self.pipeline({"waveform": torch.from_numpy(audio).unsqueeze(0), "sample_rate": SAMPLE_RATE})
+        annotation = getattr(diarization, "speaker_diarization", diarization)
+        runs = split_by_speaker(result["segments"], SpeakerIndex.from_pyannote(annotation))
+        return Transcript([Segment(r["start"], r["end"], r["text"], r["speaker"]) for r in runs],
+                          result.get("language"))
+
+
+ADAPTERS: Dict[str, type] = {
+    "whisper": WhisperBackend,
+    "distil-whisper": DistilWhisperBackend,
+    "parakeet": ParakeetBackend,
+    "whisper-diarized": DiarizedWhisperBackend,
+}
+
+
+def create_backend(spec: str, **options) -> ASRBackend:
+    """Backend from a "<adapter>[:<model>]" spec, see the module docstring"""
+    if spec == "fake":
+        return WhisperBackend("base", speech_backend="fake", **options)
+    name, _, model = spec.partition(":")
+    if name not in ADAPTERS:
+        raise ValueError(f"Unknown backend '{name}', expected one of {', '.join(ADAPTERS)} or fake")
+    return ADAPTERS[name](model or None, **options)
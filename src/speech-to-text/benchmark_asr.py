@@ -0,0 +1,157 @@
+"""
+ASR benchmark: WER, real-time factor, peak memory and load time per backend.
+
+Fixtures are audio files with a reference transcript next to them, same name
+with a .txt extension (fixtures/interview.mp3 + fixtures/interview.txt). Each
+backend (see asr_backends.py) runs in its own subprocess: it loads the model,
+then transcribes every fixture (already decoded, so the RTF is the model's
+alone). The peak RSS of that process is sampled from here. Backends whose
+dependencies are missing are skipped.
+
+WER is computed on words lowercased and stripped of punctuation, over all the
+fixtures at once (total edits / total reference words).
+
+Without a fixtures directory, a synthetic one is written (tones, empty
+references): enough to check the harness runs, not to compare WER.
+
+Installation:
+$ uv add numpy psutil faster-whisper transformers torch
+
+Usage:
+$ uv run benchmark_asr.py --fixtures fixtures --backends whisper:base,whisper:small,distil-whisper
+$ uv run benchmark_asr.py --backends fake   # anywhere, no model
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from asr_backends import SAMPLE_RATE, create_backend, load_audio
+from process_monitor import run_and_sample_rss  # whisper/, on the path through asr_backends
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac", ".ogg"}
+DEFAULT_BACKENDS = "whisper:base,distil-whisper,parakeet"
+
+
+# ============================================================
+# WER
+# ============================================================
+
+def normalize(text: str) -> List[str]:
+    """Lowercase words without punctuation (accents and apostrophes kept)"""
+    return re.sub(r"[^\w\s']", " ", text.lower()).replace("'", "' ").split()
+
+
+def word_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """(substitutions + deletions + insertions, reference words)"""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1], len(ref)
+
+
+# ============================================================
+# FIXTURES
+# ============================================================
+
+def find_fixtures(directory: str) -> List[Tuple[str, str]]:
+    """(audio path, reference text) of every audio file with a .txt reference"""
+    fixtures = []
+    for path in sorted(Path(directory).iterdir()):
+        reference = path.with_suffix(".txt")
+        if path.suffix.lower() in AUDIO_EXTENSIONS and reference.exists():
+            fixtures.append((str(path), reference.read_text(encoding="utf-8").strip()))
+    return fixtures
+
+
+def write_synthetic_fixtures(directory: str, count: int = 3, seconds: float = 10):
+    import numpy as np
+    from audio_io import write_wav
+
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    for i in range(count):
+        tone = (np.sin(2 * np.pi * (220 + 110 * i) * t) * 8000).astype(np.int16)
+        write_wav(os.path.join(directory, f"tone_{i}.wav"), tone)
+        Path(directory, f"tone_{i}.txt").write_text("", encoding="utf-8")
+
+
+# ============================================================
+# RUN
+# ============================================================
+
+def run_backend(spec: str, paths: List[str], language: str) -> dict:
+    """Runs in the child process, prints its results as JSON"""
+    backend = create_backend(spec, language=language)
+    backend.load()
+    audio_seconds = transcribe_seconds = 0.0
+    hypotheses = []
+    for path in paths:
+        audio = load_audio(path)
+        start = time.perf_counter()
+        hypotheses.append(backend.transcribe(audio).text)
+        transcribe_seconds += time.perf_counter() - start
+        audio_seconds += len(audio) / SAMPLE_RATE
+    return {"load_seconds": backend.load_seconds, "audio_seconds": audio_seconds,
+            "transcribe_seconds": transcribe_seconds, "hypotheses": hypotheses}
+
+
+def measure(spec: str, paths: List[str], language: str) -> dict:
+    """Runs one backend in a subprocess and samples its peak RSS"""
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", spec, "--language", language, "--files", *paths]
+    run = run_and_sample_rss(cmd)
+    if run.returncode:
+        raise RuntimeError(run.last_error())
+    return {**json.loads(run.output.strip().splitlines()[-1]), "peak_mb": run.peak_mb}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR backend benchmark")
+    parser.add_argument("--fixtures", help="Directory of audio files with .txt references")
+    parser.add_argument("--backends", default=DEFAULT_BACKENDS, help="Comma-separated backend specs")
+    parser.add_argument("--language", default="fr")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--files", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.files, args.language)))
+        return
+
+    directory = args.fixtures
+    if directory is None:
+        directory = tempfile.mkdtemp()
+        print(f"🎧 No fixtures given, writing synthetic ones to {directory} (WER not meaningful)")
+        write_synthetic_fixtures(directory)
+    fixtures = find_fixtures(directory)
+    if not fixtures:
+        sys.exit(f"❌ No audio file with a .txt reference in {directory}")
+    paths = [path for path, _ in fixtures]
+    print(f"🎧 {len(fixtures)} fixtures\n")
+
+    for spec in args.backends.split(","):
+        try:
+            result = measure(spec, paths, args.language)
+        except RuntimeError as e:
+            print(f"⏭️  {spec:28s} skipped: {e}")
+            continue
+        errors = words = 0
+        for (_, reference), hypothesis in zip(fixtures, result["hypotheses"]):
+            e, n = word_errors(reference, hypothesis)
+            errors, words = errors + e, words + n
+        wer = f"{errors / words * 100:5.1f}%" if words else "    -"
+        rtf = result["transcribe_seconds"] / result["audio_seconds"] if result["audio_seconds"] else 0
+        print(f"📊 {spec:28s} WER {wer} | RTF {rtf:6.3f} | load {result['load_seconds']:6.1f}s | "
+              f"peak RSS {result['peak_mb']:6.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
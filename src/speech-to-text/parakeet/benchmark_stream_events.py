@@ -0,0 +1,62 @@
+"""
+Streaming output benchmark: full text per chunk vs incremental events.
+
+Streams an hour of synthetic audio (one-second chunks) through the fake
+parakeet streaming context from stream_events.py, and compares what a consumer
+has to handle per chunk:
+- "full": the original loop, reading `transcriber.result.text` after every chunk
+- "delta": StreamEvents, only the newly finalized tokens and the changed draft
+
+Reported: consumer-side processing time and characters received, in total and
+for the last minute of the stream (where "full" is the slowest).
+
+Installation:
+$ uv add numpy
+
+Usage:
+$ uv run benchmark_stream_events.py --minutes 60
+"""
+import argparse
+import time
+
+import numpy as np
+
+from stream_events import FakeParakeet, StreamEvents
+
+
+def run(mode: str, chunks: int, chunk: np.ndarray):
+    model = FakeParakeet(compute_ratio=0)  # No model time: only the output handling differs
+    times, sizes = [], []
+    with model.transcribe_stream() as transcriber:
+        stream = StreamEvents(transcriber)
+        for _ in range(chunks):
+            start = time.perf_counter()
+            if mode == "full":
+                transcriber.add_audio(chunk)
+                received = transcriber.result.text
+            else:
+                delta = stream.add_audio(chunk)
+                received = "".join(t.text for t in delta.final)
+                if delta.draft is not None:
+                    received += "".join(t.text for t in delta.draft)
+            times.append(time.perf_counter() - start)
+            sizes.append(len(received))
+    return np.array(times), np.array(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming output benchmark")
+    parser.add_argument("--minutes", type=float, default=60)
+    args = parser.parse_args()
+
+    chunks = int(args.minutes * 60)
+    chunk = np.zeros(16000, dtype=np.float32)
+    print(f"🎧 {args.minutes:.0f} min stream, {chunks} one-second chunks\n")
+    for mode in ("full", "delta"):
+        times, sizes = run(mode, chunks, chunk)
+        print(f"📊 {mode:5s} total {times.sum() * 1000:8.1f} ms, {sizes.sum() / 1e6:7.2f} M chars | "
+              f"last minute {times[-60:].mean() * 1e6:7.1f} µs/chunk, {sizes[-60:].mean():8.0f} chars/chunk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Adaptive chunk size for long parakeet transcriptions.
+
+transcribe_audio() used to catch `metal::malloc` errors and print a suggestion
+to halve chunk_duration by hand, then start the file over. ChunkController
+picks the largest chunk that fits a memory budget, and when a chunk still runs
+out of memory it shrinks the size and retries that same chunk: the audio
+already transcribed is kept. Sizes, retries and throughput of every chunk are
+recorded.
+
+The budget comes from `memory_budget_mb`, else $PARAKEET_MEMORY_BUDGET_MB,
+else half of the available memory (psutil).
+
+Installation:
+$ uv add numpy psutil
+
+Usage:
+    controller = ChunkController(memory_budget_mb=4096)
+    for offset, result in adaptive_windows(source, transcribe, controller, overlap_seconds=2):
+        ...
+    print(controller.summary())
+"""
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Shared helpers live next to the Whisper scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "whisper"))
+from audio_io import pcm16_to_float32
+
+# Rough peak memory per second of chunk for parakeet-tdt-0.6b, refined by failures
+MB_PER_SECOND = 20
+
+
+def is_memory_error(error: BaseException) -> bool:
+    return isinstance(error, MemoryError) or "metal::malloc" in str(error)
+
+
+def default_budget_mb() -> float:
+    env = os.getenv("PARAKEET_MEMORY_BUDGET_MB")
+    if env:
+        return float(env)
+    import psutil
+    return psutil.virtual_memory().available / 1024 / 1024 / 2
+
+
+@dataclass
+class ChunkRecord:
+    """One attempt at transcribing a chunk"""
+    offset: float
+    seconds: float
+    elapsed: float
+    ok: bool
+
+
+@dataclass
+class ChunkController:
+    """
+    Args:
+        memory_budget_mb: Memory the chunks may use (see the module docstring)
+        mb_per_second: Estimated memory per second of chunk
+        max_seconds: Largest chunk ever used
+        min_seconds: Smallest chunk, a failure at this size is raised
+        shrink: Factor applied to the size after an out-of-memory error
+        grow_after: Successful chunks before trying a larger size again
+    """
+    memory_budget_mb: Optional[float] = None
+    mb_per_second: float = MB_PER_SECOND
+    max_seconds: float = 300
+    min_seconds: float = 10
+    shrink: float = 0.5
+    grow_after: int = 5
+    records: List[ChunkRecord] = field(default_factory=list)
+
+    def __post_init__(self):
+        if self.memory_budget_mb is None:
+            self.memory_budget_mb = default_budget_mb()
+        self.ceiling = self.max_seconds  # Smallest size that failed so far
+        self.chunk_seconds = self._fitting()
+        self._successes = 0
+
+    def _fitting(self) -> float:
+        """Largest size allowed by the budget and the failures"""
+        size = min(self.memory_budget_mb / self.mb_per_second, self.max_seconds, self.ceiling)
+        return max(self.min_seconds, size)
+
+    def succeeded(self, offset: float, seconds: float, elapsed: float):
+        self.records.append(ChunkRecord(offset, seconds, elapsed, True))
+        self._successes += 1
+        if self._successes >= self.grow_after and self.chunk_seconds < self._fitting():
+            # Try a bit larger, staying under the size that failed
+            self.chunk_seconds = min(self.chunk_seconds * 1.25, self._fitting())
+            self._successes = 0
+
+    def failed(self, offset: float, seconds: float, elapsed: float, error: BaseException):
+        """Shrinks the chunk size, or raises `error` if it can't shrink any more"""
+        self.records.append(ChunkRecord(offset, seconds, elapsed, False))
+        self._successes = 0
+        if seconds <= self.min_seconds:
+            raise error
+        # Whatever the estimate said, this much audio does not fit
+        self.ceiling = min(self.ceiling, seconds * 0.9)
+        self.mb_per_second = max(self.mb_per_second, self.memory_budget_mb / seconds)
+        self.chunk_seconds = max(self.min_seconds, seconds * self.shrink)
+        print(f"⚠️  Out of memory on a {seconds:.0f}s chunk at {offset:.0f}s, "
+              f"retrying with {self.chunk_seconds:.0f}s")
+
+    @property
+    def sizes(self) -> List[float]:
+        return [r.seconds for r in self.records if r.ok]
+
+    @property
+    def throughput(self) -> float:
+        """Seconds of audio transcribed per second of processing"""
+        done = [r for r in self.records if r.ok]
+        elapsed = sum(r.elapsed for r in self.records)
+        return sum(r.seconds for r in done) / elapsed if elapsed else 0
+
+    def summary(self) -> str:
+        sizes = self.sizes
+        retries = sum(not r.ok for r in self.records)
+        if not sizes:
+            return f"no chunk transcribed, {retries} out-of-memory retries"
+        return (f"{len(sizes)} chunks of {min(sizes):.0f}-{max(sizes):.0f}s "
+                f"(budget {self.memory_budget_mb:.0f} MB), {retries} out-of-memory retries, "
+                f"{self.throughput:.1f}x real time")
+
+
+def adaptive_windows(source, process: Callable[[float, np.ndarray], object], controller: ChunkController,
+                     overlap_seconds: float = 0) -> Iterator[Tuple[float, object]]:
+    """
+    Reads `source` (audio_stream.AudioSource) in chunks sized by `controller`,
+    each starting `overlap_seconds` before the end of the previous one, and
+    yields (offset, process(offset, float32 chunk)). A chunk that runs out of
+    memory is retried at the smaller size from the same offset.
+    """
+    if overlap_seconds * 2 > controller.min_seconds:
+        raise ValueError("The overlap must be shorter than half the minimum chunk")
+    rate = source.rate
+    overlap = int(overlap_seconds * rate)
+    buffer = np.empty(0, dtype=np.int16)
+    start = source.samples_read  # First sample of the buffer
+    exhausted = False
+
+    while True:
+        size = int(controller.chunk_seconds * rate)
+        if len(buffer) < size and not exhausted:
+            new = source.read(size - len(buffer))
+            exhausted = len(new) < size - len(buffer)
+            buffer = np.concatenate([buffer, new])
+        if len(buffer) <= (overlap if start else 0):
+            return  # Only the overlap already transcribed is left
+
+        chunk = buffer[:size]
+        offset, seconds = start / rate, len(chunk) / rate
+        began = time.perf_counter()
+        try:
+            result = process(offset, pcm16_to_float32(chunk))
+        except Exception as e:
+            if not is_memory_error(e):
+                raise
+            controller.failed(offset, seconds, time.perf_counter() - began, e)
+            continue
+        controller.succeeded(offset, seconds, time.perf_counter() - began)
+        yield offset, result
+
+        if exhausted and len(chunk) == len(buffer):
+            return
+        buffer = buffer[len(chunk) - overlap:]
+        start += len(chunk) - overlap
@@ -0,0 +1,94 @@
+"""
+Load test for streaming_server.py: per-client latency as concurrency grows.
+
+Each simulated client streams synthetic audio in real time (one chunk every
+`chunk_seconds`) and measures the time between sending a chunk and receiving
+its delta event. Concurrency levels run one after the other; p50 / p95 / max
+latencies and the share of chunks answered within the chunk duration (i.e.
+keeping up with real time) are reported for each.
+
+By default a fake-model server is started in this process; pass --url to test
+a running server (e.g. the real model).
+
+Installation:
+$ uv add websockets numpy
+
+Usage:
+$ uv run load_test_streaming.py --clients 1,2,4,8,16 --seconds 20
+$ uv run load_test_streaming.py --url ws://localhost:8765 --clients 1,2,4
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+import websockets
+
+from streaming_server import StreamingServer, load_model
+
+SAMPLE_RATE = 16000
+
+
+async def run_client(url: str, seconds: float, chunk_seconds: float, latencies: list):
+    rng = np.random.default_rng()
+    chunk = (rng.standard_normal(int(chunk_seconds * SAMPLE_RATE)) * 3000).astype(np.int16).tobytes()
+    sent_at = {}
+    async with websockets.connect(url, max_size=2 ** 22) as websocket:
+        async def receive():
+            async for message in websocket:
+                event = json.loads(message)
+                if event["type"] == "delta":
+                    latencies.append(time.perf_counter() - sent_at.pop(event["chunk"]))
+                elif event["type"] == "done":
+                    return
+
+        receiver = asyncio.create_task(receive())
+        start = time.perf_counter()
+        for i in range(1, int(seconds / chunk_seconds) + 1):
+            # Real time pacing: chunk i is "recorded" at start + i * chunk_seconds
+            await asyncio.sleep(max(0.0, start + i * chunk_seconds - time.perf_counter()))
+            sent_at[i] = time.perf_counter()
+            await websocket.send(chunk)
+        await websocket.send(json.dumps({"type": "end"}))
+        await receiver
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Streaming server load test")
+    parser.add_argument("--url", help="Running server (default: start a fake-model server here)")
+    parser.add_argument("--clients", default="1,2,4,8,16", help="Concurrency levels")
+    parser.add_argument("--seconds", type=float, default=20, help="Audio streamed by each client")
+    parser.add_argument("--chunk-seconds", type=float, default=1.0)
+    parser.add_argument("--compute-ratio", type=float, default=0.05,
+                        help="Fake model processing time per second of audio")
+    args = parser.parse_args()
+
+    server_task = None
+    url = args.url
+    if url is None:
+        server = StreamingServer(load_model(fake=True, compute_ratio=args.compute_ratio))
+        server_task = asyncio.create_task(server.serve("localhost", 8765))
+        await asyncio.sleep(0.5)
+        url = "ws://localhost:8765"
+
+    print(f"🎧 {args.seconds:.0f}s per client, {args.chunk_seconds}s chunks\n")
+    for clients in [int(c) for c in args.clients.split(",")]:
+        latencies = []
+        await asyncio.gather(*(run_client(url, args.seconds, args.chunk_seconds, latencies)
+                               for _ in range(clients)))
+        on_time = sum(l <= args.chunk_seconds for l in latencies) / len(latencies) * 100
+        print(f"📊 {clients:3d} clients | latency p50 {percentile(latencies, 50) * 1000:7.1f} ms "
+              f"p95 {percentile(latencies, 95) * 1000:7.1f} ms max {max(latencies) * 1000:7.1f} ms | "
+              f"{on_time:5.1f}% within real time")
+
+    if server_task:
+        server_task.cancel()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
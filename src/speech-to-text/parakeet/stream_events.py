@@ -0,0 +1,182 @@
+"""
+Incremental events for parakeet streaming transcription.
+
+Reading `transcriber.result` after every chunk rebuilds and returns the whole
+text so far, so a consumer printing or diffing it does O(n) work per chunk and
+O(n²) over a session. StreamEvents wraps a transcribe_stream() context and
+turns each add_audio() into a Delta: the tokens finalized since the previous
+chunk (emitted exactly once) and the current draft tokens, only when they
+changed. Consumers use callbacks, the returned Delta, or an async iterator.
+
+FakeParakeet stands in for the model in benchmarks and load tests.
+
+Installation:
+$ uv add parakeet-mlx numpy
+
+Usage:
+    with model.transcribe_stream(context_size=(256, 256)) as transcriber:
+        stream = StreamEvents(transcriber, on_final=lambda tokens: print(...))
+        for chunk in chunks:
+            stream.add_audio(chunk)
+        print(stream.text)
+"""
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import AsyncIterator, Callable, List, Optional
+
+
+@dataclass(frozen=True)
+class Token:
+    """A timestamped token, in seconds from the start of the stream"""
+    text: str
+    start: float
+    end: float
+
+    @classmethod
+    def from_parakeet(cls, token) -> "Token":
+        return cls(token.text, round(token.start, 3), round(token.end, 3))
+
+    def to_dict(self) -> dict:
+        return {"text": self.text, "start": self.start, "end": self.end}
+
+
+@dataclass
+class Delta:
+    """What changed after one chunk"""
+    chunk: int
+    final: List[Token]
+    draft: Optional[List[Token]]  # None when the draft did not change
+
+    def to_dict(self) -> dict:
+        event = {"type": "delta", "chunk": self.chunk, "final": [t.to_dict() for t in self.final]}
+        if self.draft is not None:
+            event["draft"] = [t.to_dict() for t in self.draft]
+        return event
+
+
+class StreamEvents:
+    """
+    Args:
+        transcriber: Entered parakeet transcribe_stream() context
+        on_final: Called with the newly finalized tokens (only when there are some)
+        on_draft: Called with the draft tokens when they change
+    """
+
+    def __init__(self, transcriber, on_final: Optional[Callable[[List[Token]], None]] = None,
+                 on_draft: Optional[Callable[[List[Token]], None]] = None):
+        self.transcriber = transcriber
+        self.on_final = on_final
+        self.on_draft = on_draft
+        self.chunks = 0
+        self._final_parts: List[str] = []
+        self._sent_final = 0
+        self._draft_key = ()
+
+    def add_audio(self, audio) -> Delta:
+        self.transcriber.add_audio(audio)
+        return self._delta()
+
+    def _delta(self) -> Delta:
+        self.chunks += 1
+        finalized = self.transcriber.finalized_tokens
+        final = [Token.from_parakeet(t) for t in finalized[self._sent_final:]]
+        self._sent_final = len(finalized)
+        self._final_parts.extend(t.text for t in final)
+
+        # The draft only covers the right context: comparing it is cheap
+        raw_draft = self.transcriber.draft_tokens
+        key = tuple((t.text, t.start) for t in raw_draft)
+        draft = None
+        if key != self._draft_key:
+            self._draft_key = key
+            draft = [Token.from_parakeet(t) for t in raw_draft]
+
+        if final and self.on_final:
+            self.on_final(final)
+        if draft is not None and self.on_draft:
+            self.on_draft(draft)
+        return Delta(self.chunks, final, draft)
+
+    async def events(self, chunks: AsyncIterator, run=None) -> AsyncIterator[Delta]:
+        """
+        Yields a Delta for each chunk of the async iterator `chunks`.
+        `run(fn, *args)` may move the model call off the event loop
+        (e.g. StreamingServer.run_model); by default it runs inline.
+        """
+        async for audio in chunks:
+            if run is None:
+                self.transcriber.add_audio(audio)
+            else:
+                await run(self.transcriber.add_audio, audio)
+            yield self._delta()
+
+    @property
+    def final_text(self) -> str:
+        return "".join(self._final_parts).strip()
+
+    @property
+    def text(self) -> str:
+        """Finalized text followed by the current draft"""
+        draft = "".join(text for text, _ in self._draft_key)
+        return ("".join(self._final_parts) + draft).strip()
+
+
+# ============================================================
+# FAKE MODEL
+# ============================================================
+
+class FakeStreamingTranscriber:
+    """
+    Mimics parakeet's streaming context: one token every `token_seconds`,
+    tokens in the last `draft_seconds` of audio stay drafts. Each add_audio()
+    costs `compute_ratio` x the chunk duration.
+    """
+
+    def __init__(self, sample_rate=16000, token_seconds=0.4, draft_seconds=2.0, compute_ratio=0.01):
+        self.sample_rate = sample_rate
+        self.token_seconds = token_seconds
+        self.draft_seconds = draft_seconds
+        self.compute_ratio = compute_ratio
+        self.duration = 0.0
+        self.finalized_tokens = []
+        self.draft_tokens = []
+
+    def add_audio(self, audio):
+        seconds = len(audio) / self.sample_rate
+        if self.compute_ratio:
+            time.sleep(seconds * self.compute_ratio)
+        self.duration += seconds
+        n_tokens = int(self.duration / self.token_seconds)
+        n_final = int(max(0.0, self.duration - self.draft_seconds) / self.token_seconds)
+        for i in range(len(self.finalized_tokens), n_final):
+            self.finalized_tokens.append(self._token(i))
+        self.draft_tokens = [self._token(i) for i in range(n_final, n_tokens)]
+
+    def _token(self, i):
+        start = i * self.token_seconds
+        return SimpleNamespace(id=i, text=f" w{i}", start=start, duration=self.token_seconds,
+                               end=start + self.token_seconds)
+
+    @property
+    def result(self):
+        # Like parakeet, rebuilt from every token on each access
+        tokens = self.finalized_tokens + self.draft_tokens
+        return SimpleNamespace(text="".join(t.text for t in tokens).strip())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class FakeParakeet:
+    """Stand-in for the parakeet model in benchmarks and load tests"""
+
+    def __init__(self, **options):
+        self.preprocessor_config = SimpleNamespace(sample_rate=16000)
+        self.options = options
+
+    def transcribe_stream(self, context_size=(256, 256)):
+        return FakeStreamingTranscriber(**self.options)
@@ -0,0 +1,118 @@
+"""
+Real-time transcription server: parakeet transcribe_stream over WebSocket.
+
+Clients send 16 kHz mono int16 PCM as binary messages and {"type": "end"} as a
+text message when they are done. Each client gets its own transcribe_stream()
+context over one shared model. All model calls run on a single inference
+thread (MLX is not meant to be driven from several threads), while asyncio
+handles the connections.
+
+Instead of the whole accumulated text after every chunk, the server pushes
+only what changed, one event per audio message:
+    {"type": "delta", "chunk": 12, "final": [{"text", "start", "end"}, ...],
+     "draft": [...]}            # "draft" only when the draft tokens changed
+    {"type": "done", "text": "..."}   # after {"type": "end"}
+
+Installation:
+$ uv add parakeet-mlx websockets numpy
+
+Usage:
+$ uv run streaming_server.py --port 8765
+$ uv run streaming_server.py --fake   # no model, for load tests (see load_test_streaming.py)
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import websockets
+
+from stream_events import FakeParakeet, StreamEvents
+
+MODEL_REPO = "mlx-community/parakeet-tdt-0.6b-v3"
+
+
+# ============================================================
+# SERVER
+# ============================================================
+
+class StreamingServer:
+    """
+    Args:
+        model: Loaded parakeet model (or FakeParakeet)
+        context_size: (left, right) attention context of each stream, in frames
+    """
+
+    def __init__(self, model, context_size=(256, 256)):
+        self.model = model
+        self.context_size = context_size
+        self.sample_rate = model.preprocessor_config.sample_rate
+        # One thread owns the model: streams take turns chunk by chunk
+        self.inference = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self.clients = 0
+
+    async def run_model(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.inference, fn, *args)
+
+    async def handle(self, websocket):
+        self.clients += 1
+        context = await self.run_model(lambda: self.model.transcribe_stream(context_size=self.context_size))
+        stream = StreamEvents(await self.run_model(context.__enter__))
+        ended = False
+
+        async def audio_chunks():
+            nonlocal ended
+            async for message in websocket:
+                if isinstance(message, str):
+                    if json.loads(message).get("type") == "end":
+                        ended = True
+                        return
+                    continue
+                audio = np.frombuffer(message, dtype=np.int16).astype(np.float32) / 32768.0
+                yield self.to_model_input(audio)
+
+        try:
+            # Only the tokens finalized since the last event, and the draft if it changed
+            async for delta in stream.events(audio_chunks(), run=self.run_model):
+                await websocket.send(json.dumps(delta.to_dict()))
+            if ended:
+                await websocket.send(json.dumps({"type": "done", "text": stream.text}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            await self.run_model(context.__exit__, None, None, None)
+            self.clients -= 1
+
+    def to_model_input(self, audio: np.ndarray):
+        if isinstance(self.model, FakeParakeet):
+            return audio
+        import mlx.core as mx
+        return mx.array(audio)
+
+    async def serve(self, host: str = "localhost", port: int = 8765):
+        async with websockets.serve(self.handle, host, port, max_size=2 ** 22):
+            print(f"🎧 Listening on ws://{host}:{port}")
+            await asyncio.Future()
+
+
+def load_model(fake: bool = False, **fake_options):
+    if fake:
+        return FakeParakeet(**fake_options)
+    from parakeet_mlx import from_pretrained
+    print("Loading model...")
+    return from_pretrained(MODEL_REPO)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parakeet WebSocket streaming server")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fake", action="store_true", help="Fake model (no download, any platform)")
+    args = parser.parse_args()
+
+    server = StreamingServer(load_model(args.fake))
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n✅ Server stopped")
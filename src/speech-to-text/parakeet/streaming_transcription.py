@@ -1,29 +1,42 @@
 """
 See https://github.com/senstella/parakeet-mlx
 uv add parakeet-mlx -U
+
+Streams a file to parakeet one second at a time, printing only the new
+finalized text and the current draft after each chunk (stream_events.py)
+instead of the whole accumulated text.
 """
 from parakeet_mlx import from_pretrained
 from parakeet_mlx.audio import load_audio
 import numpy as np
 
+from stream_events import StreamEvents
+
 model = from_pretrained("mlx-community/parakeet-tdt-0.6b-v3")
 
+
+def print_final(tokens):
+    # Finalized tokens are emitted exactly once
+    print("".join(t.text for t in tokens), end="", flush=True)
+
+
+def print_draft(tokens):
+    # Draft tokens may still change with the next chunks
+    print(f"\n   draft [{tokens[0].start:.1f}s]: {''.join(t.text for t in tokens)}" if tokens else "")
+
+
 # Create a streaming context
 with model.transcribe_stream(
     context_size=(256, 256),  # (left_context, right_context) frames
 ) as transcriber:
+    stream = StreamEvents(transcriber, on_final=print_final, on_draft=print_draft)
+
     # Simulate real-time audio chunks
     audio_data = load_audio("audio_file.wav", model.preprocessor_config.sample_rate)
     chunk_size = model.preprocessor_config.sample_rate  # 1 second chunks
 
     for i in range(0, len(audio_data), chunk_size):
         chunk = audio_data[i:i+chunk_size]
-        transcriber.add_audio(chunk)
-
-        # Access current transcription
-        result = transcriber.result
-        print(f"Current text: {result.text}")
+        stream.add_audio(chunk)
 
-        # Access finalized and draft tokens
-        # transcriber.finalized_tokens
-        # transcriber.draft_tokens
\ No newline at end of file
+    print(f"\n\nFinal text: {stream.text}")
@@ -8,33 +8,117 @@ Usage:
 # Basic usage (saves in the same folder as the audio)
 transcribe_audio("/path/to/audio.mp3")
 
-# With custom chunk_duration to reduce memory usage
+# With a fixed maximum chunk_duration (default: largest size fitting in memory)
 transcribe_audio("/path/to/audio.mp3", chunk_duration=60.0)
 
 # With custom output directory
 transcribe_audio("/path/to/audio.mp3", output_dir="/path/to/output")
+
+The audio is streamed from ffmpeg in chunks (../whisper/audio_stream.py)
+instead of being loaded whole: the first text is printed after the first chunk
+and memory no longer grows with the file length. The chunk size is chosen by
+chunk_controller.py to fit the Metal memory budget; a chunk that still hits a
+`metal::malloc` error is retried at a smaller size without starting over.
+
+Results are kept in the transcription cache shared with the Whisper scripts
+(see ../whisper/transcription_cache.py): transcribing the same file again only
+reads the cached result, without even loading the model.
 """
+import sys
 from pathlib import Path
+
+import mlx.core as mx
 from parakeet_mlx import from_pretrained
+from parakeet_mlx.alignment import (merge_longest_common_subsequence, merge_longest_contiguous,
+                                    sentences_to_result, tokens_to_sentences)
+from parakeet_mlx.audio import get_logmel
+
+# Shared helpers live next to the Whisper scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "whisper"))
+from audio_stream import open_audio
+from chunk_controller import ChunkController, adaptive_windows
+from transcription_cache import get_transcription_cache
+
+MODEL_REPO = "mlx-community/parakeet-tdt-0.6b-v3"
+
+
+def result_to_dict(result) -> dict:
+    """Converts a parakeet AlignedResult to JSON (text, sentences and tokens with timestamps)"""
+    return {
+        "text": result.text,
+        "sentences": [
+            {
+                "text": sentence.text,
+                "start": sentence.start,
+                "end": sentence.end,
+                "tokens": [{"text": token.text, "start": token.start, "end": token.end}
+                           for token in sentence.tokens]
+            }
+            for sentence in result.sentences
+        ]
+    }
+
+
+def metal_budget_mb():
+    """Recommended Metal working set, None if unknown (the controller then uses psutil)"""
+    try:
+        return mx.metal.device_info()["max_recommended_working_set_size"] / 1024 / 1024
+    except Exception:
+        return None
 
 
-def transcribe_audio(audio_file_path: str, chunk_duration: float = 120.0, output_dir: str = None):
+def transcribe_streaming(model, audio_path, controller: ChunkController,
+                         overlap_duration: float = 10.0, on_chunk=None):
+    """
+    Same chunked decoding and token merge as model.transcribe(), but the chunks
+    come from an ffmpeg stream instead of a fully loaded waveform, sized (and
+    resized after out-of-memory errors) by `controller`.
+    `on_chunk(offset, text)` is called after each chunk.
+    """
+    sample_rate = model.preprocessor_config.sample_rate
+
+    def generate(offset, chunk):
+        mel = get_logmel(mx.array(chunk), model.preprocessor_config)
+        return model.generate(mel)[0]
+
+    all_tokens = []
+    with open_audio(str(audio_path), rate=sample_rate, buffer_seconds=controller.max_seconds) as source:
+        for offset, chunk_result in adaptive_windows(source, generate, controller, overlap_duration):
+            chunk_tokens = []
+            for sentence in chunk_result.sentences:
+                for token in sentence.tokens:
+                    token.start += offset
+                    token.end = token.start + token.duration
+                    chunk_tokens.append(token)
+
+            if all_tokens:
+                try:
+                    all_tokens = merge_longest_contiguous(all_tokens, chunk_tokens,
+                                                          overlap_duration=overlap_duration)
+                except RuntimeError:
+                    all_tokens = merge_longest_common_subsequence(all_tokens, chunk_tokens,
+                                                                  overlap_duration=overlap_duration)
+            else:
+                all_tokens = chunk_tokens
+            if on_chunk:
+                on_chunk(offset, chunk_result.text)
+
+    return sentences_to_result(tokens_to_sentences(all_tokens))
+
+
+def transcribe_audio(audio_file_path: str, chunk_duration: float = None, output_dir: str = None):
     """
     Transcribe an audio file using Parakeet MLX model.
 
     Args:
         audio_file_path: Path to the audio file to transcribe
-        chunk_duration: Duration in seconds for processing chunks (default: 120.0)
+        chunk_duration: Maximum duration in seconds of the chunks (default: largest fitting in memory)
         output_dir: Directory to save the transcription (default: same as audio file)
 
     Returns:
         str: Transcribed text or None if error occurred
     """
     try:
-        # Load model
-        print(f"Loading model...")
-        model = from_pretrained("mlx-community/parakeet-tdt-0.6b-v3")
-
         # Verify audio file exists
         audio_path = Path(audio_file_path)
         if not audio_path.exists():
@@ -43,11 +127,23 @@ def transcribe_audio(audio_file_path: str, chunk_duration: float = 120.0, output
 
         print(f"Transcribing: {audio_path.name}")
 
-        # Transcribe with chunk processing to avoid memory issues
-        result = model.transcribe(
-            str(audio_path),
-            chunk_duration=chunk_duration
-        )
+        def run_model(audio):
+            print(f"Loading model...")
+            model = from_pretrained(MODEL_REPO)
+            # Decoded and transcribed chunk by chunk to avoid memory issues
+            controller = ChunkController(memory_budget_mb=metal_budget_mb(),
+                                         max_seconds=chunk_duration or 300, min_seconds=20)
+            result = transcribe_streaming(
+                model, audio, controller,
+                on_chunk=lambda offset, text: print(f"[{offset:7.1f}s] {text.strip()[:80]}")
+            )
+            print(f"Chunks: {controller.summary()}")
+            return result_to_dict(result)
+
+        # chunk_duration only changes the memory used, not the result
+        transcription_cache = get_transcription_cache()
+        result = transcription_cache.transcribe(run_model, audio_path, model=f"parakeet/{MODEL_REPO}")
+        print(transcription_cache.stats.summary())
 
         # Determine output file path
         if output_dir:
@@ -59,15 +155,14 @@ def transcribe_audio(audio_file_path: str, chunk_duration: float = 120.0, output
 
         # Save transcription to file
         with open(txt_file_path, 'w', encoding='utf-8') as f:
-            f.write(result.text)
+            f.write(result["text"])
 
         print(f"Transcription saved to: {txt_file_path}")
-        return result.text
+        return result["text"]
 
     except RuntimeError as e:
         if "metal::malloc" in str(e):
-            print(f"Memory error: Try reducing chunk_duration (current: {chunk_duration}s)")
-            print(f"Suggested: {chunk_duration / 2}s")
+            print(f"Memory error: even the smallest chunks do not fit in memory")
         else:
             print(f"Runtime error: {e}")
         return None
@@ -79,7 +174,7 @@ def transcribe_audio(audio_file_path: str, chunk_duration: float = 120.0, output
 if __name__ == "__main__":
     # Example usage
     audio_file = "/Users/alain/Downloads/Audio_11_21_2025_13_23_42.mp3"
-    transcription = transcribe_audio(audio_file, chunk_duration=120.0)
+    transcription = transcribe_audio(audio_file)
 
     if transcription:
         print("\n--- Transcription ---")
@@ -0,0 +1,17 @@
+"""
+The scripts import their helpers by module name (they are run from their own
+directory), so the tests put the script directories on the path.
+
+Installation:
+$ uv add --dev pytest
+
+Usage:
+$ uv run pytest src/speech-to-text/tests
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+for directory in ("whisper", "parakeet"):
+    if str(ROOT / directory) not in sys.path:
+        sys.path.insert(0, str(ROOT / directory))
@@ -0,0 +1,78 @@
+import threading
+
+import numpy as np
+import pytest
+
+from capture_buffer import CaptureRing, SegmentBuffer, fill_segment
+
+
+class FakeStream:
+    """PyAudio-like input stream returning consecutive sample values"""
+
+    def __init__(self):
+        self.position = 0
+        self.reads = []
+
+    def read(self, frames, exception_on_overflow=True):
+        self.reads.append((frames, exception_on_overflow))
+        samples = np.arange(self.position, self.position + frames, dtype=np.int16)
+        self.position += frames
+        return samples.tobytes()
+
+
+def test_buffer_drops_values_past_capacity():
+    buffer = SegmentBuffer(4)
+    assert buffer.write(np.arange(3, dtype=np.int16).tobytes()) == 3
+    assert buffer.write(np.arange(3, dtype=np.int16)) == 1
+    assert buffer.is_full
+    assert buffer.view().tolist() == [0, 1, 2, 0]
+    buffer.reset()
+    assert buffer.free == 4
+
+
+def test_view_shares_the_buffer_memory():
+    buffer = SegmentBuffer(8)
+    buffer.write(np.ones(5, dtype=np.int16))
+    assert np.shares_memory(buffer.view(), buffer.samples)
+
+
+def test_ring_memory_is_allocated_once():
+    ring = CaptureRing(segment_samples=16000, slots=3)
+    assert ring.nbytes == 3 * 16000 * 2
+    buffers = [ring.acquire() for _ in range(3)]
+    assert sorted(buffer.index for buffer in buffers) == [0, 1, 2]
+
+
+def test_acquire_waits_for_a_released_slot():
+    ring = CaptureRing(segment_samples=10, slots=1)
+    buffer = ring.acquire()
+    with pytest.raises(TimeoutError):
+        ring.acquire(timeout=0.01)
+
+    threading.Timer(0.05, ring.release, args=(buffer,)).start()
+    assert ring.acquire(timeout=2) is buffer
+
+
+def test_release_twice_does_not_duplicate_a_slot():
+    ring = CaptureRing(segment_samples=10, slots=2)
+    buffer = ring.acquire()
+    ring.release(buffer)
+    ring.release(buffer)
+    assert len({id(ring.acquire()), id(ring.acquire())}) == 2
+    with pytest.raises(TimeoutError):
+        ring.acquire(timeout=0.01)
+
+
+def test_fill_segment_reads_up_to_capacity():
+    stream, buffer = FakeStream(), SegmentBuffer(2500)
+    fill_segment(stream, buffer, chunk=1024)
+    assert buffer.is_full
+    assert buffer.view().tolist() == list(range(2500))
+    # The last read only asks for the frames still missing, without raising on overflow
+    assert stream.reads == [(1024, False), (1024, False), (452, False)]
+
+
+def test_fill_segment_stops_when_told():
+    stream, buffer = FakeStream(), SegmentBuffer(10000)
+    fill_segment(stream, buffer, chunk=1000, should_continue=lambda: stream.position < 3000)
+    assert buffer.length == 3000
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from audio_stream import AudioSource
+from chunk_controller import ChunkController, adaptive_windows
+
+RATE = 16000
+
+
+class ArraySource(AudioSource):
+    """Synthetic audio held in memory"""
+
+    def __init__(self, samples, **options):
+        super().__init__(**options)
+        self._data = samples.tobytes()
+        self._position = 0
+
+    def _read(self, n_bytes):
+        data = self._data[self._position:self._position + n_bytes]
+        self._position += len(data)
+        return data
+
+
+class FakeModel:
+    """Runs out of memory above `limit` seconds, returns the chunk length otherwise"""
+
+    def __init__(self, limit, error="[metal::malloc] Unable to allocate 4096 MB"):
+        self.limit = limit
+        self.error = error
+
+    def transcribe(self, offset, audio):
+        seconds = len(audio) / RATE
+        if seconds > self.limit:
+            raise RuntimeError(self.error)
+        return seconds
+
+
+def run(limit, seconds=600, overlap=2, **options):
+    controller = ChunkController(**{"memory_budget_mb": 4096, "max_seconds": 300, "min_seconds": 10, **options})
+    with ArraySource(np.zeros(seconds * RATE, dtype=np.int16)) as source:
+        chunks = list(adaptive_windows(source, FakeModel(limit).transcribe, controller, overlap_seconds=overlap))
+    return controller, chunks
+
+
+def assert_covers(chunks, seconds, overlap):
+    assert chunks[0][0] == 0
+    for (offset, length), (next_offset, _) in zip(chunks, chunks[1:]):
+        assert next_offset == pytest.approx(offset + length - overlap)
+    assert chunks[-1][0] + chunks[-1][1] == pytest.approx(seconds)
+
+
+def test_budget_sets_the_chunk_size():
+    assert ChunkController(memory_budget_mb=1000, mb_per_second=20).chunk_seconds == 50
+    assert ChunkController(memory_budget_mb=100_000, max_seconds=300).chunk_seconds == 300
+    assert ChunkController(memory_budget_mb=10, min_seconds=10).chunk_seconds == 10
+
+
+def test_budget_from_the_environment(monkeypatch):
+    monkeypatch.setenv("PARAKEET_MEMORY_BUDGET_MB", "2000")
+    assert ChunkController().memory_budget_mb == 2000
+
+
+def test_chunks_cover_the_audio_with_overlap():
+    controller, chunks = run(limit=400)
+    assert_covers(chunks, 600, overlap=2)
+    assert not any(not record.ok for record in controller.records)
+
+
+def test_out_of_memory_retries_the_same_chunk_smaller():
+    controller, chunks = run(limit=90)
+    assert_covers(chunks, 600, overlap=2)
+    assert max(controller.sizes) <= 90
+    assert [record.ok for record in controller.records][:3] == [False, False, True]
+    # The failed sizes are remembered: no chunk above them is tried again
+    assert sum(not record.ok for record in controller.records) == 2
+
+
+def test_grows_back_under_the_size_that_failed():
+    controller = ChunkController(memory_budget_mb=4096, max_seconds=200, min_seconds=10, grow_after=2)
+    controller.failed(0, 200, 1.0, MemoryError())
+    assert controller.chunk_seconds == 100
+    for offset in range(4):
+        controller.succeeded(offset, controller.chunk_seconds, 1.0)
+    assert 100 < controller.chunk_seconds <= 180
+
+
+def test_failure_at_the_minimum_size_is_raised():
+    with pytest.raises(RuntimeError, match="metal::malloc"):
+        run(limit=5)
+
+
+def test_other_errors_are_not_retried():
+    controller = ChunkController(memory_budget_mb=4096, min_seconds=10)
+    model = FakeModel(limit=0, error="bad audio")
+    with ArraySource(np.zeros(60 * RATE, dtype=np.int16)) as source:
+        with pytest.raises(RuntimeError, match="bad audio"):
+            list(adaptive_windows(source, model.transcribe, controller))
+    assert controller.records == []
+
+
+def test_overlap_must_fit_in_the_minimum_chunk():
+    with pytest.raises(ValueError):
+        run(limit=400, overlap=6)
@@ -0,0 +1,84 @@
+from stitching import TranscriptStitcher, merge_overlap, result_words, words_to_text
+
+# Four 10 s segments overlapping by 2 s, one word a second named after its session time
+OVERLAP, DURATION = 2.0, 10.0
+OFFSETS = {num: (num - 1) * (DURATION - OVERLAP) for num in range(1, 5)}
+
+
+def fake_result(offset, duration=DURATION):
+    words = [{"word": f" w{int(offset) + i}", "start": float(i), "end": i + 0.5}
+             for i in range(int(duration))]
+    return {"segments": [{"words": words}]}
+
+
+def add(stitcher, num):
+    return stitcher.add(num, OFFSETS[num], DURATION, fake_result(OFFSETS[num]))
+
+
+def starts(words):
+    return [w["start"] for w in words]
+
+
+def test_result_words_are_shifted_to_session_time():
+    words = result_words(fake_result(0, duration=2), offset=30)
+    assert [(w["word"], w["start"], w["end"]) for w in words] == [(" w0", 30.0, 30.5), (" w1", 31.0, 31.5)]
+
+
+def test_overlap_keeps_one_copy_of_each_word():
+    stitcher = TranscriptStitcher(OVERLAP)
+    words = []
+    for num in range(1, 5):
+        words += add(stitcher, num)
+    words += stitcher.flush()
+    assert starts(words) == [float(t) for t in range(34)]
+    assert words_to_text(words) == " ".join(f"w{t}" for t in range(34))
+
+
+def test_out_of_order_segments_are_stitched_in_sequence():
+    stitcher = TranscriptStitcher(OVERLAP)
+    assert add(stitcher, 3) == []
+    assert add(stitcher, 2) == []
+    words = add(stitcher, 1) + add(stitcher, 4) + stitcher.flush()
+    assert starts(words) == [float(t) for t in range(34)]
+
+
+def test_failed_segment_leaves_a_gap():
+    stitcher = TranscriptStitcher(OVERLAP)
+    words = add(stitcher, 1) + add(stitcher, 3) + add(stitcher, 4)
+    words += stitcher.skip(2)
+    words += stitcher.flush()
+    assert starts(words) == [float(t) for t in range(0, 10)] + [float(t) for t in range(16, 34)]
+
+
+def test_flush_returns_segments_after_a_missing_one():
+    stitcher = TranscriptStitcher(OVERLAP)
+    words = add(stitcher, 1) + add(stitcher, 3) + stitcher.flush()
+    assert starts(words) == [float(t) for t in range(0, 10)] + [float(t) for t in range(16, 26)]
+
+
+def test_merge_cuts_in_the_middle_of_the_matched_words():
+    previous = [{"word": w, "start": t, "end": t + 0.4} for t, w in enumerate(["a", "b", "c", "d"])]
+    # Same words heard with slightly different timings by the next segment
+    current = [{"word": w, "start": t + 2.1, "end": t + 2.5} for t, w in enumerate(["C", "d", "e"])]
+    kept_previous, kept_current = merge_overlap(previous, current, 2.0, 4.0)
+    assert [w["word"] for w in kept_previous + kept_current] == ["a", "b", "c", "d", "e"]
+
+
+def test_merge_without_match_cuts_at_the_middle_of_the_overlap():
+    previous = [{"word": w, "start": t, "end": t + 0.4} for t, w in enumerate(["a", "b", "x", "y"])]
+    current = [{"word": w, "start": t + 2.0, "end": t + 2.4} for t, w in enumerate(["p", "q", "e"])]
+    kept_previous, kept_current = merge_overlap(previous, current, 2.0, 4.0)
+    assert [w["word"] for w in kept_previous + kept_current] == ["a", "b", "x", "q", "e"]
+
+
+def test_seed_written_continues_after_the_written_words():
+    stitcher = TranscriptStitcher(OVERLAP)
+    stitcher.seed(2, OFFSETS[2], DURATION, fake_result(OFFSETS[2]), written=True)
+    words = add(stitcher, 3) + stitcher.flush()
+    assert starts(words) == [float(t) for t in range(18, 26)]
+
+
+def test_flush_until_drops_words_already_in_the_next_segment():
+    stitcher = TranscriptStitcher(OVERLAP)
+    words = add(stitcher, 1) + stitcher.flush(until=OFFSETS[2])
+    assert starts(words) == [float(t) for t in range(0, 8)]
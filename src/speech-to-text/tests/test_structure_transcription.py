@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from fake_llm_server import start_server
+from llm_backends import create_backend
+from structure_transcription import (estimate_tokens, split_transcription, split_units, structure_map_reduce,
+                                     structure_single)
+
+
+def transcription(segments=40, words=120):
+    """Segment headers followed by sentences of 15 words"""
+    paragraphs = []
+    for i in range(1, segments + 1):
+        text = " ".join(f"mot{i}_{j}" + ("." if j % 15 == 14 else "") for j in range(words))
+        paragraphs.append(f"--- SEGMENT {i} ---\n{text}")
+    return "\n\n".join(paragraphs)
+
+
+@pytest.fixture
+def server():
+    server, _ = start_server(latency=0.01, tokens_per_second=100_000)
+    yield server
+    server.shutdown()
+
+
+def run(server, structure):
+    """Runs `structure(backend)` on a backend closed in the same event loop"""
+    async def main():
+        backend = create_backend("openai", base_url=f"{server.url}/v1", concurrency=4)
+        try:
+            return await structure(backend)
+        finally:
+            await backend.aclose()
+    return asyncio.run(main())
+
+
+def test_chunks_fit_and_keep_every_word_in_order():
+    text = transcription()
+    chunks = split_transcription(text, chunk_tokens=500)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 500 for chunk in chunks)
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+
+
+def test_oversized_paragraphs_are_split_down_to_words():
+    paragraph = " ".join(f"mot{j}" for j in range(400))  # One line, no sentence end
+    units = split_units(paragraph, max_tokens=100)
+    assert len(units) > 1
+    assert all(estimate_tokens(unit) <= 100 for unit in units)
+    assert " ".join(units).split() == paragraph.split()
+
+
+def test_short_transcription_is_one_chunk():
+    assert split_transcription("bonjour\n\nà tous", chunk_tokens=6000) == ["bonjour\n\nà tous"]
+
+
+def test_single_pass_is_streamed_to_the_output(tmp_path, server):
+    output = tmp_path / "structured.md"
+    markdown = run(server, lambda backend: structure_single(transcription(segments=2), backend, output))
+    assert markdown.startswith("## ")
+    assert output.read_text(encoding="utf-8") == markdown
+
+
+def test_map_reduce_keeps_the_parts_in_order(tmp_path, server):
+    parts_dir, output = tmp_path / "parts", tmp_path / "structured.md"
+    document, timings = run(server, lambda backend: structure_map_reduce(
+        transcription(), backend, chunk_tokens=500, parts_dir=parts_dir, output_path=output))
+    parts = sorted(parts_dir.iterdir())
+    assert timings.chunks == len(parts) > 1
+
+    # Each part's heading shows up in the document, in the order of the parts
+    headings = [part.read_text(encoding="utf-8").splitlines()[0] for part in parts]
+    positions = [document.index(heading) for heading in headings]
+    assert positions == sorted(positions)
+    # The reduce request (title, introduction, conclusion) was streamed to the output
+    assert output.read_text(encoding="utf-8").strip() in document
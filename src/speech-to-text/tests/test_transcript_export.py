@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from transcript_export import (SUBTITLE_FORMATS, WORD_FORMATS, export, iter_words, read_export,
+                               read_word_timeline, split_cues, wrap_lines)
+
+VOCABULARY = ["réunion", "budget", "l'équipe", "projet", "semaine", "client", "donc", "voilà", "très"]
+
+
+def synthetic_segments(minutes=10):
+    """2.5 words/s, sentences of 5-25 words, every tenth segment without word timestamps"""
+    rng = random.Random(0)
+    t = 0.0
+    for i in range(int(minutes * 60 / 6)):
+        words = []
+        for _ in range(rng.randint(5, 25)):
+            text = f" {rng.choice(VOCABULARY)}" + ("." if rng.random() < 0.08 else "")
+            words.append({"word": text, "start": round(t, 3), "end": round(t + 0.3, 3), "probability": 0.9})
+            t += 0.4
+        t += rng.uniform(0, 2)
+        segment = {"start": words[0]["start"], "end": words[-1]["end"],
+                   "text": "".join(w["word"] for w in words), "words": words}
+        if i % 10 == 9:
+            segment["words"] = []
+        yield segment
+
+
+@pytest.mark.parametrize("fmt", SUBTITLE_FORMATS)
+def test_subtitle_round_trip(tmp_path, fmt):
+    path = tmp_path / f"transcript.{fmt}"
+    reference = list(split_cues(synthetic_segments()))
+    assert export(synthetic_segments(), path) == len(reference)
+
+    back = list(read_export(path))
+    assert len(back) == len(reference)
+    for a, b in zip(reference, back):
+        assert b.text == a.text
+        assert b.start == pytest.approx(a.start, abs=0.001)
+        assert b.end == pytest.approx(a.end, abs=0.001)
+        if fmt != "tsv":
+            assert b.lines == a.lines
+
+
+@pytest.mark.parametrize("fmt", WORD_FORMATS)
+def test_word_timeline_round_trip(tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / f"transcript.{fmt}"
+    reference = list(iter_words(synthetic_segments()))
+    assert export(synthetic_segments(), path) == len(reference)
+
+    back = list(read_export(path))
+    assert len(back) == len(reference)
+    for a, b in zip(reference, back):
+        assert b["word"] == a["word"]
+        assert b["start"] == pytest.approx(a["start"], abs=0.001)
+        assert b["end"] == pytest.approx(a["end"], abs=0.002)
+
+
+def test_cues_respect_the_line_and_duration_limits():
+    for cue in split_cues(synthetic_segments(), max_chars=42, max_lines=2, max_seconds=7.0):
+        assert len(cue.lines) <= 2
+        assert all(len(line) <= 42 for line in cue.lines)
+        assert cue.end - cue.start <= 7.0
+
+
+def test_pause_starts_a_new_cue():
+    words = [{"word": " bonjour", "start": 0.0, "end": 0.4}, {"word": " à", "start": 0.5, "end": 0.6},
+             {"word": " tous", "start": 3.0, "end": 3.4}]
+    cues = list(split_cues({"segments": [{"start": 0.0, "end": 3.4, "text": "", "words": words}]}))
+    assert [cue.text for cue in cues] == ["bonjour à", "tous"]
+
+
+def test_words_are_interpolated_without_timestamps():
+    segment = {"start": 10.0, "end": 12.0, "text": " un deux", "words": []}
+    words = list(iter_words([segment]))
+    assert [w["word"] for w in words] == [" un", " deux"]
+    assert words[0]["start"] == 10.0
+    assert words[-1]["end"] == pytest.approx(12.0)
+    assert words[0]["end"] == words[1]["start"]
+
+
+def test_lines_are_balanced():
+    lines = wrap_lines("les premiers mots d'une phrase qui ne tient pas sur une ligne", 42)
+    assert len(lines) == 2
+    assert abs(len(lines[0]) - len(lines[1])) <= 10
+
+
+def test_long_words_are_cut_on_a_character_boundary(tmp_path):
+    path = tmp_path / "long.wtl"
+    word = " " + "é" * 200  # 401 bytes in UTF-8
+    export([{"start": 0.0, "end": 1.0, "text": word, "words": [{"word": word, "start": 0.0, "end": 1.0}]}], path)
+    (back,) = read_word_timeline(path)
+    assert back["word"] == " " + "é" * 127
+
+
+def test_unknown_format_is_refused(tmp_path):
+    with pytest.raises(ValueError):
+        export(synthetic_segments(), tmp_path / "transcript.doc")
@@ -0,0 +1,75 @@
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from transcript_writer import TranscriptWriter, read_records
+
+
+def segment_text(num):
+    return f"--- SEGMENT {num} ---\n" + " ".join(f"w{num}_{i}" for i in range(20)) + "\n"
+
+
+def read_headers(path):
+    with open(path, encoding="utf-8") as f:
+        return [int(line.split()[2]) for line in f if line.startswith("--- SEGMENT")]
+
+
+def test_segments_from_many_threads_are_written_in_order(tmp_path):
+    segments = 500
+    text_path, jsonl_path = tmp_path / "transcript.txt", tmp_path / "transcript.jsonl"
+    writer = TranscriptWriter(str(text_path), str(jsonl_path))
+
+    def worker(num):
+        time.sleep(random.uniform(0, 0.005))
+        writer.put(num, segment_text(num), {"segment": num})
+
+    with ThreadPoolExecutor(16) as pool:
+        list(pool.map(worker, range(1, segments + 1)))
+    writer.close()
+
+    expected = list(range(1, segments + 1))
+    assert read_headers(text_path) == expected
+    with open(jsonl_path, encoding="utf-8") as f:
+        assert [json.loads(line)["segment"] for line in f] == expected
+    assert writer.stats.written == segments
+    assert writer.stats.gaps == 0
+
+
+def test_early_segments_wait_for_the_missing_one(tmp_path):
+    text_path = tmp_path / "transcript.txt"
+    writer = TranscriptWriter(str(text_path))
+    writer.put(2, segment_text(2))
+    writer.put(3, segment_text(3))
+    writer.put(1, segment_text(1))
+    writer.close()
+    assert read_headers(text_path) == [1, 2, 3]
+    assert writer.stats.out_of_order == 2
+    assert writer.stats.max_pending == 3
+
+
+def test_close_writes_segments_after_a_gap_then_the_tail(tmp_path):
+    text_path = tmp_path / "transcript.txt"
+    text_path.write_text("header\n", encoding="utf-8")
+    writer = TranscriptWriter(str(text_path))
+    writer.put(1, segment_text(1))
+    writer.put(3, segment_text(3))
+    writer.put(1, "duplicate\n")
+    writer.close("end\n")
+
+    text = text_path.read_text(encoding="utf-8")
+    assert text.startswith("header\n")
+    assert text.endswith("end\n")
+    assert "duplicate" not in text
+    assert read_headers(text_path) == [1, 3]
+    assert writer.stats.gaps == 1
+
+
+def test_read_records_skips_torn_lines(tmp_path):
+    jsonl_path = tmp_path / "transcript.jsonl"
+    jsonl_path.write_text('{"segment": 1, "text": "a"}\n{"segment": 2, "text": "b"}\n'
+                          '{"segment": 1, "text": "c"}\n{"segment": 3, "te', encoding="utf-8")
+    records = read_records(str(jsonl_path))
+    assert sorted(records) == [1, 2]
+    assert records[1]["text"] == "c"
+    assert read_records(str(tmp_path / "missing.jsonl")) == {}
@@ -0,0 +1,68 @@
+"""
+In-memory audio hand-off between the recorder and the models.
+
+mlx_whisper.transcribe() and the pyannote pipeline both accept in-memory
+waveforms, so there is no need to write each segment to a WAV file and decode
+it again (once by ffmpeg for Whisper, once more by soundfile for diarization).
+The captured int16 samples are converted once to float32 and handed to both,
+while the WAV is written in the background for archival only.
+
+Installation:
+$ uv add numpy
+"""
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def pcm16_to_float32(samples) -> np.ndarray:
+    """Converts int16 PCM samples (array or bytes) to float32 in [-1, 1]"""
+    if isinstance(samples, (bytes, bytearray, memoryview)):
+        samples = np.frombuffer(samples, dtype=np.int16)
+    return samples.astype(np.float32) / 32768.0
+
+
+def write_wav(path: str, samples, rate: int = SAMPLE_RATE, channels: int = 1):
+    """Writes int16 samples to a WAV file without copying them"""
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples)
+
+
+class ArchiveWriter:
+    """Writes segment WAV files on a background thread, in submission order"""
+
+    def __init__(self, rate: int = SAMPLE_RATE, channels: int = 1):
+        self.rate = rate
+        self.channels = channels
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wav-archive")
+
+    def submit(self, path: str, samples, on_done=None, release=None) -> Future:
+        """
+        Queues `samples` to be written to `path`. `on_done()` is called once the
+        file is written (not if writing failed), `release()` in any case once
+        the samples are no longer needed, e.g. to give a capture buffer back to
+        its ring.
+        """
+        def write():
+            try:
+                write_wav(path, samples, self.rate, self.channels)
+            except Exception as e:
+                print(f"❌ Could not write {path}: {e}")
+                raise
+            finally:
+                if release:
+                    release()
+            if on_done:
+                on_done()
+            return path
+
+        return self._executor.submit(write)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
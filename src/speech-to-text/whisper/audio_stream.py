@@ -0,0 +1,203 @@
+"""
+Streaming audio sources: decode a file while it is being transcribed.
+
+The file scripts used to load the whole recording in memory before the first
+chunk reached a model (mlx_whisper and parakeet_mlx both call ffmpeg and keep
+the full float32 array). An AudioSource instead reads 16 kHz mono PCM from an
+ffmpeg pipe on a background thread into a bounded buffer, and hands out
+fixed-size chunks or overlapping windows as soon as they are decoded. When the
+consumer is slower than ffmpeg, the buffer fills up and ffmpeg blocks on its
+pipe, so memory depends on the buffer size, not on the duration of the file.
+
+Installation:
+$ brew install ffmpeg
+$ uv add numpy
+
+Usage:
+    from audio_stream import open_audio
+    with open_audio("podcast.mp3") as source:
+        for offset, window in source.windows(30, overlap_seconds=2):
+            ...
+"""
+import queue
+import shutil
+import subprocess
+import threading
+import wave
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from audio_io import SAMPLE_RATE, pcm16_to_float32
+
+READ_BYTES = 1 << 16  # ~2 s of 16 kHz int16 per pipe read
+
+
+class AudioSource:
+    """
+    Base class: subclasses implement `_read(n_bytes)` (b"" at the end) and `_close()`.
+
+    Args:
+        rate: Output sample rate
+        buffer_seconds: Decoded audio kept ahead of the consumer
+    """
+
+    def __init__(self, rate: int = SAMPLE_RATE, buffer_seconds: float = 60):
+        self.rate = rate
+        self.samples_read = 0
+        self._queue = queue.Queue(maxsize=max(1, int(buffer_seconds * rate * 2 / READ_BYTES)))
+        self._pending = bytearray()
+        self._finished = False
+        self._error: Optional[BaseException] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._fill, name="audio-decoder", daemon=True)
+
+    def _read(self, n_bytes: int) -> bytes:
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    def _fill(self):
+        """Decoder thread: moves PCM bytes into the bounded queue"""
+        try:
+            while not self._stop.is_set():
+                data = self._read(READ_BYTES)
+                if not data:
+                    break
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(data, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._queue.put(None)
+
+    def start(self) -> "AudioSource":
+        if self._thread.ident is None:
+            self._thread.start()
+        return self
+
+    def read(self, n_samples: int) -> np.ndarray:
+        """
+        Returns up to `n_samples` int16 samples, fewer only at the end of the
+        audio (an empty array once it is exhausted)
+        """
+        self.start()
+        needed = n_samples * 2
+        while len(self._pending) < needed and not self._finished:
+            data = self._queue.get()
+            if data is None:
+                self._finished = True
+                if self._error:
+                    raise self._error
+            else:
+                self._pending += data
+        size = min(needed, len(self._pending) // 2 * 2)
+        samples = np.frombuffer(bytes(self._pending[:size]), dtype=np.int16)
+        del self._pending[:size]
+        self.samples_read += len(samples)
+        return samples
+
+    def chunks(self, seconds: float) -> Iterator[Tuple[float, np.ndarray]]:
+        """Yields (offset in seconds, float32 chunk) of consecutive chunks"""
+        size = int(seconds * self.rate)
+        while True:
+            offset = self.samples_read / self.rate
+            samples = self.read(size)
+            if not len(samples):
+                return
+            yield offset, pcm16_to_float32(samples)
+            if len(samples) < size:
+                return
+
+    def windows(self, seconds: float, overlap_seconds: float = 0) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Yields (offset in seconds, float32 window) covering the audio, each
+        window starting `overlap_seconds` before the end of the previous one
+        """
+        window = int(seconds * self.rate)
+        overlap = int(overlap_seconds * self.rate)
+        if not 0 <= overlap < window:
+            raise ValueError("The overlap must be shorter than the window")
+
+        start = self.samples_read  # First sample of the window
+        tail = np.empty(0, dtype=np.int16)  # Overlap carried from the previous window
+        while True:
+            new = self.read(window - len(tail))
+            if not len(new):
+                return  # The previous window already reached the end
+            samples = np.concatenate([tail, new])
+            yield start / self.rate, pcm16_to_float32(samples)
+            if len(samples) < window:
+                return
+            tail = samples[window - overlap:]
+            start += window - overlap
+
+    def close(self):
+        self._stop.set()
+        self.start()  # Never started: let the thread see the stop flag and exit
+        # Unblock the decoder thread if it waits on a full queue
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self._close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FFmpegSource(AudioSource):
+    """Any format ffmpeg can decode, resampled to mono `rate`"""
+
+    def __init__(self, path: str, rate: int = SAMPLE_RATE, **options):
+        super().__init__(rate, **options)
+        self.path = path
+        cmd = ["ffmpeg", "-nostdin", "-v", "error", "-i", path, "-threads", "0",
+               "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(rate), "-"]
+        self._process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def _read(self, n_bytes):
+        data = self._process.stdout.read(n_bytes)
+        if not data and self._process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed on {self.path}: {self._process.stderr.read().decode().strip()}")
+        return data
+
+    def _close(self):
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        self._process.stdout.close()
+        self._process.stderr.close()
+
+
+class WaveSource(AudioSource):
+    """16-bit mono WAV already at `rate`, read without ffmpeg"""
+
+    def __init__(self, path: str, rate: int = SAMPLE_RATE, **options):
+        super().__init__(rate, **options)
+        self._wave = wave.open(path, "rb")
+        if (self._wave.getframerate(), self._wave.getnchannels(), self._wave.getsampwidth()) != (rate, 1, 2):
+            self._wave.close()
+            raise ValueError(f"{path} is not 16-bit mono at {rate} Hz, ffmpeg is required to decode it")
+
+    def _read(self, n_bytes):
+        return self._wave.readframes(n_bytes // 2)
+
+    def _close(self):
+        self._wave.close()
+
+
+def open_audio(path: str, rate: int = SAMPLE_RATE, buffer_seconds: float = 60) -> AudioSource:
+    """ffmpeg when installed, otherwise a WAV reader"""
+    if shutil.which("ffmpeg"):
+        return FFmpegSource(str(path), rate, buffer_seconds=buffer_seconds)
+    return WaveSource(str(path), rate, buffer_seconds=buffer_seconds)
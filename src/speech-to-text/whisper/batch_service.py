@@ -0,0 +1,152 @@
+"""
+Batched transcription service for many concurrent streams.
+
+With one recorder per room, each stream called the model on its own, so the
+encoder ran at batch size 1 per stream and the calls queued behind each other.
+BatchingService collects the segments submitted by all the streams and runs
+them through ModelCache.transcribe_batch() (one padded forward pass) as soon
+as `max_batch_size` segments are waiting or the oldest one has waited
+`max_wait` seconds. Each submit() returns a Future with the result of that
+segment, and `on_result(stream_id, result)` is called as each batch completes
+(batches run one after the other, so the segments of a stream come in order).
+
+Larger batches give more throughput, a longer max_wait fills them better at
+the cost of latency: see benchmark_batch_service.py.
+
+Installation:
+$ uv add numpy
+
+Usage:
+    service = BatchingService("base", max_batch_size=8, max_wait=0.1, language="fr")
+    future = service.submit("room-1", audio)   # float32 16 kHz, up to 30 s
+    print(future.result()["text"])
+    service.close()
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, List, Optional
+
+import numpy as np
+
+from audio_io import SAMPLE_RATE
+from model_registry import ModelCache, get_model_cache, resolve_model
+
+
+@dataclass
+class BatchStats:
+    """Batch sizes and per-segment latency (submit to result)"""
+    batches: int = 0
+    segments: int = 0
+    audio_seconds: float = 0
+    busy_seconds: float = 0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.segments / self.batches if self.batches else 0
+
+    def latency(self, q: float) -> float:
+        return float(np.percentile(self.latencies, q)) if self.latencies else 0
+
+    def summary(self) -> str:
+        return (f"{self.segments} segments in {self.batches} batches (mean {self.mean_batch_size:.1f}) | "
+                f"latency p50 {self.latency(50) * 1000:.0f} ms p95 {self.latency(95) * 1000:.0f} ms | "
+                f"model busy {self.busy_seconds:.1f}s for {self.audio_seconds:.0f}s of audio")
+
+
+@dataclass
+class _Request:
+    stream_id: Hashable
+    audio: np.ndarray
+    future: Future
+    submitted_at: float
+
+
+class BatchingService:
+    """
+    Args:
+        model_name: Whisper model shared by all the streams
+        max_batch_size: Most segments per forward pass
+        max_wait: Longest time (seconds) a segment waits for the batch to fill
+        cache: ModelCache to use (default: the process-wide one)
+        on_result: Called with (stream_id, result) for each segment
+        **options: Transcription options (e.g. language="fr")
+    """
+
+    def __init__(self, model_name: str, max_batch_size: int = 8, max_wait: float = 0.05,
+                 cache: Optional[ModelCache] = None,
+                 on_result: Optional[Callable[[Hashable, dict], None]] = None, **options):
+        self.model_name = resolve_model(model_name)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.cache = cache or get_model_cache()
+        self.on_result = on_result
+        self.options = options
+        self.stats = BatchStats()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="batch-service", daemon=True)
+        self._thread.start()
+
+    def submit(self, stream_id: Hashable, audio: np.ndarray) -> Future:
+        """Queues a segment of `stream_id`, returns a Future of its result"""
+        future = Future()
+        self._queue.put(_Request(stream_id, audio, future, time.perf_counter()))
+        return future
+
+    def _next_batch(self) -> List[_Request]:
+        """Waits for a segment, then for the batch to fill or the oldest segment to time out"""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = first.submitted_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                request = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)  # Seen again once this batch is done
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            start = time.perf_counter()
+            try:
+                results = self.cache.transcribe_batch(self.model_name, [r.audio for r in batch], **self.options)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            done = time.perf_counter()
+
+            self.stats.batches += 1
+            self.stats.segments += len(batch)
+            self.stats.busy_seconds += done - start
+            for request, result in zip(batch, results):
+                self.stats.audio_seconds += len(request.audio) / SAMPLE_RATE
+                self.stats.latencies.append(done - request.submitted_at)
+                if self.on_result:
+                    # A failing callback must not stop the service
+                    try:
+                        self.on_result(request.stream_id, result)
+                    except Exception as e:
+                        print(f"❌ on_result failed for stream {request.stream_id}: {e}")
+                request.future.set_result(result)
+            for request in batch[len(results):]:
+                # Never leave a caller waiting on a segment without a result
+                request.future.set_exception(RuntimeError(f"No result for this segment "
+                                                          f"({len(results)} for a batch of {len(batch)})"))
+
+    def close(self):
+        """Stops once every submitted segment has been transcribed"""
+        self._queue.put(None)
+        self._thread.join()
@@ -0,0 +1,285 @@
+"""
+Batch transcription of audio directories.
+
+Walks files and directories, skips recordings whose outputs are already up to
+date, transcribes each distinct recording once (duplicates are detected by
+content hash and get a copy of the outputs) on a pool of workers sharing one
+resident model, and writes txt / json, srt / vtt / tsv subtitles or wtl /
+parquet word timelines (see transcript_export.py) next to the audio or in an
+output directory (mirroring the input folders). At the end, reports the
+real-time factor (processing time / audio duration) and the throughput in
+files per hour. Results go through the transcription cache, so re-running on
+an archive after a format change is almost instant (--no-cache to bypass it).
+
+Installation:
+$ brew install ffmpeg
+$ uv add mlx-whisper   # or faster-whisper, see model_registry.py
+
+Usage:
+$ uv run batch_transcribe.py ~/Recordings --model large-v3-turbo \
+    --formats txt,srt
+$ uv run batch_transcribe.py a.mp3 b.m4a --output-dir transcripts --workers 2
+$ uv run whisper-mp3.py ~/Recordings   # same thing
+"""
+import argparse
+import json
+import os
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from model_registry import MODELS, get_model_cache, resolve_model
+from long_form import transcribe_long
+from segment_scheduler import SegmentScheduler
+from transcript_export import EXPORT_FORMATS, WORD_FORMATS, export
+from transcription_cache import audio_hash, get_transcription_cache
+
+AUDIO_EXTENSIONS = {".mp3", ".m4a", ".wav", ".flac", ".ogg", ".opus", ".aac", ".mp4", ".webm"}
+FORMATS = ("txt", "json") + EXPORT_FORMATS
+
+
+# ============================================================
+# FILES
+# ============================================================
+
+def find_audio_files(paths: Iterable[str], extensions=AUDIO_EXTENSIONS) -> List[Path]:
+    """Audio files given directly or found (recursively) in directories, sorted"""
+    files = set()
+    for path in map(Path, paths):
+        path = path.expanduser()
+        if path.is_dir():
+            files.update(p for p in path.rglob("*") if p.is_file() and p.suffix.lower() in extensions)
+        elif path.is_file():
+            files.add(path)
+        else:
+            print(f"⚠️  Not found: {path}")
+    return sorted(files)
+
+
+def audio_duration(path) -> Optional[float]:
+    """Duration in seconds read by ffprobe, None if it is not available"""
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(path)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        return float(output.strip())
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def common_root(files: List[Path]) -> Optional[Path]:
+    """Deepest directory containing every file"""
+    return Path(os.path.commonpath([str(p.resolve().parent) for p in files])) if files else None
+
+
+def output_paths(audio_path: Path, formats: List[str], output_dir: Optional[str] = None,
+                 root: Optional[Path] = None) -> Dict[str, Path]:
+    """
+    Outputs next to the audio, or in `output_dir` under the same path relative
+    to `root` (so same-named files of different folders don't overwrite each other)
+    """
+    if output_dir:
+        directory = Path(output_dir).expanduser()
+        if root is not None:
+            directory = directory / audio_path.resolve().parent.relative_to(root)
+    else:
+        directory = audio_path.parent
+    return {fmt: directory / f"{audio_path.stem}.{fmt}" for fmt in formats}
+
+
+def is_done(audio_path: Path, outputs: Dict[str, Path]) -> bool:
+    """Every output exists and is newer than the audio"""
+    mtime = audio_path.stat().st_mtime
+    return all(p.exists() and p.stat().st_mtime >= mtime for p in outputs.values())
+
+
+# ============================================================
+# OUTPUT FORMATS
+# ============================================================
+
+def write_outputs(result: dict, outputs: Dict[str, Path], metadata: dict):
+    for fmt, path in outputs.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name so an interrupted run is never "done"
+        tmp = path.with_name(path.name + ".part")
+        if fmt in EXPORT_FORMATS:
+            export(result, tmp, fmt)
+        elif fmt == "txt":
+            tmp.write_text(result["text"].strip() + "\n", encoding="utf-8")
+        else:
+            tmp.write_text(json.dumps({**metadata, **result}, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+# ============================================================
+# BATCH
+# ============================================================
+
+@dataclass
+class BatchStats:
+    """Aggregate results of a batch"""
+    found: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    transcribed: int = 0
+    failed: int = 0
+    audio_seconds: float = 0
+    processing_seconds: float = 0
+    wall_seconds: float = 0
+    failures: list = field(default_factory=list)
+
+    @property
+    def realtime_factor(self) -> float:
+        """Processing time per second of audio (lower is better)"""
+        return self.processing_seconds / self.audio_seconds if self.audio_seconds else 0
+
+    @property
+    def files_per_hour(self) -> float:
+        return self.transcribed / self.wall_seconds * 3600 if self.wall_seconds else 0
+
+    def summary(self) -> str:
+        return (f"{self.transcribed} transcribed, {self.duplicates} duplicates, "
+                f"{self.skipped} already done, {self.failed} failed (of {self.found}) | "
+                f"{self.audio_seconds / 3600:.2f}h of audio in {self.wall_seconds / 60:.1f} min | "
+                f"RTF {self.realtime_factor:.3f} | {self.files_per_hour:.0f} files/hour")
+
+
+def transcribe_batch(paths: Iterable[str], model: str = "large-v3-turbo", language: Optional[str] = "fr",
+                     formats: Iterable[str] = ("txt", "json"), output_dir: Optional[str] = None,
+                     workers: int = 1, force: bool = False, word_timestamps: bool = False,
+                     use_cache: bool = True, long_form: bool = False) -> BatchStats:
+    """Transcribes every audio file under `paths`, see the module docstring"""
+    formats = list(formats)
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown formats {sorted(unknown)}, expected some of {FORMATS}")
+
+    # Word timelines and subtitle cues need the word timestamps
+    word_timestamps = word_timestamps or any(fmt in WORD_FORMATS or fmt in ("srt", "vtt") for fmt in formats)
+
+    stats = BatchStats()
+    start = time.perf_counter()
+    files = find_audio_files(paths)
+    stats.found = len(files)
+    root = common_root(files)
+
+    # Skip what is already done, then group the rest by content
+    groups: Dict[str, List[Path]] = {}
+    for path in files:
+        if not force and is_done(path, output_paths(path, formats, output_dir, root)):
+            stats.skipped += 1
+            continue
+        groups.setdefault(audio_hash(path), []).append(path)
+    stats.duplicates = sum(len(group) - 1 for group in groups.values())
+    print(f"🔍 {stats.found} files: {stats.skipped} already done, {len(groups)} to transcribe "
+          f"({stats.duplicates} duplicates)")
+    if not groups:
+        return stats
+
+    model_name = resolve_model(model)
+    model_cache = get_model_cache()
+    transcription_cache = get_transcription_cache() if use_cache else None
+    if transcription_cache is None and not long_form:
+        print(f"Loading Whisper '{model_name}' ({model_cache.backend.name} backend)...")
+        model_cache.warmup([model_name])
+    # Otherwise the model is only loaded on the first cache miss (or by the long-form workers)
+    lock = threading.Lock()
+
+    def run_model(audio):
+        if long_form:
+            # Streamed in windows: bounded memory for multi-hour files
+            result = transcribe_long(str(audio), model_name, language, workers=workers)
+            result.pop("stats")
+            return result
+        return model_cache.transcribe(model_name, str(audio), language=language,
+                                      word_timestamps=word_timestamps)
+
+    def process(item):
+        digest, group = item
+        source = group[0]
+        file_start = time.perf_counter()
+        try:
+            if transcription_cache is None:
+                result = run_model(source)
+            else:
+                result = transcription_cache.transcribe(
+                    run_model, source, model=f"{model_cache.backend.name}/{model_name}",
+                    language=language, word_timestamps=word_timestamps or long_form, long_form=long_form)
+        except Exception as e:
+            # Handled here: the file is reported once and the batch goes on
+            with lock:
+                stats.failed += len(group)
+                stats.failures.append((str(source), str(e)))
+                done = stats.transcribed + stats.failed
+            print(f"❌ [{done}/{len(groups)}] {source.name}: {e}")
+            return
+        elapsed = time.perf_counter() - file_start
+
+        duration = audio_duration(source)
+        if duration is None:
+            duration = result["segments"][-1]["end"] if result["segments"] else 0.0
+        for path in group:
+            metadata = {"file": str(path), "sha256": digest, "model": model_name, "duration": duration}
+            write_outputs(result, output_paths(path, formats, output_dir, root), metadata)
+
+        with lock:
+            stats.transcribed += 1
+            stats.audio_seconds += duration
+            stats.processing_seconds += elapsed
+            done = stats.transcribed + stats.failed
+        copies = f" (+{len(group) - 1} duplicates)" if len(group) > 1 else ""
+        print(f"✅ [{done}/{len(groups)}] {source.name}{copies}: {duration:.0f}s in {elapsed:.1f}s")
+
+    # Blocking queue: files are hashed up front, the model stays resident.
+    # In long-form mode the workers share the windows of one file at a time.
+    file_workers = 1 if long_form else workers
+    scheduler = SegmentScheduler(process, workers=file_workers, max_queue=file_workers * 2)
+    for item in groups.items():
+        scheduler.submit(item)
+    scheduler.close()
+
+    stats.wall_seconds = time.perf_counter() - start
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe audio files and directories")
+    parser.add_argument("paths", nargs="+", help="Audio files or directories")
+    parser.add_argument("--model", default="large-v3-turbo", help=f"One of {', '.join(MODELS)}")
+    parser.add_argument("--language", default="fr", help="Language code, 'auto' to detect it")
+    parser.add_argument("--formats", default="txt,json", help=f"Comma-separated, among {','.join(FORMATS)}")
+    parser.add_argument("--output-dir", help="Default: next to each audio file")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--word-timestamps", action="store_true")
+    parser.add_argument("--force", action="store_true", help="Transcribe even if the outputs exist")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the transcription cache")
+    parser.add_argument("--long-form", action="store_true",
+                        help="Stream each file in windows transcribed in parallel (long_form.py)")
+    args = parser.parse_args(argv)
+
+    stats = transcribe_batch(
+        args.paths,
+        model=args.model,
+        language=None if args.language == "auto" else args.language,
+        formats=[fmt.strip() for fmt in args.formats.split(",") if fmt.strip()],
+        output_dir=args.output_dir,
+        workers=args.workers,
+        force=args.force,
+        word_timestamps=args.word_timestamps,
+        use_cache=not args.no_cache,
+        long_form=args.long_form
+    )
+    print(f"\n📊 {stats.summary()}")
+    if stats.transcribed:
+        if get_model_cache().stats:
+            print(f"📊 {get_model_cache().summary()}")
+        if not args.no_cache:
+            print(f"📊 {get_transcription_cache().stats.summary()}")
+
+
+if __name__ == "__main__":
+    main()
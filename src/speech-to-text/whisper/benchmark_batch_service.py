@@ -0,0 +1,88 @@
+"""
+Multi-stream benchmark: throughput vs latency of BatchingService settings.
+
+`--streams` simulated microphones each submit a `--segment-seconds` segment
+every `--segment-seconds` (real time, staggered starts) to one
+BatchingService. The fake backend costs `--call-seconds` per forward pass plus
+`--realtime-factor` x the padded audio of the batch, so batch size 1 pays the
+per-call cost for every segment, like the one-call-per-stream setup.
+
+For each max batch size / max wait, reports the mean batch size, the model
+capacity (seconds of audio per second of model time), the latency from
+submit to result, and the share of segments answered before the next one of
+the same stream arrives (keeping up with real time).
+
+Installation:
+$ uv add numpy
+
+Usage:
+$ uv run benchmark_batch_service.py --streams 32 --batch-sizes 1,4,8,16 --max-waits 0.05,0.2
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from audio_io import SAMPLE_RATE
+from batch_service import BatchingService
+from model_registry import FakeBackend, ModelCache
+
+
+def run_stream(service: BatchingService, stream_id: int, segments: int, segment_seconds: float,
+               delay: float, futures: list):
+    audio = np.zeros(int(segment_seconds * SAMPLE_RATE), dtype=np.float32)
+    start = time.perf_counter() + delay
+    for i in range(1, segments + 1):
+        # Segment i is complete at start + i * segment_seconds
+        time.sleep(max(0.0, start + i * segment_seconds - time.perf_counter()))
+        futures.append(service.submit(stream_id, audio))
+
+
+def run(args, max_batch_size: int, max_wait: float):
+    backend = FakeBackend(realtime_factor=args.realtime_factor, call_seconds=args.call_seconds)
+    service = BatchingService("base", max_batch_size=max_batch_size, max_wait=max_wait,
+                              cache=ModelCache(backend), language="fr")
+    segments = int(args.seconds / args.segment_seconds)
+    futures = []
+    threads = [threading.Thread(target=run_stream,
+                                args=(service, i, segments, args.segment_seconds,
+                                      i / args.streams * args.segment_seconds, futures))
+               for i in range(args.streams)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for future in futures:
+        future.result()
+    service.close()
+
+    stats = service.stats
+    capacity = stats.audio_seconds / stats.busy_seconds if stats.busy_seconds else 0
+    on_time = sum(l <= args.segment_seconds for l in stats.latencies) / len(stats.latencies) * 100
+    print(f"📊 batch ≤{max_batch_size:3d} wait {max_wait * 1000:4.0f} ms | mean batch {stats.mean_batch_size:5.1f} | "
+          f"capacity {capacity:6.1f}x real time | latency p50 {stats.latency(50) * 1000:7.0f} ms "
+          f"p95 {stats.latency(95) * 1000:7.0f} ms | {on_time:5.1f}% within real time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched multi-stream transcription benchmark")
+    parser.add_argument("--streams", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10, help="Audio produced by each stream")
+    parser.add_argument("--segment-seconds", type=float, default=2.0)
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    parser.add_argument("--max-waits", default="0.05,0.2", help="Seconds")
+    parser.add_argument("--call-seconds", type=float, default=0.1, help="Fake cost of one forward pass")
+    parser.add_argument("--realtime-factor", type=float, default=0.005,
+                        help="Fake cost per second of padded audio")
+    args = parser.parse_args()
+
+    print(f"🎧 {args.streams} streams, one {args.segment_seconds}s segment per stream every "
+          f"{args.segment_seconds}s, {args.seconds:.0f}s each\n")
+    for max_wait in (float(w) for w in args.max_waits.split(",")):
+        for max_batch_size in (int(b) for b in args.batch_sizes.split(",")):
+            run(args, max_batch_size, max_wait)
+
+
+if __name__ == "__main__":
+    main()
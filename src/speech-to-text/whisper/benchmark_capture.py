@@ -0,0 +1,137 @@
+"""
+Memory benchmark for the segmented recorder capture loop.
+
+Simulates a multi-hour recording session fed from a fake audio source (no
+microphone needed) and samples the process RSS after every segment, comparing:
+- "frames": the original list of `stream.read(CHUNK)` bytes + b''.join()
+- "ring": the preallocated CaptureRing from capture_buffer.py
+
+Each mode runs in its own process. The ring version should show a flat RSS
+(its preallocated buffers) across the whole session.
+
+Installation:
+$ uv add numpy psutil
+
+Usage:
+$ uv run benchmark_capture.py --hours 3 --segment-seconds 1800
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import psutil
+
+from capture_buffer import CaptureRing, fill_segment
+
+CHUNK = 1024
+RATE = 16000
+
+
+class FakeAudioStream:
+    """Mimics pyaudio's stream.read() with a precomputed noise block"""
+
+    def __init__(self, rate=RATE):
+        rng = np.random.default_rng(0)
+        block = (rng.standard_normal(rate) * 1000).astype(np.int16).tobytes()
+        self._block = block * 2  # Lets reads wrap around without concatenation
+        self.rate = rate
+        self.frames_read = 0
+
+    def read(self, num_frames, exception_on_overflow=True):
+        start = (self.frames_read % self.rate) * 2
+        data = self._block[start:start + num_frames * 2]
+        self.frames_read += num_frames
+        return data
+
+
+def get_memory_usage() -> float:
+    """Get current process memory usage in MB"""
+    return psutil.Process().memory_info().rss / 1024 / 1024
+
+
+def run_frames(stream, segments, segment_samples, consume):
+    """Original capture loop: list of bytes joined per segment"""
+    samples = []
+    for _ in range(segments):
+        frames = []
+        read = 0
+        while read < segment_samples:
+            frames.append(stream.read(CHUNK))
+            read += CHUNK
+        consume(b''.join(frames))
+        del frames
+        samples.append(get_memory_usage())
+    return samples
+
+
+def run_ring(stream, segments, segment_samples, consume):
+    """Preallocated ring buffer capture loop"""
+    ring = CaptureRing(segment_samples, slots=2)
+    samples = []
+    for _ in range(segments):
+        buffer = fill_segment(stream, ring.acquire(), CHUNK)
+        consume(buffer.view())
+        ring.release(buffer)
+        samples.append(get_memory_usage())
+    return samples
+
+
+RUNNERS = {"frames": run_frames, "ring": run_ring}
+
+
+def run_mode(name: str, segments: int, segment_samples: int) -> dict:
+    """Runs one capture loop, in the child process"""
+    peaks = []
+
+    def consume(data):
+        # Stand-in for the WAV writer: sample RSS while the segment is alive
+        memoryview(data).cast('B')
+        peaks.append(get_memory_usage())
+
+    gc.collect()
+    baseline = get_memory_usage()
+    start = time.perf_counter()
+    samples = RUNNERS[name](FakeAudioStream(), segments, segment_samples, consume)
+    return {"baseline": baseline, "peak": max(peaks), "last": samples[-1],
+            "drift": max(samples) - min(samples), "seconds": time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture loop memory benchmark")
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--segment-seconds", type=int, default=1800)
+    parser.add_argument("--child", choices=list(RUNNERS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    segment_samples = args.segment_seconds * RATE
+    segments = max(1, int(args.hours * 3600 // args.segment_seconds))
+
+    if args.child:
+        print(json.dumps(run_mode(args.child, segments, segment_samples)))
+        return
+
+    print(f"🎧 Simulating {args.hours}h session ({segments} segments of {args.segment_seconds}s)\n")
+
+    # Each mode runs in a fresh process: otherwise the second one reuses the
+    # heap freed by the first and its growth doesn't show in the RSS
+    for name in RUNNERS:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name,
+                                 "--hours", str(args.hours), "--segment-seconds", str(args.segment_seconds)],
+                                capture_output=True, text=True, check=True).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(f"📊 {name:6s} peak {r['peak'] - r['baseline']:+7.1f} MB | "
+              f"between segments {r['last'] - r['baseline']:+7.1f} MB | "
+              f"drift {r['drift']:5.1f} MB | {r['seconds']:.1f}s")
+
+    ring_mb = CaptureRing(segment_samples, slots=2).nbytes / 1024 / 1024
+    print(f"\n📦 Ring buffers: {ring_mb:.1f} MB preallocated once for the whole session")
+    print("\n✅ Benchmark complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Per-segment latency benchmark: WAV round-trip vs in-memory hand-off.
+
+"file" reproduces the original pipeline: write segment_NNN.wav, decode it with
+ffmpeg (what mlx_whisper.transcribe does with a path), and read it again with
+soundfile for diarization.
+"memory" converts the captured int16 buffer once to float32 and archives the
+WAV in the background (audio_io.py).
+
+By default only the hand-off is timed, so it runs anywhere ffmpeg is installed.
+Add --transcribe to include a real MLX Whisper transcription (Apple Silicon).
+
+Installation:
+$ brew install ffmpeg
+$ uv add numpy soundfile
+
+Usage:
+$ uv run benchmark_handoff.py --segment-seconds 300 --runs 5
+$ uv run benchmark_handoff.py --segment-seconds 30 --transcribe --model tiny
+"""
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+from audio_io import SAMPLE_RATE, ArchiveWriter, pcm16_to_float32, write_wav
+
+
+def ffmpeg_decode(path: str) -> np.ndarray:
+    """Decodes a file the same way mlx_whisper.audio.load_audio does"""
+    cmd = ["ffmpeg", "-nostdin", "-i", path, "-threads", "0",
+           "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return pcm16_to_float32(out)
+
+
+def file_round_trip(samples, path, transcribe):
+    write_wav(path, samples)
+    whisper_input = ffmpeg_decode(path)
+    waveform, _ = sf.read(path)  # Diarization path
+    if transcribe:
+        transcribe(path)
+    return whisper_input, waveform
+
+
+def in_memory(samples, path, transcribe, archive):
+    audio = pcm16_to_float32(samples)
+    archive.submit(path, samples)
+    if transcribe:
+        transcribe(audio)
+    return audio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Segment hand-off latency benchmark")
+    parser.add_argument("--segment-seconds", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--transcribe", action="store_true", help="Include an MLX Whisper transcription")
+    parser.add_argument("--model", default="tiny")
+    args = parser.parse_args()
+
+    transcribe = None
+    if args.transcribe:
+        import mlx_whisper
+
+        repo = f"mlx-community/whisper-{args.model}-mlx"
+
+        def transcribe(audio):
+            mlx_whisper.transcribe(audio, path_or_hf_repo=repo, language="fr")
+
+        transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32))  # Warmup: load the model
+
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal(args.segment_seconds * SAMPLE_RATE) * 1000).astype(np.int16)
+
+    print(f"🎧 {args.runs} segments of {args.segment_seconds}s"
+          f"{' + transcription (' + args.model + ')' if transcribe else ''}\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        timings = {"file": [], "memory": []}
+        archive = ArchiveWriter()
+        for i in range(args.runs):
+            start = time.perf_counter()
+            file_round_trip(samples, os.path.join(tmp, f"file_{i:03d}.wav"), transcribe)
+            timings["file"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            in_memory(samples, os.path.join(tmp, f"memory_{i:03d}.wav"), transcribe, archive)
+            timings["memory"].append(time.perf_counter() - start)
+        archive.close()
+
+    for name, values in timings.items():
+        print(f"📊 {name:6s} avg {np.mean(values) * 1000:8.1f} ms | "
+              f"min {min(values) * 1000:8.1f} ms | max {max(values) * 1000:8.1f} ms")
+
+    speedup = np.mean(timings["file"]) / np.mean(timings["memory"])
+    print(f"\n🏆 In-memory hand-off is {speedup:.1f}x faster per segment")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Long-file benchmark: whole-file decode vs chunked long-form transcription.
+
+Writes a synthetic multi-hour WAV (noise bursts and silences, written block by
+block) and transcribes it with the "fake" backend, which sleeps
+`realtime_factor` x audio duration instead of running a model:
+- "full": the original path, the whole file decoded to one float32 array and
+  handed to a single transcribe() call
+- "chunked": long_form.transcribe_long(), streaming windows on a process pool
+
+Each mode runs in its own subprocess; the peak RSS of that process and its
+children is sampled from here.
+
+Installation:
+$ uv add numpy psutil
+
+Usage:
+$ uv run benchmark_long_form.py --hours 3 --workers 4
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from audio_io import SAMPLE_RATE, pcm16_to_float32
+from process_monitor import run_and_sample_rss
+
+
+def write_synthetic_wav(path: str, hours: float, seed: int = 0):
+    """Alternating 1-10 s noise bursts and 0.2-2 s silences, one minute at a time"""
+    rng = np.random.default_rng(seed)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        for _ in range(int(hours * 60)):
+            block = np.zeros(60 * SAMPLE_RATE, dtype=np.int16)
+            t = 0
+            while t < len(block):
+                burst = int(rng.uniform(1, 10) * SAMPLE_RATE)
+                block[t:t + burst] = (rng.standard_normal(len(block[t:t + burst])) * 3000).astype(np.int16)
+                t += burst + int(rng.uniform(0.2, 2) * SAMPLE_RATE)
+            wf.writeframes(block.tobytes())
+
+
+def run_mode(mode: str, path: str, workers: int, realtime_factor: float, window: float) -> dict:
+    """Runs in the child process, prints its results as JSON"""
+    start = time.perf_counter()
+    if mode == "full":
+        from model_registry import get_model_cache
+
+        cache = get_model_cache("fake", realtime_factor=realtime_factor)
+        with wave.open(path, "rb") as wf:
+            audio = pcm16_to_float32(wf.readframes(wf.getnframes()))
+        result = cache.transcribe("base", audio, language="fr")
+        first_text = time.perf_counter() - start
+    else:
+        from long_form import transcribe_long
+
+        result = transcribe_long(path, "base", "fr", window_seconds=window, workers=workers,
+                                 backend="fake", realtime_factor=realtime_factor)
+        first_text = result["stats"]["first_text_seconds"]
+    return {"seconds": time.perf_counter() - start, "first_text": first_text}
+
+
+def measure(mode: str, args, path: str) -> dict:
+    """Runs one mode in a subprocess and samples its peak RSS (children included)"""
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", mode, "--file", path,
+           "--workers", str(args.workers), "--realtime-factor", str(args.realtime_factor),
+           "--window", str(args.window)]
+    run = run_and_sample_rss(cmd)
+    if run.returncode:
+        raise RuntimeError(f"{mode} failed: {run.last_error()}")
+    return {**json.loads(run.output.strip().splitlines()[-1]), "peak_mb": run.peak_mb}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-form transcription benchmark")
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--realtime-factor", type=float, default=0.002,
+                        help="Fake model time per second of audio")
+    parser.add_argument("--window", type=float, default=30)
+    parser.add_argument("--file", help="Existing WAV file instead of a synthetic one")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child, args.file, args.workers, args.realtime_factor, args.window)))
+        return
+
+    path = args.file
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.wav")
+        print(f"🎧 Writing {args.hours}h of synthetic audio to {path}...")
+        write_synthetic_wav(path, args.hours)
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"🎧 {size_mb:.0f} MB file, fake model at {args.realtime_factor} x real time, "
+          f"{args.workers} workers\n")
+
+    for mode in ("full", "chunked"):
+        result = measure(mode, args, path)
+        print(f"📊 {mode:8s} {result['seconds']:6.1f}s | first text after {result['first_text']:6.1f}s | "
+              f"peak RSS {result['peak_mb']:7.0f} MB")
+
+    if args.file is None:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
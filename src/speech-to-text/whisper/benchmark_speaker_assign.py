@@ -0,0 +1,93 @@
+"""
+Speaker assignment benchmark: linear scan vs SpeakerIndex.
+
+Builds an hour-long synthetic diarization (random turns, a few overlaps) and
+Whisper-like segments with word timestamps, then times:
+- "scan": the original get_speaker_for_time(), every turn for every segment
+- "index/segment": SpeakerIndex.speaker_for_interval() per segment
+- "index/word": split_by_speaker(), one speaker per word
+
+Usage:
+$ uv run benchmark_speaker_assign.py --hours 1 --speakers 4
+"""
+import argparse
+import random
+import time
+
+from speaker_index import SpeakerIndex, split_by_speaker
+
+
+def make_turns(hours, speakers, seed=0):
+    rng = random.Random(seed)
+    turns, t = [], 0.0
+    while t < hours * 3600:
+        length = rng.uniform(1, 20)
+        speaker = f"SPEAKER_{rng.randrange(speakers):02d}"
+        turns.append((t, t + length, speaker))
+        # Occasional overlapping speech
+        if rng.random() < 0.1:
+            turns.append((t + length * 0.8, t + length + 1, f"SPEAKER_{rng.randrange(speakers):02d}"))
+        t += length + rng.uniform(0, 1)
+    return turns
+
+
+def make_segments(hours, seed=1):
+    rng = random.Random(seed)
+    segments, t = [], 0.0
+    while t < hours * 3600:
+        words = []
+        for _ in range(rng.randint(5, 25)):
+            words.append({"word": " mot", "start": t, "end": t + 0.25})
+            t += 0.3
+        segments.append({"start": words[0]["start"], "end": words[-1]["end"],
+                         "text": "".join(w["word"] for w in words), "words": words})
+        t += rng.uniform(0, 1)
+    return segments
+
+
+def get_speaker_for_time(turns, start, end):
+    """Original implementation from transcribe-with-diarization.py"""
+    speaker_time = {}
+    for turn_start, turn_end, speaker in turns:
+        overlap_start = max(turn_start, start)
+        overlap_end = min(turn_end, end)
+        if overlap_start < overlap_end:
+            speaker_time[speaker] = speaker_time.get(speaker, 0) + overlap_end - overlap_start
+    if not speaker_time:
+        return "Unknown Speaker"
+    return max(speaker_time, key=speaker_time.get)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speaker assignment benchmark")
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--speakers", type=int, default=4)
+    args = parser.parse_args()
+
+    turns = make_turns(args.hours, args.speakers)
+    segments = make_segments(args.hours)
+    words = sum(len(s["words"]) for s in segments)
+    print(f"🎧 {args.hours}h: {len(turns)} turns, {len(segments)} segments, {words} words\n")
+
+    scan, scan_time = timed(lambda: [get_speaker_for_time(turns, s["start"], s["end"]) for s in segments])
+    index, build_time = timed(lambda: SpeakerIndex(turns))
+    per_segment, segment_time = timed(lambda: [index.speaker_for_interval(s["start"], s["end"]) for s in segments])
+    per_word, word_time = timed(lambda: split_by_speaker(segments, index))
+
+    agreement = sum(a == b for a, b in zip(scan, per_segment)) / len(scan) * 100
+    print(f"📊 scan           {scan_time * 1000:9.1f} ms")
+    print(f"📊 index build    {build_time * 1000:9.1f} ms")
+    print(f"📊 index/segment  {segment_time * 1000:9.1f} ms  ({scan_time / segment_time:.0f}x faster, "
+          f"{agreement:.1f}% same speakers)")
+    print(f"📊 index/word     {word_time * 1000:9.1f} ms  ({len(per_word)} speaker runs "
+          f"from {len(segments)} segments)")
+
+
+if __name__ == "__main__":
+    main()
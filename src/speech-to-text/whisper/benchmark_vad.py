@@ -0,0 +1,82 @@
+"""
+VAD segmentation benchmark on recorded fixtures.
+
+For each 16 kHz mono WAV file (e.g. the segment_NNN.wav files of a session),
+reports how much audio the VAD segmenter skips and the resulting reduction of
+audio handed to Whisper. With --transcribe, both the fixed-duration and the
+VAD segmentations are actually transcribed and timed.
+
+Usage:
+$ uv run benchmark_vad.py transcriptions/session_20251121_145218/*.wav
+$ uv run benchmark_vad.py recording.wav --detector webrtc --transcribe --model base
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from audio_io import pcm16_to_float32
+from vad import DETECTORS, SAMPLE_RATE, segment_file
+
+
+def transcribe_all(cache, model, chunks):
+    start = time.perf_counter()
+    for chunk in chunks:
+        cache.transcribe(model, pcm16_to_float32(chunk), language="fr")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD segmentation benchmark")
+    parser.add_argument("files", nargs="+", help="16 kHz mono WAV files or directories")
+    parser.add_argument("--detector", default="rms", choices=list(DETECTORS))
+    parser.add_argument("--min-seconds", type=float, default=5)
+    parser.add_argument("--max-seconds", type=float, default=30)
+    parser.add_argument("--transcribe", action="store_true", help="Time real transcriptions")
+    parser.add_argument("--model", default="base")
+    args = parser.parse_args()
+
+    files = []
+    for name in args.files:
+        path = Path(name)
+        files.extend(sorted(path.glob("*.wav")) if path.is_dir() else [path])
+
+    cache = None
+    if args.transcribe:
+        from model_registry import get_model_cache
+
+        cache = get_model_cache()
+        cache.warmup([args.model])
+
+    total = speech = vad_time = fixed_time = speech_time = 0.0
+    for path in files:
+        start = time.perf_counter()
+        segments, stats = segment_file(str(path), DETECTORS[args.detector](),
+                                       min_seconds=args.min_seconds, max_seconds=args.max_seconds)
+        vad_time += time.perf_counter() - start
+        total += stats.total_seconds
+        speech += stats.speech_seconds
+        print(f"📄 {path.name}: {stats.summary()}")
+
+        if cache:
+            import wave
+
+            with wave.open(str(path), 'rb') as wf:
+                samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+            window = int(args.max_seconds * SAMPLE_RATE)
+            fixed = [samples[i:i + window] for i in range(0, len(samples), window)]
+            fixed_time += transcribe_all(cache, args.model, fixed)
+            speech_time += transcribe_all(cache, args.model, [s.samples for s in segments])
+
+    print(f"\n📊 {len(files)} files, {total:.0f}s recorded, {total - speech:.0f}s silence skipped "
+          f"({(total - speech) / total * 100 if total else 0:.0f}%)")
+    print(f"📊 Audio to transcribe: {total / speech if speech else float('inf'):.2f}x less")
+    print(f"📊 VAD cost: {vad_time:.2f}s ({total / vad_time if vad_time else 0:.0f}x real time)")
+    if cache:
+        print(f"📊 Transcription: fixed {fixed_time:.1f}s vs VAD {speech_time:.1f}s "
+              f"({fixed_time / speech_time if speech_time else 0:.2f}x throughput gain)")
+
+
+if __name__ == "__main__":
+    main()
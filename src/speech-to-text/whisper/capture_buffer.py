@@ -0,0 +1,110 @@
+"""
+Preallocated capture buffers for segmented recording.
+
+Instead of appending every `stream.read(CHUNK)` result to a list and joining
+the bytes at the end of each segment, the recorder copies each chunk straight
+into a fixed-size int16 NumPy array. A small ring of these arrays is allocated
+once per session: the recorder fills one slot while the writer and the
+transcriber read the previous ones through zero-copy views.
+
+Memory usage is therefore fixed at `slots * segment_samples * 2` bytes for the
+whole session, whatever its length.
+
+Installation:
+$ uv add numpy
+"""
+import threading
+
+import numpy as np
+
+
+class SegmentBuffer:
+    """A fixed-capacity int16 buffer holding the samples of one segment"""
+
+    def __init__(self, capacity: int, channels: int = 1):
+        self.capacity = capacity
+        self.channels = channels
+        self.samples = np.empty(capacity * channels, dtype=np.int16)
+        self.samples.fill(0)  # Touch every page now rather than mid-session
+        self.length = 0
+        self.index = 0
+
+    @property
+    def is_full(self) -> bool:
+        return self.length >= self.capacity * self.channels
+
+    @property
+    def free(self) -> int:
+        """Number of free int16 values left in the buffer"""
+        return self.capacity * self.channels - self.length
+
+    def write(self, data) -> int:
+        """
+        Copies raw PCM16 bytes (or an int16 array) into the buffer.
+        Returns the number of values written; extra values are dropped.
+        """
+        chunk = np.frombuffer(data, dtype=np.int16) if isinstance(data, (bytes, bytearray, memoryview)) else data
+        count = min(len(chunk), self.free)
+        self.samples[self.length:self.length + count] = chunk[:count]
+        self.length += count
+        return count
+
+    def view(self) -> np.ndarray:
+        """Zero-copy view on the samples recorded so far"""
+        return self.samples[:self.length]
+
+    def reset(self):
+        self.length = 0
+
+
+class CaptureRing:
+    """
+    A ring of preallocated segment buffers.
+
+    `acquire()` hands out the next free slot to the recorder, `release()` gives
+    it back once the writer and transcriber are done with it. When every slot
+    is busy, `acquire()` blocks until one is released, so a slow consumer slows
+    the recorder down instead of growing memory.
+    """
+
+    def __init__(self, segment_samples: int, slots: int = 3, channels: int = 1):
+        self.buffers = [SegmentBuffer(segment_samples, channels) for _ in range(slots)]
+        for i, buffer in enumerate(self.buffers):
+            buffer.index = i
+        self._free = list(self.buffers)
+        self._cond = threading.Condition()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.samples.nbytes for buffer in self.buffers)
+
+    def acquire(self, timeout: float = None) -> SegmentBuffer:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._free, timeout=timeout):
+                raise TimeoutError("No free capture buffer (consumers are too slow)")
+            buffer = self._free.pop(0)
+        buffer.reset()
+        return buffer
+
+    def release(self, buffer: SegmentBuffer):
+        with self._cond:
+            if buffer not in self._free:
+                self._free.append(buffer)
+            self._cond.notify()
+
+
+def fill_segment(stream, buffer: SegmentBuffer, chunk: int, should_continue=lambda: True,
+                 clock=None) -> SegmentBuffer:
+    """
+    Reads `chunk` frames at a time from `stream` into `buffer` until the
+    buffer is full or `should_continue()` returns False. With a CaptureClock,
+    reads go through `clock.read()` so frames and overflows are counted.
+    """
+    while not buffer.is_full and should_continue():
+        frames = min(chunk, buffer.free // buffer.channels)
+        if clock is not None:
+            buffer.write(clock.read(stream, frames))
+        else:
+            # Don't raise if the input overflowed while a consumer held us up
+            buffer.write(stream.read(frames, exception_on_overflow=False))
+    return buffer
@@ -0,0 +1,82 @@
+"""
+Sample-count based capture clock.
+
+The recorders used to measure segment length with time.time() while blocked
+on stream.read(), so segment durations drifted and input overflows (audio
+dropped by PortAudio while we were busy) went unnoticed. CaptureClock counts
+the frames actually read: session time is frames_read / rate, which gives
+absolute, drift-free timestamps for every segment.
+
+It also keeps counters for the anomalies of long sessions:
+- overflows: PortAudio dropped input audio while we were busy. PyAudio's
+  blocking read doesn't report it without losing the chunk, so it is found
+  from the drift once the input buffer is drained, and the lost frames are
+  added to the clock
+- underruns: a read returned fewer frames than requested
+- drift: wall-clock time elapsed minus audio time read; if it keeps growing,
+  the capture is losing audio
+"""
+import time
+from datetime import datetime, timedelta
+
+
+class CaptureClock:
+    """Counts frames read from an input stream"""
+
+    def __init__(self, rate: int = 16000, channels: int = 1, sample_width: int = 2,
+                 overflow_tolerance: float = 0.25):
+        self.rate = rate
+        self.overflow_tolerance = overflow_tolerance  # Drift (seconds) taken as lost audio
+        self.frame_bytes = channels * sample_width
+        self.frames_read = 0
+        self.overflows = 0
+        self.underruns = 0
+        self.frames_lost = 0
+        self.started_at = datetime.now()
+        self._start = None
+
+    @property
+    def seconds(self) -> float:
+        """Audio time read since the start of the session"""
+        return self.frames_read / self.rate
+
+    @property
+    def drift(self) -> float:
+        """Wall-clock seconds elapsed minus audio seconds read"""
+        if self._start is None:
+            return 0.0
+        return (time.monotonic() - self._start) - self.seconds
+
+    def wall_time(self, seconds: float) -> datetime:
+        """Wall-clock time of a session timestamp"""
+        return self.started_at + timedelta(seconds=seconds)
+
+    def read(self, stream, frames: int) -> bytes:
+        """stream.read() that advances the clock and counts overflows/underruns"""
+        if self._start is None:
+            self._start = time.monotonic()
+            self.started_at = datetime.now()
+        # With exception_on_overflow=True PyAudio throws away the frames it did
+        # read, so read them all and find the lost audio with the drift instead
+        before = time.monotonic()
+        data = stream.read(frames, exception_on_overflow=False)
+        waited = time.monotonic() - before
+
+        read = len(data) // self.frame_bytes
+        if read < frames:
+            self.underruns += 1
+        self.frames_read += read
+        # A read that had to wait for audio means nothing is buffered anymore:
+        # any drift left is audio PortAudio dropped. Skip the clock over it so
+        # the timestamps that follow stay aligned with wall-clock time.
+        if waited >= read / self.rate / 2 and self.drift > self.overflow_tolerance:
+            lost = int(self.drift * self.rate)
+            self.overflows += 1
+            self.frames_lost += lost
+            self.frames_read += lost
+        return data
+
+    def summary(self) -> str:
+        return (f"{self.seconds:.1f}s captured, {self.overflows} overflows "
+                f"({self.frames_lost / self.rate:.1f}s lost), "
+                f"{self.underruns} underruns, drift {self.drift:+.2f}s")
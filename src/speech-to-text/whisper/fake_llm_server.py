@@ -0,0 +1,214 @@
+"""
+Stand-in LLM server for trying structure_transcription.py offline.
+
+Answers both APIs used by llm_backends.py, streamed (Server-Sent Events) or not:
+- Anthropic Messages: POST /v1/messages
+- OpenAI-compatible chat completions: POST /v1/chat/completions (as served by
+  mlx_lm.server and Ollama)
+
+The answer is deterministic markdown built from the prompt, sent after
+`latency` seconds and then at `tokens_per_second`, like a real model.
+`fail_rate` answers that share of requests with a 503 to exercise retries.
+Requests are served concurrently over HTTP/1.1 keep-alive; the peak number of
+requests in flight and the number of TCP connections opened are tracked, so
+the caller's concurrency and connection pooling can be checked.
+
+Usage:
+$ uv run fake_llm_server.py --port 8080 --latency 0.5 --tokens-per-second 200
+$ uv run structure_transcription.py transcription.txt --backend openai --base-url http://localhost:8080/v1
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Tuple
+
+CHARS_PER_TOKEN = 4
+PIECE_TOKENS = 4  # Tokens per streamed event
+
+
+def fake_completion(prompt: str, max_chars: int = 1200) -> str:
+    """Markdown section built from the last paragraph of the prompt"""
+    paragraphs = [p.strip() for p in prompt.split("\n\n") if p.strip()]
+    excerpt = paragraphs[-1] if paragraphs else ""
+    title = " ".join(excerpt.split()[:6]) or "Section"
+    return f"## {title}\n\n{excerpt[:max_chars]}\n"
+
+
+def _sse(data: dict, event: str = None) -> bytes:
+    return ((f"event: {event}\n" if event else "") + f"data: {json.dumps(data)}\n\n").encode("utf-8")
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.5, tokens_per_second: float = 200, fail_rate: float = 0.0):
+        super().__init__(address, FakeLLMHandler)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.fail_rate = fail_rate
+        self.requests = 0
+        self.failures = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def summary(self) -> str:
+        return (f"{self.requests} requests ({self.failures} failed on purpose) over {self.connections} "
+                f"connections, {self.max_in_flight} at most in flight")
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    server: FakeLLMServer
+    protocol_version = "HTTP/1.1"  # Keep-alive, so clients can pool connections
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        path = self.path.rstrip("/")
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if path not in ("/v1/messages", "/v1/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {path}"}})
+            return
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            fail = random.random() < server.fail_rate
+            server.failures += fail
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.latency)
+            if fail:
+                self._send_json(503, {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}})
+                return
+            prompt = "\n\n".join(m["content"] if isinstance(m["content"], str)
+                                 else "".join(part.get("text", "") for part in m["content"])
+                                 for m in body["messages"])
+            text = fake_completion(prompt, max_chars=body.get("max_tokens", 1024) * CHARS_PER_TOKEN)
+            usage = (len(prompt) // CHARS_PER_TOKEN + 1, len(text) // CHARS_PER_TOKEN + 1)
+            anthropic = path == "/v1/messages"
+            if body.get("stream"):
+                self._start_stream()
+                events = self._anthropic_events if anthropic else self._openai_events
+                for event in events(body, text, usage):
+                    self._write_chunk(event)
+                self._write_chunk(b"")
+            else:
+                time.sleep(usage[1] / server.tokens_per_second)
+                self._send_json(200, self._anthropic_message(body, text, usage) if anthropic
+                                else self._openai_completion(body, text, usage))
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    # ---- responses ----
+
+    def _send_json(self, status: int, data: dict):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _pieces(self, text: str) -> Iterator[str]:
+        """The text a few tokens at a time, at the server's token rate"""
+        size = PIECE_TOKENS * CHARS_PER_TOKEN
+        for i in range(0, len(text), size):
+            time.sleep(PIECE_TOKENS / self.server.tokens_per_second)
+            yield text[i:i + size]
+
+    def _anthropic_message(self, body, text, usage):
+        return {
+            "id": f"msg_fake_{self.server.requests}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "fake"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": usage[0], "output_tokens": usage[1]}
+        }
+
+    def _anthropic_events(self, body, text, usage) -> Iterator[bytes]:
+        message = {**self._anthropic_message(body, "", usage), "content": [], "stop_reason": None}
+        message["usage"]["output_tokens"] = 1
+        yield _sse({"type": "message_start", "message": message}, "message_start")
+        yield _sse({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+                   "content_block_start")
+        for piece in self._pieces(text):
+            yield _sse({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": piece}},
+                       "content_block_delta")
+        yield _sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+        yield _sse({"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": usage[1]}}, "message_delta")
+        yield _sse({"type": "message_stop"}, "message_stop")
+
+    def _openai_completion(self, body, text, usage):
+        return {
+            "id": f"chatcmpl-fake-{self.server.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": usage[0], "completion_tokens": usage[1], "total_tokens": sum(usage)}
+        }
+
+    def _openai_events(self, body, text, usage) -> Iterator[bytes]:
+        chunk = {"id": f"chatcmpl-fake-{self.server.requests}", "object": "chat.completion.chunk",
+                 "created": int(time.time()), "model": body.get("model", "fake")}
+        for piece in self._pieces(text):
+            yield _sse({**chunk, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]})
+        yield _sse({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        yield b"data: [DONE]\n\n"
+
+
+def start_server(port: int = 0, **options) -> Tuple[FakeLLMServer, threading.Thread]:
+    """Starts a server on a background thread (port 0: any free port)"""
+    server = FakeLLMServer(("127.0.0.1", port), **options)
+    thread = threading.Thread(target=server.serve_forever, name="fake-llm", daemon=True)
+    thread.start()
+    return server, thread
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in LLM server")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with a 503")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(("127.0.0.1", args.port), latency=args.latency,
+                           tokens_per_second=args.tokens_per_second, fail_rate=args.fail_rate)
+    print(f"🤖 Fake LLM listening on {server.url} (/v1/messages, /v1/chat/completions)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n✅ Stopped: {server.summary()}")
@@ -0,0 +1,233 @@
+"""
+LLM backends for structure_transcription.py.
+
+The same prompts run against:
+- "anthropic[:model]": Claude through the Anthropic API ($ANTHROPIC_API_KEY)
+- "openai[:model]": any OpenAI-compatible server, by default mlx_lm.server on
+  http://localhost:8080/v1 as in agno/mlx/benchmark.py ($OPENAI_BASE_URL)
+- "ollama[:model]": Ollama's OpenAI-compatible endpoint on http://localhost:11434/v1
+
+Every backend streams: complete() writes the text to a file as the tokens
+arrive (e.g. to follow a long request with `tail -f`) and returns it. Each
+backend keeps one pool of keep-alive connections sized for the concurrency of
+the caller, and retries connection errors, 429 and 5xx responses with
+exponential backoff and full jitter (random delay up to base x 2^attempt),
+so parallel requests that failed together don't retry together. A retried
+request rewrites its file from the start.
+
+Installation:
+$ uv add anthropic httpx
+
+Usage:
+    backend = create_backend("ollama:llama3.1:8b", concurrency=4)
+    text = await backend.complete(prompt, max_tokens=4000, path="part_001.md")
+    await backend.aclose()
+"""
+import asyncio
+import json
+import os
+import random
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import httpx
+
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class LLMError(Exception):
+    """A request failed for good (retries exhausted or not retryable)"""
+
+
+class RetryableError(Exception):
+    pass
+
+
+class StreamSink:
+    """Text file written as the tokens arrive, restarted when a request is retried"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self._file = None
+        self.parts = []
+
+    def restart(self):
+        self.parts = []
+        if self.path:
+            if self._file:
+                self._file.close()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8")
+
+    def write(self, text: str):
+        self.parts.append(text)
+        if self._file:
+            self._file.write(text)
+            self._file.flush()
+
+    def close(self) -> str:
+        if self._file:
+            self._file.close()
+            self._file = None
+        return "".join(self.parts)
+
+
+class LLMBackend:
+    """
+    Args:
+        model: Model name for the server
+        concurrency: Requests the caller runs in parallel (size of the connection pool)
+        max_retries: Retries of a failed request
+        base_delay, max_delay: Backoff bounds in seconds
+        timeout: Seconds without data before a request fails
+    """
+    name = "base"
+    default_model = None
+
+    def __init__(self, model: Optional[str] = None, concurrency: int = 4, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 30.0, timeout: float = 600.0):
+        self.model = model or self.default_model
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.retries = 0
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+
+    def _stream(self, prompt: str, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    async def complete(self, prompt: str, max_tokens: int = 8000, temperature: float = 0.3, path=None) -> str:
+        """Streams the answer to `prompt` into `path` (if given) and returns it"""
+        sink = StreamSink(path)
+        for attempt in range(self.max_retries + 1):
+            sink.restart()
+            try:
+                async for text in self._stream(prompt, max_tokens, temperature):
+                    sink.write(text)
+                return sink.close()
+            except RetryableError as e:
+                if attempt == self.max_retries:
+                    sink.close()
+                    raise LLMError(f"{self.name}: {e} (after {attempt} retries)") from e
+                self.retries += 1
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                print(f"  ⚠️  {self.name}: {e}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except BaseException:
+                sink.close()
+                raise
+
+    async def aclose(self):
+        pass
+
+    def __repr__(self):
+        return f"{self.name}:{self.model}"
+
+
+class AnthropicBackend(LLMBackend):
+    name = "anthropic"
+    default_model = "claude-sonnet-4-20250514"
+
+    def __init__(self, model=None, api_key: Optional[str] = None, base_url: Optional[str] = None, **options):
+        super().__init__(model, **options)
+        import anthropic
+
+        self._anthropic = anthropic
+        # Retries are done here, with jitter, like the other backends
+        self.client = anthropic.AsyncAnthropic(
+            api_key=api_key or os.getenv("ANTHROPIC_API_KEY"), base_url=base_url, max_retries=0,
+            http_client=httpx.AsyncClient(limits=self._limits(), timeout=self.timeout))
+
+    async def _stream(self, prompt, max_tokens, temperature):
+        anthropic = self._anthropic
+        try:
+            async with self.client.messages.stream(
+                model=self.model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=[{"role": "user", "content": prompt}]
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+        except anthropic.APIStatusError as e:
+            if e.status_code in RETRY_STATUS:
+                raise RetryableError(f"HTTP {e.status_code}") from e
+            raise LLMError(f"{self.name}: {e}") from e
+        except anthropic.APIConnectionError as e:
+            raise RetryableError(str(e) or type(e).__name__) from e
+
+    async def aclose(self):
+        await self.client.close()
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """/chat/completions with stream=True (Server-Sent Events)"""
+    name = "openai"
+    default_model = "default_model"  # mlx_lm.server answers with the model it was started with
+    default_base_url = "http://localhost:8080/v1"
+
+    def __init__(self, model=None, base_url: Optional[str] = None, api_key: Optional[str] = None, **options):
+        super().__init__(model, **options)
+        base_url = base_url or os.getenv("OPENAI_BASE_URL") or self.default_base_url
+        headers = {"Authorization": f"Bearer {api_key or os.getenv('OPENAI_API_KEY') or 'not-needed'}"}
+        self.client = httpx.AsyncClient(base_url=base_url.rstrip("/"), headers=headers,
+                                        limits=self._limits(), timeout=self.timeout)
+
+    async def _stream(self, prompt, max_tokens, temperature):
+        body = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True
+        }
+        try:
+            async with self.client.stream("POST", "/chat/completions", json=body) as response:
+                if response.status_code >= 400:
+                    # Read to the end, so the connection goes back to the pool
+                    await response.aread()
+                    if response.status_code in RETRY_STATUS:
+                        raise RetryableError(f"HTTP {response.status_code}")
+                    raise LLMError(f"{self.name}: HTTP {response.status_code} {response.text[:200]}")
+                async for line in response.aiter_lines():
+                    data = line[5:].strip() if line.startswith("data:") else ""
+                    if not data or data == "[DONE]":
+                        continue
+                    choices = json.loads(data).get("choices") or [{}]
+                    text = (choices[0].get("delta") or {}).get("content")
+                    if text:
+                        yield text
+        except httpx.TransportError as e:
+            raise RetryableError(str(e) or type(e).__name__) from e
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class OllamaBackend(OpenAICompatibleBackend):
+    name = "ollama"
+    default_model = "llama3.1:8b"
+    default_base_url = "http://localhost:11434/v1"
+
+    def __init__(self, model=None, base_url: Optional[str] = None, **options):
+        super().__init__(model, base_url=base_url or os.getenv("OLLAMA_BASE_URL") or self.default_base_url,
+                         **options)
+
+
+BACKENDS = {
+    "anthropic": AnthropicBackend,
+    "openai": OpenAICompatibleBackend,
+    "ollama": OllamaBackend,
+}
+
+
+def create_backend(spec: str = "anthropic", **options) -> LLMBackend:
+    """Backend from a "<name>[:<model>]" spec, e.g. "ollama:qwen2.5:7b" """
+    name, _, model = spec.partition(":")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}', expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](model or None, **options)
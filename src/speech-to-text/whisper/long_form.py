@@ -0,0 +1,172 @@
+"""
+Chunked transcription of long audio files.
+
+Handing a multi-hour MP3 to mlx_whisper.transcribe() decodes the whole file
+into one float32 array (230 MB per hour at 16 kHz) and transcribes it serially.
+Here the file is streamed from ffmpeg (audio_stream.py) in fixed windows that
+overlap by a few seconds. Windows are transcribed in parallel (a process pool
+on CPU backends, where each process keeps its own resident model; a single
+thread on MLX, which already uses the whole GPU) and stitched back into one
+timeline with the word timestamps (stitching.py). Only a few windows are in flight at any
+time, so memory stays bounded whatever the length of the file.
+
+Installation:
+$ brew install ffmpeg
+$ uv add numpy
+
+Usage:
+$ uv run long_form.py podcast.mp3 --model large-v3-turbo --window 30 --workers 4
+$ uv run batch_transcribe.py ~/Recordings --long-form   # same, for every file
+"""
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from audio_io import SAMPLE_RATE
+from audio_stream import open_audio
+from model_registry import default_backend_name, get_model_cache, resolve_model
+from stitching import TranscriptStitcher, words_to_text
+
+# Backends that run on the CPU and scale with processes
+PROCESS_BACKENDS = ("faster-whisper", "fake")
+
+
+# ============================================================
+# WORKERS
+# ============================================================
+
+_worker_model = None
+
+
+def _init_worker(backend: str, backend_options: dict, model_name: str):
+    """Loads the model once per worker process"""
+    global _worker_model
+    _worker_model = model_name
+    get_model_cache(backend, **backend_options).warmup([model_name])
+
+
+def _transcribe_window(audio: np.ndarray, options: dict) -> dict:
+    return get_model_cache().transcribe(_worker_model, audio, **options)
+
+
+# ============================================================
+# LONG-FORM TRANSCRIPTION
+# ============================================================
+
+def words_to_segments(words: List[dict], max_gap: float = 1.0, max_words: int = 40) -> List[dict]:
+    """Groups stitched words into segments, cut on sentence ends, pauses and length"""
+    segments, current = [], []
+    for i, word in enumerate(words):
+        current.append(word)
+        next_word = words[i + 1] if i + 1 < len(words) else None
+        if (next_word is None or len(current) >= max_words
+                or next_word["start"] - word["end"] > max_gap
+                or word["word"].strip().endswith((".", "?", "!"))):
+            segments.append({"id": len(segments), "start": current[0]["start"], "end": current[-1]["end"],
+                             "text": words_to_text(current), "words": current})
+            current = []
+    return segments
+
+
+def transcribe_long(path: str, model: str = "large-v3-turbo", language: Optional[str] = "fr",
+                    window_seconds: float = 30, overlap_seconds: float = 2, workers: int = 2,
+                    backend: Optional[str] = None, on_words=None, **backend_options) -> dict:
+    """
+    Transcribes a file of any length window by window (see the module docstring).
+    `on_words(words)` is called with each batch of final words as soon as they
+    are stitched. Returns a result in the mlx_whisper format plus "stats".
+    """
+    backend = backend or default_backend_name()
+    model_name = resolve_model(model)
+    options = {"language": language, "word_timestamps": True}
+
+    if backend in PROCESS_BACKENDS and workers > 1:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                       initargs=(backend, backend_options, model_name))
+    else:
+        # MLX (or a single worker): one thread on the shared model
+        _init_worker(backend, backend_options, model_name)
+        workers = 1
+        executor = ThreadPoolExecutor(1)
+
+    stitcher = TranscriptStitcher(overlap_seconds)
+    words: List[dict] = []
+    in_flight = deque()
+    start = time.perf_counter()
+    first_text = None
+    duration = 0.0
+    windows = 0
+
+    def collect():
+        nonlocal first_text
+        num, offset, length, future = in_flight.popleft()
+        final = stitcher.add(num, offset, length, future.result())
+        if final:
+            first_text = first_text or time.perf_counter() - start
+            words.extend(final)
+            if on_words:
+                on_words(final)
+
+    try:
+        with open_audio(path) as source:
+            for offset, audio in source.windows(window_seconds, overlap_seconds):
+                windows += 1
+                length = len(audio) / SAMPLE_RATE
+                duration = offset + length
+                in_flight.append((windows, offset, length, executor.submit(_transcribe_window, audio, options)))
+                # Bounded memory: at most two windows per worker decoded ahead
+                while len(in_flight) >= workers * 2:
+                    collect()
+        while in_flight:
+            collect()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    tail = stitcher.flush()
+    words.extend(tail)
+    if tail and on_words:
+        on_words(tail)
+    elapsed = time.perf_counter() - start
+    return {
+        "text": words_to_text(words),
+        "segments": words_to_segments(words),
+        "language": language,
+        "stats": {
+            "duration": duration,
+            "windows": windows,
+            "seconds": elapsed,
+            "realtime_factor": elapsed / duration if duration else 0,
+            "first_text_seconds": first_text
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked transcription of a long audio file")
+    parser.add_argument("path")
+    parser.add_argument("--model", default="large-v3-turbo")
+    parser.add_argument("--language", default="fr")
+    parser.add_argument("--window", type=float, default=30, help="Window length in seconds")
+    parser.add_argument("--overlap", type=float, default=2, help="Overlap between windows in seconds")
+    parser.add_argument("--workers", type=int, default=2, help="Processes on CPU backends")
+    parser.add_argument("--output", help="Text output (default: <audio>.txt)")
+    args = parser.parse_args()
+
+    result = transcribe_long(args.path, args.model, args.language, args.window, args.overlap, args.workers,
+                             on_words=lambda words: print(words_to_text(words)))
+    output = args.output or args.path.rsplit(".", 1)[0] + ".txt"
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(result["text"] + "\n")
+
+    stats = result["stats"]
+    print(f"\n📊 {stats['duration'] / 3600:.2f}h in {stats['windows']} windows, {stats['seconds']:.1f}s "
+          f"(RTF {stats['realtime_factor']:.3f}), first text after {stats['first_text_seconds'] or 0:.1f}s")
+    print(f"📄 Transcription saved: {output}")
+
+
+if __name__ == "__main__":
+    main()
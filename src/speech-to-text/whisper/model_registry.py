@@ -0,0 +1,463 @@
+"""
+Speech model registry and process-wide loaded-model cache.
+
+Single source of truth for the Whisper model names used by the scripts in this
+folder (previously duplicated in each of them), plus a ModelCache that keeps
+loaded models resident between calls instead of handing `path_or_hf_repo` to
+every `mlx_whisper.transcribe` call.
+
+Backends are pluggable so the same code runs on Linux:
+- "mlx": mlx-whisper (Apple Silicon)
+- "faster-whisper": CTranslate2 on CPU/CUDA
+- "fake": no model at all, for trying the pipelines without downloads
+
+Every backend returns the mlx_whisper result format:
+{"text": str, "segments": [{"start", "end", "text", "words": [...]}], "language": str}
+
+transcribe_batch() runs several short clips (up to 30 s, Whisper's window)
+through one padded forward pass. The batched results have a single segment per
+clip and no word timestamps; longer clips and word_timestamps=True fall back
+to one transcribe() call per clip.
+
+Usage:
+    from model_registry import get_model_cache
+    cache = get_model_cache()          # backend from $SPEECH_BACKEND, else mlx on macOS
+    cache.warmup(["base"])
+    result = cache.transcribe("base", audio, language="fr")
+"""
+import os
+import platform
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+# Available Whisper models (MLX repos, faster-whisper names, approximate memory)
+MODELS = {
+    "tiny": {
+        "repo": "mlx-community/whisper-tiny-mlx",
+        "faster_whisper": "tiny",
+        "size_mb": 75,
+        "speed": "Fastest",
+        "quality": "Basic"
+    },
+    "base": {
+        "repo": "mlx-community/whisper-base-mlx",
+        "faster_whisper": "base",
+        "size_mb": 145,
+        "speed": "Very Fast",
+        "quality": "Good"
+    },
+    "small": {
+        "repo": "mlx-community/whisper-small-mlx",
+        "faster_whisper": "small",
+        "size_mb": 485,
+        "speed": "Fast",
+        "quality": "Better"
+    },
+    "medium": {
+        "repo": "mlx-community/whisper-medium-mlx",
+        "faster_whisper": "medium",
+        "size_mb": 1530,
+        "speed": "Moderate",
+        "quality": "Very Good"
+    },
+    "large": {
+        "repo": "mlx-community/whisper-large-mlx",
+        "faster_whisper": "large-v1",
+        "size_mb": 3100,
+        "speed": "Slower",
+        "quality": "Excellent"
+    },
+    "large-v3": {
+        "repo": "mlx-community/whisper-large-v3-mlx",
+        "faster_whisper": "large-v3",
+        "size_mb": 3100,
+        "speed": "Slower",
+        "quality": "Excellent"
+    },
+    "large-v3-turbo": {
+        "repo": "mlx-community/whisper-large-v3-turbo",
+        "faster_whisper": "large-v3-turbo",
+        "size_mb": 1620,
+        "speed": "Fast",
+        "quality": "Excellent (50% faster than large-v3)"
+    },
+    "distil-large-v3": {
+        "repo": "mlx-community/distil-whisper-large-v3",
+        "faster_whisper": "distil-large-v3",
+        "size_mb": 1510,
+        "speed": "Fast",
+        "quality": "Excellent (30% faster than large-v3)"
+    }
+}
+
+# Short names accepted by the interactive scripts
+ALIASES = {
+    "turbo": "large-v3-turbo",
+    "distil": "distil-large-v3",
+}
+
+DEFAULT_MODEL = "medium"
+
+# Longest clip of a batched forward pass (Whisper's 30 s window at 16 kHz)
+BATCH_SAMPLES = 30 * 16000
+
+
+def resolve_model(name: str, default: str = DEFAULT_MODEL) -> str:
+    """Returns the canonical model name, falling back to `default` if unknown"""
+    name = ALIASES.get(name, name)
+    return name if name in MODELS else default
+
+
+def model_repo(name: str) -> str:
+    """Returns the MLX HuggingFace repo of a model name"""
+    return MODELS[resolve_model(name)]["repo"]
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+class SpeechBackend:
+    """Interface of a speech-to-text backend"""
+    name = "base"
+
+    def load(self, model_name: str):
+        """Loads a model and returns a handle passed back to transcribe()"""
+        raise NotImplementedError
+
+    def transcribe(self, handle, audio, **options) -> dict:
+        """Transcribes a file path or a float32 16 kHz array"""
+        raise NotImplementedError
+
+    def transcribe_batch(self, handle, audios: List, **options) -> List[dict]:
+        """Transcribes float32 16 kHz arrays, one result per array (default: one by one)"""
+        return [self.transcribe(handle, audio, **options) for audio in audios]
+
+    def unload(self, handle):
+        """Releases a model (default: let the garbage collector do it)"""
+
+    def estimate_mb(self, model_name: str) -> float:
+        return MODELS[model_name]["size_mb"]
+
+
+def batchable(audios: List, options: dict) -> bool:
+    """Whether the clips can share one padded forward pass"""
+    return not options.get("word_timestamps") and all(len(a) <= BATCH_SAMPLES for a in audios)
+
+
+def batch_result(text: str, audio, language: Optional[str]) -> dict:
+    """mlx_whisper-format result of one clip of a batch"""
+    return {
+        "text": text,
+        "segments": [{"id": 0, "start": 0.0, "end": len(audio) / 16000, "text": text, "words": []}],
+        "language": language
+    }
+
+
+class MLXWhisperBackend(SpeechBackend):
+    """mlx-whisper, optimized for Apple Silicon"""
+    name = "mlx"
+
+    # mlx_whisper.transcribe() keeps a single model in a global ModelHolder,
+    # which we point at our cached model before each call
+    _holder_lock = threading.Lock()
+
+    def load(self, model_name):
+        import mlx.core as mx
+        from mlx_whisper.load_models import load_model
+
+        repo = MODELS[model_name]["repo"]
+        return {"repo": repo, "model": load_model(repo, dtype=mx.float16)}
+
+    def transcribe(self, handle, audio, **options):
+        import mlx_whisper
+        from mlx_whisper.transcribe import ModelHolder
+
+        with self._holder_lock:
+            ModelHolder.model = handle["model"]
+            ModelHolder.model_path = handle["repo"]
+            return mlx_whisper.transcribe(audio, path_or_hf_repo=handle["repo"], **options)
+
+    def transcribe_batch(self, handle, audios, **options):
+        if len(audios) < 2 or not batchable(audios, options):
+            return super().transcribe_batch(handle, audios, **options)
+        import mlx.core as mx
+        from mlx_whisper.audio import N_FRAMES, log_mel_spectrogram, pad_or_trim
+        from mlx_whisper.decoding import DecodingOptions, decode
+
+        model = handle["model"]
+        mels = [pad_or_trim(log_mel_spectrogram(audio, n_mels=model.dims.n_mels), N_FRAMES, axis=-2)
+                for audio in audios]
+        decoding = DecodingOptions(language=options.get("language"), without_timestamps=True, fp16=True)
+        results = decode(model, mx.stack(mels).astype(mx.float16), decoding)
+        return [batch_result(r.text, audio, r.language) for r, audio in zip(results, audios)]
+
+    def unload(self, handle):
+        from mlx_whisper.transcribe import ModelHolder
+
+        with self._holder_lock:
+            if ModelHolder.model is handle["model"]:
+                ModelHolder.model = None
+                ModelHolder.model_path = None
+
+
+class FasterWhisperBackend(SpeechBackend):
+    """faster-whisper (CTranslate2), runs on CPU on Linux"""
+    name = "faster-whisper"
+
+    def __init__(self, device: str = "auto", compute_type: str = "int8"):
+        self.device = device
+        self.compute_type = compute_type
+
+    def load(self, model_name):
+        from faster_whisper import WhisperModel
+
+        return WhisperModel(MODELS[model_name]["faster_whisper"],
+                            device=self.device, compute_type=self.compute_type)
+
+    def transcribe(self, handle, audio, **options):
+        options.pop("verbose", None)
+        segments, info = handle.transcribe(audio, **options)
+        result_segments = []
+        for seg in segments:
+            result_segments.append({
+                "id": seg.id,
+                "start": seg.start,
+                "end": seg.end,
+                "text": seg.text,
+                "words": [
+                    {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                    for w in (seg.words or [])
+                ]
+            })
+        return {
+            "text": "".join(seg["text"] for seg in result_segments),
+            "segments": result_segments,
+            "language": info.language
+        }
+
+    def transcribe_batch(self, handle, audios, **options):
+        language = options.get("language")
+        if len(audios) < 2 or not language or not batchable(audios, options):
+            return super().transcribe_batch(handle, audios, **options)
+        import numpy as np
+        from faster_whisper.audio import pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+
+        tokenizer = Tokenizer(handle.hf_tokenizer, handle.model.is_multilingual,
+                              task="transcribe", language=language)
+        features = np.stack([pad_or_trim(handle.feature_extractor(audio)) for audio in audios])
+        prompt = handle.get_prompt(tokenizer, previous_tokens=[], without_timestamps=True)
+        outputs = handle.model.generate(handle.encode(features), [prompt] * len(audios),
+                                        beam_size=options.get("beam_size", 5), max_length=448,
+                                        suppress_blank=True, suppress_tokens=[-1])
+        return [batch_result(tokenizer.decode(output.sequences_ids[0]), audio, language)
+                for output, audio in zip(outputs, audios)]
+
+
+class FakeBackend(SpeechBackend):
+    """
+    Backend without a model, for running the pipelines anywhere.
+    Sleeps `load_seconds` on load and `call_seconds` + `realtime_factor` x audio
+    duration per call. A batch costs one `call_seconds` plus every clip padded
+    to the longest one, like a batched forward pass.
+    """
+    name = "fake"
+
+    def __init__(self, load_seconds: float = 0.0, realtime_factor: float = 0.0, sample_rate: int = 16000,
+                 call_seconds: float = 0.0):
+        self.load_seconds = load_seconds
+        self.realtime_factor = realtime_factor
+        self.sample_rate = sample_rate
+        self.call_seconds = call_seconds
+
+    def load(self, model_name):
+        time.sleep(self.load_seconds)
+        return {"model": model_name}
+
+    def transcribe(self, handle, audio, **options):
+        duration = len(audio) / self.sample_rate if not isinstance(audio, str) else 1.0
+        time.sleep(self.call_seconds + duration * self.realtime_factor)
+        return self._result(handle, duration, **options)
+
+    def transcribe_batch(self, handle, audios, **options):
+        if not audios:
+            return []
+        padded = max(len(audio) for audio in audios) / self.sample_rate
+        time.sleep(self.call_seconds + padded * len(audios) * self.realtime_factor)
+        return [self._result(handle, len(audio) / self.sample_rate, **options) for audio in audios]
+
+    def _result(self, handle, duration, **options):
+        text = f" [{handle['model']}] {duration:.1f}s of audio"
+        # Words spread evenly over the audio, so they can be stitched like real ones
+        tokens = text.split()
+        step = duration / len(tokens)
+        words = [{"word": f" {w}", "start": i * step, "end": (i + 1) * step, "probability": 1.0}
+                 for i, w in enumerate(tokens)]
+        return {
+            "text": text,
+            "segments": [{"id": 0, "start": 0.0, "end": duration, "text": text, "words": words}],
+            "language": options.get("language") or "en"
+        }
+
+
+BACKENDS = {
+    "mlx": MLXWhisperBackend,
+    "faster-whisper": FasterWhisperBackend,
+    "fake": FakeBackend,
+}
+
+
+def default_backend_name() -> str:
+    """$SPEECH_BACKEND if set, otherwise mlx on Apple Silicon and faster-whisper elsewhere"""
+    env = os.getenv("SPEECH_BACKEND")
+    if env:
+        return env
+    if platform.system() == "Darwin" and platform.machine() == "arm64":
+        return "mlx"
+    return "faster-whisper"
+
+
+# ============================================================
+# MODEL CACHE
+# ============================================================
+
+@dataclass
+class ModelStats:
+    """Load and latency instrumentation for one cached model"""
+    load_seconds: float = 0
+    first_transcribe_seconds: Optional[float] = None
+    transcribe_calls: int = 0
+    transcribe_seconds: float = 0
+    loads: int = 0
+
+
+class ModelCache:
+    """
+    LRU cache of loaded models with a memory budget.
+
+    Args:
+        backend: SpeechBackend used to load and run models
+        memory_budget_mb: Least recently used models are evicted above this budget
+        on_evict: Callbacks called with (model_name, handle) when a model is evicted
+    """
+
+    def __init__(self, backend: SpeechBackend, memory_budget_mb: float = 4096,
+                 on_evict: Optional[List[Callable[[str, object], None]]] = None):
+        self.backend = backend
+        self.memory_budget_mb = memory_budget_mb
+        self.on_evict = list(on_evict or [])
+        self.stats: Dict[str, ModelStats] = {}
+        self._models = OrderedDict()
+        self._lock = threading.RLock()
+
+    @property
+    def resident_mb(self) -> float:
+        return sum(self.backend.estimate_mb(name) for name in self._models)
+
+    def get(self, model_name: str):
+        """Returns the loaded model, loading it (and evicting others) if needed"""
+        name = resolve_model(model_name)
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name]
+
+            self._evict_for(self.backend.estimate_mb(name))
+            start = time.perf_counter()
+            handle = self.backend.load(name)
+            stats = self.stats.setdefault(name, ModelStats())
+            stats.load_seconds = time.perf_counter() - start
+            stats.first_transcribe_seconds = None
+            stats.loads += 1
+            self._models[name] = handle
+            return handle
+
+    def warmup(self, model_names: List[str]):
+        """Loads models ahead of the first segment"""
+        for name in model_names:
+            self.get(name)
+
+    def evict(self, model_name: str):
+        name = resolve_model(model_name)
+        with self._lock:
+            handle = self._models.pop(name, None)
+        if handle is not None:
+            self.backend.unload(handle)
+            for hook in self.on_evict:
+                hook(name, handle)
+
+    def _evict_for(self, needed_mb: float):
+        while self._models and self.resident_mb + needed_mb > self.memory_budget_mb:
+            self.evict(next(iter(self._models)))
+
+    def transcribe(self, model_name: str, audio, **options) -> dict:
+        """Transcribes `audio` with a resident model"""
+        name = resolve_model(model_name)
+        handle = self.get(name)
+        start = time.perf_counter()
+        result = self.backend.transcribe(handle, audio, **options)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            stats = self.stats[name]
+            if stats.first_transcribe_seconds is None:
+                stats.first_transcribe_seconds = elapsed
+            stats.transcribe_calls += 1
+            stats.transcribe_seconds += elapsed
+        return result
+
+    def transcribe_batch(self, model_name: str, audios: List, **options) -> List[dict]:
+        """Transcribes several clips with one backend call (counted as one call per clip)"""
+        name = resolve_model(model_name)
+        handle = self.get(name)
+        start = time.perf_counter()
+        results = self.backend.transcribe_batch(handle, audios, **options)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            stats = self.stats[name]
+            if stats.first_transcribe_seconds is None:
+                stats.first_transcribe_seconds = elapsed
+            stats.transcribe_calls += len(audios)
+            stats.transcribe_seconds += elapsed
+        return results
+
+    def summary(self) -> str:
+        lines = []
+        for name, stats in self.stats.items():
+            first = f"{stats.first_transcribe_seconds:.2f}s" if stats.first_transcribe_seconds is not None else "-"
+            lines.append(f"{name}: loaded {stats.loads}x in {stats.load_seconds:.2f}s, "
+                         f"first segment {first}, {stats.transcribe_calls} calls "
+                         f"({stats.transcribe_seconds:.1f}s)")
+        return "\n".join(lines)
+
+
+_caches: Dict[tuple, ModelCache] = {}
+_default_cache: Optional[ModelCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_model_cache(backend: Optional[str] = None, **backend_options) -> ModelCache:
+    """
+    Returns the process-wide model cache of `backend` (with these options),
+    creating it on first use. Without arguments, returns the first cache
+    created in the process, or one for $SPEECH_BACKEND.
+    """
+    global _default_cache
+    with _cache_lock:
+        if backend is None and not backend_options and _default_cache is not None:
+            return _default_cache
+        name = backend or default_backend_name()
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown speech backend '{name}', expected one of {', '.join(BACKENDS)}")
+        key = (name, tuple(sorted((k, repr(v)) for k, v in backend_options.items())))
+        if key not in _caches:
+            budget = float(os.getenv("SPEECH_MODEL_BUDGET_MB", 4096))
+            _caches[key] = ModelCache(BACKENDS[name](**backend_options), memory_budget_mb=budget)
+        if _default_cache is None:
+            _default_cache = _caches[key]
+        return _caches[key]
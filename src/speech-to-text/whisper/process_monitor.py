@@ -0,0 +1,51 @@
+"""
+Runs a benchmark child process and samples its peak memory.
+
+The benchmarks run each mode or backend in a fresh subprocess, so the memory
+of one doesn't hide the growth of the next, and sample the RSS of the child
+and its own children while it runs. The child's output goes to temporary
+files: a child writing more than a pipe buffer (download progress bars,
+warnings) would otherwise block while nobody reads the pipe.
+
+Installation:
+$ uv add psutil
+"""
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import List
+
+import psutil
+
+
+@dataclass
+class ChildRun:
+    """Output and peak RSS of a finished child process"""
+    returncode: int
+    output: str
+    errors: str
+    peak_mb: float
+
+    def last_error(self) -> str:
+        """Last line written to stderr (usually the exception), or the exit code"""
+        errors = self.errors.strip()
+        return errors.splitlines()[-1] if errors else f"exit code {self.returncode}"
+
+
+def run_and_sample_rss(cmd: List[str], interval: float = 0.05) -> ChildRun:
+    """Runs `cmd` to completion, sampling the RSS of the process tree every `interval` seconds"""
+    with tempfile.TemporaryFile("w+") as out, tempfile.TemporaryFile("w+") as err:
+        child = subprocess.Popen(cmd, stdout=out, stderr=err, text=True)
+        process = psutil.Process(child.pid)
+        peak = 0
+        while child.poll() is None:
+            try:
+                rss = sum(p.memory_info().rss for p in [process] + process.children(recursive=True))
+                peak = max(peak, rss)
+            except psutil.Error:
+                pass
+            time.sleep(interval)
+        out.seek(0)
+        err.seek(0)
+        return ChildRun(child.returncode, out.read(), err.read(), peak / 1024 / 1024)
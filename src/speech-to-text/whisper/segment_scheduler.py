@@ -0,0 +1,233 @@
+"""
+Bounded worker pool for segment transcription.
+
+The recorders used to start a new thread per segment. When transcription is
+slower than real time, those threads pile up and each one loads its own audio,
+so memory grows without limit. SegmentScheduler runs a fixed number of workers
+fed by a bounded queue, and applies a backpressure policy when the queue is full:
+
+- "block":   the recorder waits until a worker frees a slot
+- "drop":    the segment stays on disk only (WAV kept, not transcribed)
+- "degrade": the segment is re-targeted to a smaller model, then queued
+
+Queue depth, lag (time spent waiting in the queue) and processing time are
+tracked in SchedulerMetrics.
+
+run_stages() runs the independent stages of one segment (e.g. diarization and
+transcription) concurrently on their own executors, so a segment takes
+max(stages) instead of their sum, and reports the time of each stage.
+
+Usage:
+$ uv run segment_scheduler.py   # demo with a fake transcriber that sleeps
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+POLICIES = ("block", "drop", "degrade")
+
+
+@dataclass
+class SchedulerMetrics:
+    """Counters and timings collected by the scheduler"""
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    dropped: int = 0
+    degraded: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    total_lag: float = 0
+    max_lag: float = 0
+    total_processing: float = 0
+    dropped_segments: list = field(default_factory=list)  # Segment numbers only, not the audio
+
+    @property
+    def avg_lag(self) -> float:
+        started = self.completed + self.failed
+        return self.total_lag / started if started else 0
+
+    @property
+    def avg_processing(self) -> float:
+        started = self.completed + self.failed
+        return self.total_processing / started if started else 0
+
+    def summary(self) -> str:
+        return (f"{self.completed}/{self.submitted} done, {self.failed} failed, "
+                f"{self.dropped} dropped, {self.degraded} degraded | "
+                f"queue max {self.max_queue_depth} | "
+                f"lag avg {self.avg_lag:.1f}s max {self.max_lag:.1f}s | "
+                f"processing avg {self.avg_processing:.1f}s")
+
+
+class SegmentScheduler:
+    """
+    Runs `process(job)` on a fixed pool of worker threads.
+
+    Args:
+        process: Function called with each submitted job
+        workers: Number of worker threads
+        max_queue: Maximum number of jobs waiting for a worker
+        policy: Backpressure policy when the queue is full ("block", "drop", "degrade")
+        degrade: For the "degrade" policy, function returning a cheaper version of a job
+        on_drop: Optional callback called with each dropped job
+    """
+
+    def __init__(self, process: Callable[[Any], Any], workers: int = 1, max_queue: int = 2,
+                 policy: str = "block", degrade: Optional[Callable[[Any], Any]] = None,
+                 on_drop: Optional[Callable[[Any], None]] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of {POLICIES}")
+        if policy == "degrade" and degrade is None:
+            raise ValueError("The 'degrade' policy needs a degrade function")
+
+        self.process = process
+        self.policy = policy
+        self.degrade = degrade
+        self.on_drop = on_drop
+        self.metrics = SchedulerMetrics()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"segment-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, job) -> bool:
+        """Queues a job, applying the backpressure policy. Returns False if dropped."""
+        with self._lock:
+            self.metrics.submitted += 1
+
+        if self.policy != "block":
+            try:
+                self._put(job, block=False)
+                return True
+            except queue.Full:
+                pass
+
+            if self.policy == "drop":
+                with self._lock:
+                    self.metrics.dropped += 1
+                    if isinstance(job, dict) and "segment_num" in job:
+                        self.metrics.dropped_segments.append(job["segment_num"])
+                if self.on_drop:
+                    self.on_drop(job)
+                return False
+
+            job = self.degrade(job)
+            with self._lock:
+                self.metrics.degraded += 1
+
+        self._put(job, block=True)
+        return True
+
+    def _put(self, job, block: bool):
+        self._queue.put((time.perf_counter(), job), block=block)
+        with self._lock:
+            self.metrics.queue_depth = self._queue.qsize()
+            self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self.metrics.queue_depth)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+
+            submitted_at, job = item
+            started_at = time.perf_counter()
+            lag = started_at - submitted_at
+            with self._lock:
+                self.metrics.queue_depth = self._queue.qsize()
+                self.metrics.total_lag += lag
+                self.metrics.max_lag = max(self.metrics.max_lag, lag)
+
+            try:
+                self.process(job)
+                failed = False
+            except Exception as e:
+                print(f"❌ Segment processing failed: {e}")
+                failed = True
+
+            with self._lock:
+                self.metrics.total_processing += time.perf_counter() - started_at
+                if failed:
+                    self.metrics.failed += 1
+                else:
+                    self.metrics.completed += 1
+            self._queue.task_done()
+
+    def close(self, wait: bool = True):
+        """Stops the workers once every queued job has been processed"""
+        for _ in self._workers:
+            self._queue.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+
+class StageError(Exception):
+    """A stage of run_stages() failed, `stage` is its name (the error is the __cause__)"""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+
+
+def run_stages(stages: Dict[str, Callable[[], Any]],
+               executors: Dict[str, Executor]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Runs independent stages concurrently, each on its own executor.
+    Returns (results, timings) keyed by stage name; timings also has "total"
+    (wall time of the slowest stage) and "sequential" (sum of all the stages).
+    Raises StageError naming the stage that failed.
+    """
+    def timed(fn):
+        start = time.perf_counter()
+        result = fn()
+        return result, time.perf_counter() - start
+
+    start = time.perf_counter()
+    futures = {name: executors[name].submit(timed, fn) for name, fn in stages.items()}
+    results, timings = {}, {}
+    for name, future in futures.items():
+        try:
+            results[name], timings[name] = future.result()
+        except Exception as e:
+            raise StageError(name, e) from e
+    timings["total"] = time.perf_counter() - start
+    timings["sequential"] = sum(timings[name] for name in stages)
+    return results, timings
+
+
+if __name__ == "__main__":
+    # Fake transcriber: 0.3s per segment on the big model, 0.1s on the small one,
+    # while the recorder produces a segment every 0.1s
+    def fake_transcribe(job):
+        time.sleep(0.3 if job["model"] == "large" else 0.1)
+
+    def degrade(job):
+        return {**job, "model": "base"}
+
+    for policy in POLICIES:
+        scheduler = SegmentScheduler(fake_transcribe, workers=2, max_queue=2,
+                                     policy=policy, degrade=degrade)
+        start = time.perf_counter()
+        for i in range(20):
+            scheduler.submit({"segment": i, "model": "large"})
+            time.sleep(0.1)
+        scheduler.close()
+        print(f"📊 {policy:8s} {time.perf_counter() - start:4.1f}s | {scheduler.metrics.summary()}")
+
+    # Stand-in diarization (0.3s) and transcription (0.2s) of one segment
+    from concurrent.futures import ThreadPoolExecutor
+
+    executors = {"diarization": ThreadPoolExecutor(1), "transcription": ThreadPoolExecutor(1)}
+    _, timings = run_stages({"diarization": lambda: time.sleep(0.3),
+                             "transcription": lambda: time.sleep(0.2)}, executors)
+    print(f"📊 stages   total {timings['total']:.2f}s vs sequential {timings['sequential']:.2f}s")
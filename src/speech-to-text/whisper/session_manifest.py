@@ -0,0 +1,87 @@
+"""
+Append-only manifest of a recording session.
+
+Every step of every segment is appended as one JSON line to
+`<session_dir>/manifest.jsonl` and flushed to disk right away:
+
+    {"event": "session", "model": "base", "rate": 16000, ...}
+    {"event": "captured", "segment": 3, "file": "segment_003.wav", "offset": 600.0, "duration": 300.0}
+    {"event": "transcribed", "segment": 3, "model": "base"}
+    {"event": "diarized", "segment": 3}
+    {"event": "dropped", "segment": 4}
+    {"event": "failed", "segment": 5, "stage": "transcription", "error": "..."}
+
+After a crash, load_manifest() rebuilds the state of each segment (a torn
+last line is ignored) and pending_segments() lists the captured segments that
+still need a stage, so a restart only re-processes those.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+
+MANIFEST_NAME = "manifest.jsonl"
+
+
+class SessionManifest:
+    """Appends events to the manifest of a session directory"""
+
+    def __init__(self, session_dir: str, fsync: bool = True):
+        self.path = os.path.join(session_dir, MANIFEST_NAME)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+
+    def record(self, event: str, **fields):
+        line = json.dumps({"event": event, "time": round(time.time(), 3), **fields}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+
+
+def load_manifest(session_dir: str) -> dict:
+    """
+    Returns {"session": {...}, "segments": {num: {...}}} where each segment has
+    the fields of its "captured" event and a "status" set of the events seen.
+    """
+    path = os.path.join(session_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No {MANIFEST_NAME} in {session_dir}")
+
+    session, segments = {}, {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn write from a crash
+            event = record.pop("event")
+            if event == "session":
+                session.update(record)
+                continue
+            num = record.get("segment")
+            if num is None:
+                continue
+            segment = segments.setdefault(num, {"segment": num, "status": set()})
+            segment["status"].add(event)
+            if event == "captured":
+                segment.update({k: v for k, v in record.items() if k != "time"})
+            elif event == "failed":
+                segment["error"] = record.get("error")
+    return {"session": session, "segments": segments}
+
+
+def pending_segments(session_dir: str, stage: str = "transcribed") -> List[Dict]:
+    """Captured segments (WAV still on disk) that never reached `stage`"""
+    state = load_manifest(session_dir)
+    pending = []
+    for num in sorted(state["segments"]):
+        segment = state["segments"][num]
+        if "captured" not in segment["status"] or stage in segment["status"]:
+            continue
+        if os.path.exists(os.path.join(session_dir, segment["file"])):
+            pending.append(segment)
+    return pending
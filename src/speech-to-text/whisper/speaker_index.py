@@ -0,0 +1,152 @@
+"""
+Interval index for assigning diarization speakers to transcribed words.
+
+The original get_speaker_for_time() scanned every diarization turn for every
+Whisper segment (O(segments x turns) in pure Python) and gave a whole segment
+to a single speaker. SpeakerIndex sorts the turns once into NumPy arrays and
+answers lookups with searchsorted, so speakers can be assigned per word (using
+the word timestamps Whisper already returns) and segments split where the
+speaker changes.
+
+Installation:
+$ uv add numpy
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+UNKNOWN_SPEAKER = "Unknown Speaker"
+
+
+class SpeakerIndex:
+    """
+    Sorted diarization turns.
+
+    Args:
+        turns: (start, end, speaker) tuples, in any order
+        max_gap: A word outside every turn gets the nearest speaker if the
+            gap is shorter than this (seconds), otherwise UNKNOWN_SPEAKER
+    """
+
+    def __init__(self, turns: List[Tuple[float, float, str]], max_gap: float = 0.5):
+        self.max_gap = max_gap
+        turns = sorted(turns, key=lambda t: t[0])
+        self.labels = sorted({t[2] for t in turns})
+        codes = {label: i for i, label in enumerate(self.labels)}
+
+        self.starts = np.array([t[0] for t in turns], dtype=np.float64)
+        self.ends = np.array([t[1] for t in turns], dtype=np.float64)
+        self.codes = np.array([codes[t[2]] for t in turns], dtype=np.int64)
+        # Running maximum of the ends: turns before i can't reach past it
+        self.max_ends = np.maximum.accumulate(self.ends) if len(turns) else self.ends
+
+    @classmethod
+    def from_pyannote(cls, annotation, **options) -> "SpeakerIndex":
+        """Builds the index from a pyannote Annotation (diarization.speaker_diarization)"""
+        return cls([(turn.start, turn.end, speaker)
+                    for turn, _, speaker in annotation.itertracks(yield_label=True)], **options)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _window(self, start: float, end: float) -> Tuple[int, int]:
+        """Range of turns that may overlap [start, end]"""
+        lo = int(np.searchsorted(self.max_ends, start, side="right"))
+        hi = int(np.searchsorted(self.starts, end, side="left"))
+        return lo, hi
+
+    def speaker_for_interval(self, start: float, end: float) -> str:
+        """Speaker with the most overlap with [start, end]"""
+        lo, hi = self._window(start, end)
+        if lo < hi:
+            overlap = np.minimum(self.ends[lo:hi], end) - np.maximum(self.starts[lo:hi], start)
+            positive = overlap > 0
+            if positive.any():
+                totals = np.bincount(self.codes[lo:hi][positive], weights=overlap[positive],
+                                     minlength=len(self.labels))
+                return self.labels[int(np.argmax(totals))]
+        return self._nearest(start, end)
+
+    def speakers_for_points(self, times: np.ndarray) -> List[str]:
+        """Vectorized lookup of the speaker talking at each time"""
+        times = np.asarray(times, dtype=np.float64)
+        if not len(self.starts):
+            return [UNKNOWN_SPEAKER] * len(times)
+
+        # Last turn starting before each time
+        idx = np.searchsorted(self.starts, times, side="right") - 1
+        safe = np.clip(idx, 0, None)
+        inside = (idx >= 0) & (self.ends[safe] > times)
+
+        result = np.where(inside, self.codes[safe], -1)
+        # Overlapping turns: an earlier, longer turn may still cover the time
+        for i in np.nonzero(~inside & (idx >= 0) & (self.max_ends[safe] > times))[0]:
+            result[i] = self._covering(times[i], safe[i])
+
+        labels = []
+        for t, code in zip(times, result):
+            labels.append(self.labels[code] if code >= 0 else self._nearest(t, t))
+        return labels
+
+    def _covering(self, t: float, last: int) -> int:
+        lo = int(np.searchsorted(self.max_ends, t, side="right"))
+        covering = np.nonzero(self.ends[lo:last + 1] > t)[0]
+        return int(self.codes[lo + covering[-1]]) if len(covering) else -1
+
+    def _nearest(self, start: float, end: float) -> str:
+        if not len(self.starts):
+            return UNKNOWN_SPEAKER
+        # Gap to the closest turn before and after the interval
+        gaps = []
+        before = int(np.searchsorted(self.starts, start, side="right")) - 1
+        if before >= 0:
+            i = int(np.argmax(self.ends[:before + 1]))
+            gaps.append((start - self.ends[i], i))
+        after = int(np.searchsorted(self.starts, end, side="left"))
+        if after < len(self.starts):
+            gaps.append((self.starts[after] - end, after))
+        gap, i = min(gaps)
+        return self.labels[self.codes[i]] if gap <= self.max_gap else UNKNOWN_SPEAKER
+
+
+def split_by_speaker(segments: List[dict], index: SpeakerIndex, offset: float = 0.0) -> List[dict]:
+    """
+    Assigns a speaker to every word of Whisper `segments` and splits them where
+    the speaker changes. Times are shifted by `offset` (session position).
+    Segments without word timestamps get the speaker of the whole interval.
+    """
+    # One vectorized lookup for all the words of all the segments
+    midpoints = [(w["start"] + w["end"]) / 2 for seg in segments for w in (seg.get("words") or [])]
+    all_speakers = iter(index.speakers_for_points(np.array(midpoints)))
+
+    output = []
+    for segment in segments:
+        words = segment.get("words") or []
+        if not words:
+            output.append({
+                "speaker": index.speaker_for_interval(segment["start"], segment["end"]),
+                "start": offset + segment["start"],
+                "end": offset + segment["end"],
+                "text": segment["text"].strip(),
+                "words": []
+            })
+            continue
+
+        speakers = [next(all_speakers) for _ in words]
+        run: List[dict] = []
+        for i, (word, speaker) in enumerate(zip(words, speakers)):
+            run.append({
+                "word": word["word"],
+                "start": offset + word["start"],
+                "end": offset + word["end"]
+            })
+            if i + 1 == len(words) or speakers[i + 1] != speaker:
+                output.append({
+                    "speaker": speaker,
+                    "start": run[0]["start"],
+                    "end": run[-1]["end"],
+                    "text": "".join(w["word"] for w in run).strip(),
+                    "words": run
+                })
+                run = []
+    return output
@@ -0,0 +1,109 @@
+"""
+Session-level speaker registry for stable labels across segments.
+
+Each segment is diarized on its own, so pyannote's SPEAKER_00 in one segment
+may be someone else's SPEAKER_00 in the next. The registry keeps one embedding
+centroid per person seen so far in the session and matches the speakers of
+each new segment against them by cosine similarity, so labels stay stable
+without re-diarizing earlier audio.
+
+Installation:
+$ uv add numpy
+"""
+import json
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+UNKNOWN_SPEAKER = "Unknown Speaker"
+
+
+class SpeakerRegistry:
+    """
+    Args:
+        threshold: Minimum cosine similarity to match a known speaker
+        label_format: Format of the session labels, given the speaker number
+    """
+
+    def __init__(self, threshold: float = 0.6, label_format: str = "SPEAKER_{:02d}"):
+        self.threshold = threshold
+        self.label_format = label_format
+        self.labels: List[str] = []
+        self._sums: List[np.ndarray] = []  # Sum of the unit embeddings of each speaker
+        self._counts: List[int] = []
+        self._lock = threading.Lock()
+
+    def _centroids(self) -> np.ndarray:
+        centroids = np.array(self._sums)
+        return centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    def match(self, embeddings: Dict[str, np.ndarray]) -> Dict[str, str]:
+        """
+        Maps the local labels of a segment to session labels. Each known
+        speaker is used at most once per segment; unmatched speakers are
+        registered as new ones. Invalid (NaN) embeddings map to UNKNOWN_SPEAKER.
+        """
+        with self._lock:
+            mapping = {}
+            local, vectors = [], []
+            for label, embedding in embeddings.items():
+                embedding = np.asarray(embedding, dtype=np.float64)
+                norm = np.linalg.norm(embedding)
+                if not np.isfinite(norm) or norm == 0:
+                    mapping[label] = UNKNOWN_SPEAKER
+                    continue
+                local.append(label)
+                vectors.append(embedding / norm)
+
+            if not local:
+                return mapping
+
+            vectors = np.array(vectors)
+            assigned = {}
+            if self._sums:
+                # Greedy one-to-one assignment, most similar pairs first
+                similarity = vectors @ self._centroids().T
+                for flat in np.argsort(similarity, axis=None)[::-1]:
+                    i, j = np.unravel_index(flat, similarity.shape)
+                    if similarity[i, j] < self.threshold:
+                        break
+                    if i in assigned or j in assigned.values():
+                        continue
+                    assigned[i] = j
+
+            for i, label in enumerate(local):
+                j = assigned.get(i)
+                if j is None:
+                    j = len(self.labels)
+                    self.labels.append(self.label_format.format(j))
+                    self._sums.append(np.zeros_like(vectors[i]))
+                    self._counts.append(0)
+                self._sums[j] = self._sums[j] + vectors[i]
+                self._counts[j] += 1
+                mapping[label] = self.labels[j]
+            return mapping
+
+    def match_pyannote(self, output):
+        """
+        Relabels a pyannote 4 DiarizeOutput with session labels.
+        Returns the renamed speaker_diarization annotation.
+        """
+        annotation = output.speaker_diarization
+        embeddings = getattr(output, "speaker_embeddings", None)
+        if embeddings is None:
+            return annotation
+        local_labels = annotation.labels()
+        mapping = self.match(dict(zip(local_labels, embeddings)))
+        return annotation.rename_labels(mapping)
+
+    def save(self, path: str):
+        """Saves the speakers and their centroids (e.g. to label a later session)"""
+        with self._lock:
+            data = [
+                {"label": label, "segments": count, "centroid": centroid.tolist()}
+                for label, count, centroid in zip(self.labels, self._counts,
+                                                  self._centroids() if self._sums else [])
+            ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
@@ -0,0 +1,179 @@
+"""
+Stitching of overlapping segment transcriptions into one continuous timeline.
+
+The recorder can start each segment `overlap` seconds before the end of the
+previous one, so a word straddling a cut is heard in full by at least one of
+the two segments. The stitcher then uses Whisper's word timestamps to keep a
+single copy of each word in the overlap region:
+
+1. Words of both segments inside the overlap are aligned on their text
+   (difflib), and the cut is placed in the middle of the longest match.
+2. Without a reliable match, the cut falls at the middle of the overlap,
+   keeping each word from the segment where it is furthest from an edge.
+
+Segments may complete out of order (worker pool); they are buffered and
+stitched in sequence. Emitted words carry absolute session timestamps.
+"""
+import difflib
+import re
+import threading
+from typing import Dict, List, Optional
+
+_PUNCTUATION = re.compile(r"[^\w']+")
+
+
+def normalize_word(word: str) -> str:
+    return _PUNCTUATION.sub("", word.lower())
+
+
+def result_words(result: dict, offset: float = 0.0) -> List[dict]:
+    """Flattens the words of a Whisper result, shifted by `offset` seconds"""
+    words = []
+    for segment in result.get("segments", []):
+        for w in segment.get("words", []):
+            words.append({
+                "word": w["word"],
+                "start": w["start"] + offset,
+                "end": w["end"] + offset,
+                "probability": w.get("probability", 1.0)
+            })
+    return words
+
+
+def _midpoint(word: dict) -> float:
+    return (word["start"] + word["end"]) / 2
+
+
+def merge_overlap(previous: List[dict], current: List[dict], overlap_start: float,
+                  overlap_end: float, min_match: int = 2) -> tuple:
+    """
+    Merges the words of two consecutive segments overlapping on
+    [overlap_start, overlap_end]. Returns (kept previous words, kept current words).
+    """
+    prev_tail = [i for i, w in enumerate(previous) if w["end"] > overlap_start]
+    curr_head = [i for i, w in enumerate(current) if w["start"] < overlap_end]
+
+    if prev_tail and curr_head:
+        a = [normalize_word(previous[i]["word"]) for i in prev_tail]
+        b = [normalize_word(current[i]["word"]) for i in curr_head]
+        match = difflib.SequenceMatcher(None, a, b, autojunk=False).find_longest_match(0, len(a), 0, len(b))
+        if match.size >= min(min_match, len(a), len(b)) and match.size > 0:
+            # Cut in the middle of the matched run: the words before come from
+            # the previous segment, the words after from the current one
+            half = match.size // 2
+            prev_cut = prev_tail[match.a + half]
+            curr_cut = curr_head[match.b + half]
+            return previous[:prev_cut], current[curr_cut:]
+
+    cut = (overlap_start + overlap_end) / 2
+    return ([w for w in previous if _midpoint(w) < cut],
+            [w for w in current if _midpoint(w) >= cut])
+
+
+class TranscriptStitcher:
+    """
+    Stitches segment results into a single word timeline.
+
+    `add()` takes each segment's result with its absolute `offset` and
+    `duration` in seconds, and returns the words that are now final. The tail
+    of the latest segment is held back until the next segment (or `flush()`)
+    since it may still be replaced by better words from the overlap.
+    """
+
+    def __init__(self, overlap: float, min_match: int = 2, first: int = 1):
+        self.overlap = overlap
+        self.min_match = min_match
+        self._pending: Dict[int, tuple] = {}
+        self._next = first
+        self._held: List[dict] = []
+        self._held_end = None  # End of the segment the held words come from
+        self._held_written = False  # The held words are already in the transcript (seed())
+        self._lock = threading.Lock()
+
+    def seed(self, segment_num: int, offset: float, duration: float, result: dict, written: bool = False):
+        """
+        Starts after a segment that is already in the transcript (e.g. when
+        resuming a session): only its tail is kept, to be merged with the next
+        segment. With `written`, that tail was written too and only the next
+        segment's side of the overlap is returned.
+        """
+        with self._lock:
+            end = offset + duration
+            self._held = [w for w in result_words(result, offset) if w["end"] > end - self.overlap]
+            self._held_end = end
+            self._held_written = written
+            self._next = segment_num + 1
+
+    def add(self, segment_num: int, offset: float, duration: float, result: dict) -> List[dict]:
+        with self._lock:
+            self._pending[segment_num] = (offset, duration, result_words(result, offset))
+            return self._drain()
+
+    def skip(self, segment_num: int) -> List[dict]:
+        """Marks a segment that will never be transcribed (e.g. dropped)"""
+        with self._lock:
+            self._pending[segment_num] = None
+            return self._drain()
+
+    def flush(self, until: Optional[float] = None) -> List[dict]:
+        """
+        Returns the remaining words once the session is over: the segments
+        still waiting for an earlier one that never came (treated as a gap),
+        then the held back words. `until` drops the held words from that
+        session time on (when the next segment is already in the transcript).
+        """
+        with self._lock:
+            words = []
+            while self._pending:
+                if self._next not in self._pending:
+                    self._pending[self._next] = None
+                words.extend(self._drain())
+            if not self._held_written:
+                words.extend(w for w in self._held if until is None or _midpoint(w) < until)
+            self._held, self._held_end, self._held_written = [], None, False
+            return words
+
+    def _drain(self) -> List[dict]:
+        emitted = []
+        while self._next in self._pending:
+            item = self._pending.pop(self._next)
+            self._next += 1
+
+            if item is None:
+                # Gap in the timeline: nothing to stitch against
+                if not self._held_written:
+                    emitted.extend(self._held)
+                self._held, self._held_end, self._held_written = [], None, False
+                continue
+
+            offset, duration, words = item
+            if self._held_written:
+                # The held words are in the transcript already: continue after the last one
+                if self._held:
+                    words = [w for w in words if _midpoint(w) > self._held[-1]["end"]]
+            elif self._held_end is not None and self.overlap > 0 and offset < self._held_end:
+                kept, words = merge_overlap(self._held, words, offset, self._held_end, self.min_match)
+                emitted.extend(kept)
+            else:
+                emitted.extend(self._held)
+            self._held_written = False
+
+            # Hold back the words that the next segment will overlap
+            end = offset + duration
+            hold_from = end - self.overlap
+            self._held = [w for w in words if w["end"] > hold_from]
+            emitted.extend(w for w in words if w["end"] <= hold_from)
+            self._held_end = end
+        return emitted
+
+
+def words_to_text(words: List[dict]) -> str:
+    return "".join(w["word"] for w in words).strip()
+
+
+def format_time(seconds: float) -> str:
+    """Formats time as HH:MM:SS"""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
@@ -1,35 +1,45 @@
 #!/usr/bin/env python3
 """
-Script to structure a transcription using Claude Sonnet API
-Reads a raw transcription and creates a well-organized markdown document
+Script to structure a transcription using Claude Sonnet API, or a local model
+(mlx_lm.server, Ollama, any OpenAI-compatible server, see llm_backends.py)
+Reads a raw transcription and creates a well-organized markdown document,
+streamed to disk as it is generated
+
+A transcription longer than --chunk-tokens is structured in map-reduce instead
+of one prompt (which truncates or fails on multi-hour transcripts):
+1. split: on paragraph boundaries (segments, speaker turns), then lines and
+   sentences, into chunks of at most --chunk-tokens (estimated, ~4 chars/token)
+2. map: each chunk is structured into ## / ### sections, --concurrency
+   requests at a time
+3. reduce: one request writes the title, introduction and conclusion from the
+   outline (headings) of all the chunks; the sections follow in order
+The time of each phase is reported, and each part is streamed to its own file
+in a <output>_parts directory.
+
+Usage:
+$ python structure_transcription.py transcription.txt
+$ python structure_transcription.py transcription.txt --chunk-tokens 4000 --concurrency 8
+$ python structure_transcription.py transcription.txt --backend openai          # mlx_lm.server on :8080
+$ python structure_transcription.py transcription.txt --backend ollama:qwen2.5:7b
+$ python structure_transcription.py transcription.txt --fake   # stand-in server, see fake_llm_server.py
 """
 
-import anthropic
+import argparse
+import asyncio
 import os
+import re
 import sys
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
 
+from llm_backends import LLMError, create_backend
 
-def read_transcription(file_path):
-    """Read the transcription file"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
-        sys.exit(1)
-    except Exception as e:
-        print(f"Error reading file: {e}")
-        sys.exit(1)
+CHARS_PER_TOKEN = 4
 
 
-def structure_with_claude(transcription_text, api_key):
-    """Use Claude Sonnet to structure the transcription"""
-    
-    client = anthropic.Anthropic(api_key=api_key)
-    
-    prompt = f"""Voici une transcription d'une conversation en français. Ta tâche est de créer un document markdown bien structuré à partir de cette transcription.
+STRUCTURE_PROMPT = """Voici une transcription d'une conversation en français. Ta tâche est de créer un document markdown bien structuré à partir de cette transcription.
 
 Instructions:
 1. Identifie les principaux sujets abordés dans la conversation
@@ -51,30 +61,177 @@ Format du markdown:
 
 Transcription à structurer:
 
-{transcription_text}
+{transcription}
 
 Crée maintenant le document markdown structuré en français."""
 
+MAP_PROMPT = """Voici la partie {part} sur {parts} d'une transcription d'une conversation en français. Ta tâche est de structurer cette partie en markdown; les autres parties sont traitées séparément puis assemblées.
+
+Instructions:
+1. Identifie les sujets abordés dans cette partie
+2. Crée des sections (##) et sous-sections (###), sans titre principal (#), sans introduction ni conclusion
+3. Utilise AUTANT QUE POSSIBLE le contenu original de la transcription
+4. Conserve les détails importants, les noms de personnes, les organisations mentionnées
+5. Améliore la lisibilité en reformulant légèrement si nécessaire, mais garde le sens exact
+6. Utilise des listes à puces (-) quand approprié et mets en gras (**texte**) les termes importants
+
+Partie {part} de la transcription:
+
+{transcription}"""
+
+REDUCE_PROMPT = """Voici le plan (titres des sections, dans l'ordre) d'un document markdown structuré à partir d'une longue transcription d'une conversation en français.
+
+Écris en français, en markdown:
+1. Un titre principal (# Titre) pour l'ensemble du document
+2. Une courte introduction présentant les principaux sujets
+3. Puis une section "## Conclusion" résumant les points clés
+
+N'écris rien d'autre: les sections elles-mêmes seront insérées entre l'introduction et la conclusion.
+
+Plan:
+
+{outline}"""
+
+
+def read_transcription(file_path):
+    """Read the transcription file"""
     try:
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=8000,
-            temperature=0.3,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        return message.content[0].text
-    
-    except anthropic.APIError as e:
-        print(f"API Error: {e}")
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
         sys.exit(1)
     except Exception as e:
-        print(f"Error calling Claude API: {e}")
+        print(f"Error reading file: {e}")
         sys.exit(1)
 
 
+async def structure_single(transcription_text, backend, output_path):
+    """Structures the whole transcription in one request, streamed to `output_path`"""
+    prompt = STRUCTURE_PROMPT.format(transcription=transcription_text)
+    return await backend.complete(prompt, max_tokens=8000, path=output_path)
+
+
+# ============================================================
+# MAP-REDUCE
+# ============================================================
+
+def estimate_tokens(text):
+    """Rough token count (no tokenizer needed)"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_units(text, max_tokens):
+    """
+    Paragraphs (segments, speaker turns), split into lines, then sentences,
+    then words when they don't fit in `max_tokens` on their own
+    """
+    units = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        if not paragraph.strip():
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            units.append(paragraph.strip())
+            continue
+        for line in paragraph.splitlines():
+            if estimate_tokens(line) <= max_tokens:
+                units.append(line)
+                continue
+            for sentence in re.split(r"(?<=[.!?…])\s+", line):
+                while estimate_tokens(sentence) > max_tokens:
+                    cut = sentence.rfind(" ", 0, max_tokens * CHARS_PER_TOKEN)
+                    cut = cut if cut > 0 else max_tokens * CHARS_PER_TOKEN
+                    units.append(sentence[:cut])
+                    sentence = sentence[cut:].lstrip()
+                units.append(sentence)
+    return [unit for unit in units if unit.strip()]
+
+
+def split_transcription(text, chunk_tokens):
+    """Packs consecutive units into chunks of at most `chunk_tokens`"""
+    chunks, current, size = [], [], 0
+    for unit in split_units(text, chunk_tokens):
+        tokens = estimate_tokens(unit)
+        if current and size + tokens > chunk_tokens:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(unit)
+        size += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+@dataclass
+class PhaseTimings:
+    """Wall time of each map-reduce phase, in seconds"""
+    chunks: int = 0
+    split: float = 0
+    map: float = 0
+    reduce: float = 0
+    map_calls: float = 0  # Sum of the map requests: what a sequential run would take
+
+    def summary(self):
+        total = self.split + self.map + self.reduce
+        return (f"{self.chunks} chunks | split {self.split:.2f}s, map {self.map:.1f}s "
+                f"(sequential {self.map_calls:.1f}s), reduce {self.reduce:.1f}s, total {total:.1f}s")
+
+
+async def complete(backend, semaphore, prompt, max_tokens, path=None):
+    """
+    One request, at most `concurrency` of them in flight (semaphore), streamed
+    to `path`. Returns (text, seconds spent in the request itself)
+    """
+    async with semaphore:
+        start = time.perf_counter()
+        text = await backend.complete(prompt, max_tokens=max_tokens, path=path)
+        return text, time.perf_counter() - start
+
+
+def outline(sections):
+    """Headings of the structured chunks, in order"""
+    return "\n".join(line for text in sections for line in text.splitlines() if line.startswith("##"))
+
+
+async def structure_map_reduce(transcription_text, backend, chunk_tokens=6000, concurrency=4, max_tokens=8000,
+                               parts_dir=None, output_path=None):
+    """
+    Structures the transcription chunk by chunk, each part streamed to
+    `parts_dir` and the title / introduction / conclusion to `output_path`
+    if given (replaced by the whole document once assembled).
+    Returns (markdown, PhaseTimings)
+    """
+    timings = PhaseTimings()
+    start = time.perf_counter()
+    chunks = split_transcription(transcription_text, chunk_tokens)
+    timings.chunks = len(chunks)
+    timings.split = time.perf_counter() - start
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def structure_chunk(i, chunk):
+        prompt = MAP_PROMPT.format(part=i, parts=len(chunks), transcription=chunk)
+        path = Path(parts_dir) / f"part_{i:03d}.md" if parts_dir else None
+        text, seconds = await complete(backend, semaphore, prompt, max_tokens, path)
+        timings.map_calls += seconds
+        print(f"  ✓ Part {i}/{len(chunks)}")
+        # Only the reduce step writes a main title
+        return "\n".join(line for line in text.strip().splitlines() if not line.startswith("# "))
+
+    start = time.perf_counter()
+    sections = await asyncio.gather(*(structure_chunk(i, chunk) for i, chunk in enumerate(chunks, 1)))
+    timings.map = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frame, _ = await complete(backend, semaphore, REDUCE_PROMPT.format(outline=outline(sections)), 2000,
+                              output_path)
+    timings.reduce = time.perf_counter() - start
+
+    head, marker, conclusion = frame.partition("## Conclusion")
+    document = "\n\n".join([head.strip(), *sections] + ([marker + conclusion.rstrip()] if marker else []))
+    return document + "\n", timings
+
+
 def save_markdown(content, output_path):
     """Save the structured content to a markdown file"""
     try:
@@ -86,41 +243,81 @@ def save_markdown(content, output_path):
         sys.exit(1)
 
 
+async def structure(transcription, backend, output_file, chunk_tokens, concurrency):
+    """Picks one request or map-reduce, returns the markdown (PhaseTimings or None)"""
+    try:
+        if estimate_tokens(transcription) <= chunk_tokens:
+            print(f"\nStructuring with {backend} (streamed to {output_file})...")
+            return await structure_single(transcription, backend, output_file), None
+        parts_dir = output_file.with_name(output_file.stem + "_parts")
+        print(f"\nStructuring with {backend} in map-reduce ({concurrency} requests at a time, "
+              f"parts streamed to {parts_dir}, then the frame to {output_file})...")
+        return await structure_map_reduce(transcription, backend, chunk_tokens=chunk_tokens,
+                                          concurrency=concurrency, parts_dir=parts_dir,
+                                          output_path=output_file)
+    finally:
+        await backend.aclose()
+
+
 def main():
     """Main function"""
-    
+    parser = argparse.ArgumentParser(description="Structure a transcription into markdown")
+    parser.add_argument("transcription_file")
+    parser.add_argument("--backend", default="anthropic",
+                        help="anthropic[:model], openai[:model] (mlx_lm.server) or ollama[:model]")
+    parser.add_argument("--base-url", help="Server of the backend (default: see llm_backends.py)")
+    parser.add_argument("--chunk-tokens", type=int, default=6000,
+                        help="Longer transcriptions are structured in map-reduce")
+    parser.add_argument("--concurrency", type=int, default=4, help="Map requests in flight")
+    parser.add_argument("--fake", action="store_true", help="Use a local stand-in server (fake_llm_server.py)")
+    args = parser.parse_args()
+
+    anthropic_backend = args.backend.split(":")[0] == "anthropic"
+    base_url = args.base_url
+    if args.fake:
+        from fake_llm_server import start_server
+        fake_server, _ = start_server()
+        base_url = fake_server.url if anthropic_backend else f"{fake_server.url}/v1"
+        os.environ.setdefault("ANTHROPIC_API_KEY", "fake")
+
     # Check for API key
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
+    if anthropic_backend and not os.environ.get("ANTHROPIC_API_KEY"):
         print("Error: ANTHROPIC_API_KEY environment variable not set.")
         print("Set it with: export ANTHROPIC_API_KEY='your-api-key'")
+        print("Or use a local model: --backend openai (mlx_lm.server) or --backend ollama")
         sys.exit(1)
-    
-    # Get input file path
-    if len(sys.argv) < 2:
-        print("Usage: python structure_transcription.py <transcription_file>")
-        print("Example: python structure_transcription.py transcription.txt")
-        sys.exit(1)
-    
-    input_file = sys.argv[1]
-    
+
+    input_file = args.transcription_file
+
     # Generate output filename
     input_path = Path(input_file)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_file = input_path.parent / f"{input_path.stem}_structured_{timestamp}.md"
-    
+
     print(f"Reading transcription from: {input_file}")
     transcription = read_transcription(input_file)
-    
-    print(f"Transcription length: {len(transcription)} characters")
-    print("\nStructuring with Claude Sonnet...")
-    
-    structured_content = structure_with_claude(transcription, api_key)
-    
+
+    print(f"Transcription length: {len(transcription)} characters (~{estimate_tokens(transcription)} tokens)")
+
+    backend = create_backend(args.backend, base_url=base_url, concurrency=args.concurrency)
+    try:
+        structured_content, timings = asyncio.run(
+            structure(transcription, backend, output_file, args.chunk_tokens, args.concurrency))
+    except LLMError as e:
+        print(f"API Error: {e}")
+        sys.exit(1)
+
     print(f"\nStructured content length: {len(structured_content)} characters")
-    
-    save_markdown(structured_content, output_file)
-    
+    if timings:
+        print(f"⏱️  {timings.summary()}")
+        save_markdown(structured_content, output_file)
+    else:
+        print(f"\n✓ Markdown file created successfully: {output_file}")
+    if backend.retries:
+        print(f"🔁 {backend.retries} requests retried")
+    if args.fake:
+        print(f"🤖 Fake server: {fake_server.summary()}")
+
     print(f"\nDone! You can now view the structured document.")
 
 
@@ -7,45 +7,88 @@ real-time transcription feedback without losing data if something goes wrong.
 
 Key features:
 - Progressive transcription (see results as they come in)
-- Memory efficient (processes one segment at a time)
+- Memory efficient (preallocated capture buffers, one segment at a time)
 - Crash-resistant (only lose the current segment if interrupted)
 - All segments combined in a final master file
 - Optimized for Apple Silicon with MLX
 
 Installation:
 $ brew install portaudio
-$ uv add mlx-whisper pyaudio
+$ uv add mlx-whisper pyaudio numpy
 $ uv run src/whisper_project/transcript-by-segment.py
 
 Usage:
 Press CTRL+C to stop recording.
+
+Every step is logged in <session_dir>/manifest.jsonl. After a crash, transcribe
+only the segments that were recorded but never transcribed with:
+$ uv run transcribe-by-segment.py resume transcriptions/session_YYYYMMDD_HHMMSS
 """
 
-import mlx_whisper
 import pyaudio
-import wave
 from datetime import datetime
 import os
-import threading
-import time
+import sys
+from functools import partial
+
+from audio_io import ArchiveWriter, pcm16_to_float32, write_wav
+from capture_buffer import CaptureRing, fill_segment
+from capture_clock import CaptureClock
+from model_registry import get_model_cache, resolve_model
+from segment_scheduler import SegmentScheduler
+from session_manifest import SessionManifest, load_manifest, pending_segments
+from transcript_writer import TranscriptWriter, read_records
+from stitching import TranscriptStitcher, format_time, words_to_text
+from vad import DETECTORS, VADSegmenter
 
-def record_and_transcribe_continuous(model_size="base", segment_minutes=5):
+def record_and_transcribe_continuous(model_size="base", segment_minutes=5,
+                                     workers=1, max_queue=2, policy="block",
+                                     fallback_model="base", in_memory=True,
+                                     overlap_seconds=0, segmentation="fixed", vad="rms",
+                                     min_segment_seconds=5, max_segment_seconds=30):
     """
     Records and transcribes continuously in segments using MLX Whisper
+
+    With `in_memory`, the captured samples are handed to Whisper as a float32
+    array and the WAV file is only written (in the background) for archival.
+    Otherwise Whisper re-reads each WAV file through ffmpeg.
+
+    Segments are transcribed by a fixed pool of `workers` threads. When more
+    than `max_queue` segments are waiting, `policy` decides what happens:
+    "block" (wait), "drop" (keep the WAV only) or "degrade" (use `fallback_model`).
+
+    With `overlap_seconds`, each segment starts that long before the end of the
+    previous one and the word timestamps are used to stitch the segments into a
+    single timeline without cut or duplicated words. This allows short segments
+    (10-30 s) and therefore low latency.
+
+    With `segmentation="vad"`, segments are closed on pauses in the speech
+    (between `min_segment_seconds` and `max_segment_seconds`) and silences are
+    not transcribed at all. `vad` selects the detector: "rms", "webrtc" or "silero".
     """
     CHUNK = 1024
     FORMAT = pyaudio.paInt16
     CHANNELS = 1
     RATE = 16000
-    SEGMENT_SECONDS = segment_minutes * 60
+    SEGMENT_SECONDS = int(segment_minutes * 60)
+    OVERLAP_SAMPLES = int(overlap_seconds * RATE)
+    if OVERLAP_SAMPLES >= SEGMENT_SECONDS * RATE:
+        raise ValueError("The overlap must be shorter than the segments")
     
-    print(f"Using MLX Whisper '{model_size}' (Apple Silicon optimized)...")
-    if model_size in ["tiny", "base", "small", "medium", "large"]:
-        mlx_model_path = f"mlx-community/whisper-{model_size}-mlx"
-    elif model_size == "turbo":
-        mlx_model_path = "mlx-community/whisper-large-v3-turbo"
-    else:
-        mlx_model_path = "mlx-community/whisper-medium-mlx"
+    segmenter = None
+    if segmentation == "vad":
+        # Segments end on pauses: no overlap to stitch
+        OVERLAP_SAMPLES = 0
+        # Frames are cut to the size the detector expects (512 samples for Silero)
+        segmenter = VADSegmenter(DETECTORS[vad](), min_seconds=min_segment_seconds,
+                                 max_seconds=max_segment_seconds)
+    stitcher = TranscriptStitcher(overlap_seconds) if OVERLAP_SAMPLES else None
+    
+    # Shared model cache: the model stays loaded for the whole session
+    model_cache = get_model_cache()
+    model_name = resolve_model(model_size)
+    print(f"Loading Whisper '{model_name}' ({model_cache.backend.name} backend)...")
+    model_cache.warmup([model_name])
     
     if not os.path.exists("transcriptions"):
         os.makedirs("transcriptions")
@@ -60,9 +103,17 @@ def record_and_transcribe_continuous(model_size="base", segment_minutes=5):
     with open(master_file, "w", encoding="utf-8") as f:
         f.write("=" * 50 + "\n")
         f.write(f"TRANSCRIPTION SESSION - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Model: {model_size} (MLX - Apple Silicon)\n")
+        f.write(f"Model: {model_name} ({model_cache.backend.name})\n")
         f.write("=" * 50 + "\n\n")
     
+    # Crash-safe log of every segment's progress, used by `resume`
+    manifest = SessionManifest(session_dir)
+    manifest.record("session", model=model_name, backend=model_cache.backend.name,
+                    rate=RATE, channels=CHANNELS, segmentation=segmentation,
+                    overlap_seconds=overlap_seconds)
+    # Only the writer appends to the transcripts, in segment order
+    writer = TranscriptWriter(master_file, f"{session_dir}/transcription.jsonl")
+    
     audio = pyaudio.PyAudio()
     stream = audio.open(
         format=FORMAT,
@@ -72,85 +123,324 @@ def record_and_transcribe_continuous(model_size="base", segment_minutes=5):
         frames_per_buffer=CHUNK
     )
     
-    print("\n🎤 Recording in progress ({} minute segments)...".format(segment_minutes))
+    if segmenter:
+        print("\n🎤 Recording in progress (segments cut on speech pauses)...")
+    else:
+        print("\n🎤 Recording in progress ({} minute segments)...".format(segment_minutes))
     print("💡 Press Ctrl+C to stop\n")
     
     segment_num = 1
     is_recording = True
+    clock = CaptureClock(RATE, CHANNELS)  # Session time = frames read / rate
     
-    def transcribe_segment(audio_file, segment_num, model_path):
-        """Transcribes a segment in a separate thread"""
-        print(f"\n📝 Transcribing segment {segment_num} (MLX)...")
+    def transcribe_segment(job):
+        """Transcribes a segment on a scheduler worker thread"""
+        audio_file, segment_num, model_name = job["audio_file"], job["segment_num"], job["model"]
+        print(f"\n📝 Transcribing segment {segment_num} ({model_name})...")
         
-        result = mlx_whisper.transcribe(
-            audio_file,
-            path_or_hf_repo=model_path,
-            language="fr"
-        )
+        try:
+            result = model_cache.transcribe(
+                model_name,
+                job.get("audio", audio_file),
+                language="fr",
+                word_timestamps=stitcher is not None  # Needed to stitch overlaps
+            )
+        except Exception as e:
+            manifest.record("failed", segment=segment_num, stage="transcription", error=str(e))
+            text = f"\n--- SEGMENT {segment_num} {segment_span(job)} ---\n[Transcription failed: {e}]\n"
+            if stitcher:
+                # A gap in the timeline, so the later segments are not held back forever
+                text += words_line(stitcher.skip(segment_num))
+            writer.put(segment_num, text, segment_record(job, status="failed", error=str(e)))
+            raise
         
-        # Append to master file
-        with open(master_file, "a", encoding="utf-8") as f:
-            f.write(f"\n--- SEGMENT {segment_num} ---\n")
-            f.write(result["text"] + "\n")
+        record = segment_record(job, text=result["text"].strip())
+        if stitcher:
+            # The words that are now final continue the timeline (possibly none
+            # if an earlier segment is still running: the stitcher keeps them)
+            writer.put(segment_num, words_line(stitcher.add(segment_num, job["offset"],
+                                                            job["duration"], result)), record)
+        else:
+            writer.put(segment_num, f"\n--- SEGMENT {segment_num} {segment_span(job)} ---\n"
+                                    + result["text"] + "\n", record)
+        manifest.record("transcribed", segment=segment_num, model=model_name)
         
         print(f"✅ Segment {segment_num} transcribed")
         print(f"   Text: {result['text'][:100]}...")
     
-    try:
-        while is_recording:
-            frames = []
-            segment_start = time.time()
-            
-            print(f"\n🔴 Recording segment {segment_num}...")
-            
-            # Record for segment duration
-            while time.time() - segment_start < SEGMENT_SECONDS and is_recording:
-                data = stream.read(CHUNK)
-                frames.append(data)
-            
-            if not frames:
-                break
-            
-            # Save segment
-            audio_file = f"{session_dir}/segment_{segment_num:03d}.wav"
-            wf = wave.open(audio_file, 'wb')
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(audio.get_sample_size(FORMAT))
-            wf.setframerate(RATE)
-            wf.writeframes(b''.join(frames))
-            wf.close()
-            
-            # Transcribe in a separate thread to avoid blocking recording
-            transcribe_thread = threading.Thread(
-                target=transcribe_segment,
-                args=(audio_file, segment_num, mlx_model_path)
-            )
-            transcribe_thread.start()
-            
-            segment_num += 1
-            
-    except KeyboardInterrupt:
-        print("\n✅ Recording completed")
-        is_recording = False
+    def segment_record(job, **fields):
+        return {"segment": job["segment_num"], "model": job["model"], "offset": job["offset"],
+                "duration": job["duration"], **fields}
+    
+    def degrade_segment(job):
+        print(f"⚠️  Transcription is lagging, segment {job['segment_num']} uses '{fallback_model}'")
+        return {**job, "model": resolve_model(fallback_model)}
+    
+    def drop_segment(job):
+        print(f"⚠️  Transcription is lagging, segment {job['segment_num']} kept on disk only")
+        manifest.record("dropped", segment=job["segment_num"])
+        text = (f"\n--- SEGMENT {job['segment_num']} {segment_span(job)} ---\n"
+                f"[Not transcribed: {os.path.basename(job['audio_file'])}]\n")
+        if stitcher:
+            text += words_line(stitcher.skip(job["segment_num"]))
+        writer.put(job["segment_num"], text, segment_record(job, status="dropped"))
+    
+    scheduler = SegmentScheduler(
+        transcribe_segment,
+        workers=workers,
+        max_queue=max_queue,
+        policy=policy,
+        degrade=degrade_segment,
+        on_drop=drop_segment
+    )
+    
+    archive = ArchiveWriter(RATE, CHANNELS)
+    
+    def save_segment(samples, segment_num, offset, on_archived=lambda: None):
+        """Archives the samples to a WAV file and starts their transcription"""
+        audio_file = f"{session_dir}/segment_{segment_num:03d}.wav"
+        job = {
+            "audio_file": audio_file,
+            "segment_num": segment_num,
+            "model": model_name,
+            "offset": offset,
+            "duration": len(samples) / (RATE * CHANNELS)
+        }
+        
+        def archived():
+            # The WAV is complete on disk: the segment can be resumed from now on
+            manifest.record("captured", segment=segment_num, file=os.path.basename(audio_file),
+                            offset=offset, duration=job["duration"])
+        
+        if in_memory:
+            # Single int16 -> float32 conversion, the WAV is written in the background
+            job["audio"] = pcm16_to_float32(samples)
+            archive.submit(audio_file, samples, on_done=archived, release=on_archived)
+        else:
+            try:
+                write_wav(audio_file, samples, RATE, CHANNELS)
+            finally:
+                on_archived()
+            archived()
+        
+        # Transcribe on the worker pool to avoid blocking recording
+        scheduler.submit(job)
+    
+    if segmenter:
+        # Voice activity decides where segments start and end
+        try:
+            while is_recording:
+                data = clock.read(stream, CHUNK)
+                for speech in segmenter.feed(data):
+                    print(f"\n🔴 Speech segment {segment_num} ({speech.duration:.1f}s)")
+                    save_segment(speech.samples, segment_num, speech.start / RATE)
+                    segment_num += 1
+        except KeyboardInterrupt:
+            print("\n✅ Recording completed")
+            is_recording = False
+            speech = segmenter.flush()
+            if speech is not None:
+                save_segment(speech.samples, segment_num, speech.start / RATE)
+    else:
+        # Preallocated int16 buffers: one being filled, the others being archived
+        ring = CaptureRing(SEGMENT_SECONDS * RATE, slots=3, channels=CHANNELS)
+        buffer = ring.acquire()
+        try:
+            while is_recording:
+                print(f"\n🔴 Recording segment {segment_num}...")
+                
+                # Start of the segment in the session, counting the carried overlap
+                offset = (clock.frames_read - buffer.length // CHANNELS) / RATE
+                overflows = clock.overflows
+                
+                # Record until the segment buffer is full
+                fill_segment(stream, buffer, CHUNK, clock=clock)
+                if clock.overflows > overflows:
+                    print(f"⚠️  Input overflow: audio lost in segment {segment_num} ({clock.summary()})")
+                
+                # The next segment starts with the end of this one
+                next_buffer = ring.acquire()
+                if OVERLAP_SAMPLES:
+                    next_buffer.write(buffer.view()[-OVERLAP_SAMPLES * CHANNELS:])
+                
+                save_segment(buffer.view(), segment_num, offset,
+                             partial(ring.release, buffer))  # Zero-copy view
+                buffer = next_buffer
+                segment_num += 1
+                
+        except KeyboardInterrupt:
+            print("\n✅ Recording completed")
+            is_recording = False
+            # Keep the partially recorded segment (if it has more than the overlap)
+            carried = OVERLAP_SAMPLES * CHANNELS if segment_num > 1 else 0
+            if buffer.length > carried:
+                offset = (clock.frames_read - buffer.length // CHANNELS) / RATE
+                save_segment(buffer.view(), segment_num, offset)
     
     stream.stop_stream()
     stream.close()
     audio.terminate()
     
+    print("\n⏳ Waiting for pending transcriptions...")
+    archive.close()
+    scheduler.close()
+    writer.close(words_line(stitcher.flush()) if stitcher else "")
+    print(f"📊 {scheduler.metrics.summary()}")
+    print(f"📊 Writer: {writer.stats.summary()}")
+    print(f"📊 {model_cache.summary()}")
+    print(f"📊 Capture: {clock.summary()}")
+    if segmenter:
+        print(f"📊 VAD: {segmenter.stats.summary()}")
+    
     print(f"\n✨ Session completed!")
     print(f"📁 Directory: {session_dir}")
     print(f"📄 Complete transcription: {master_file}")
 
+def words_line(words):
+    return f"[{format_time(words[0]['start'])}] {words_to_text(words)}\n" if words else ""
+
+def segment_span(job):
+    """Absolute position of a segment in the session"""
+    return f"[{format_time(job['offset'])} - {format_time(job['offset'] + job['duration'])}]"
+
+def consecutive_runs(segments):
+    """Splits segments sorted by number into runs of consecutive numbers"""
+    runs = []
+    for segment in segments:
+        if runs and segment["segment"] == runs[-1][-1]["segment"] + 1:
+            runs[-1].append(segment)
+        else:
+            runs.append([segment])
+    return runs
+
+def resume_session(session_dir, workers=1):
+    """
+    Transcribes the segments of an interrupted session that were recorded
+    but never transcribed (according to its manifest)
+
+    The resumed segments are appended after what the session already wrote,
+    under a header per run of consecutive segments giving its place in the
+    session. With overlapping segments, each run is stitched to the segments
+    around it: the segment before is transcribed again to merge the overlap,
+    and the words already written by the segment after are not repeated.
+    """
+    state = load_manifest(session_dir)
+    pending = pending_segments(session_dir)
+    if not pending:
+        print(f"✅ Nothing to resume in {session_dir}")
+        return
+
+    model_cache = get_model_cache()
+    model_name = resolve_model(state["session"].get("model", "base"))
+    print(f"🔄 Resuming {len(pending)} segment(s) with '{model_name}': "
+          f"{', '.join(str(seg['segment']) for seg in pending)}")
+    model_cache.warmup([model_name])
+
+    master_file = f"{session_dir}/transcription_complete.txt"
+    jsonl_file = f"{session_dir}/transcription.jsonl"
+    manifest = SessionManifest(session_dir)
+    manifest.record("resumed", segments=[seg["segment"] for seg in pending])
+    overlap = state["session"].get("overlap_seconds", 0)
+    written = read_records(jsonl_file)  # What the session managed to write
+    runs = consecutive_runs(pending)
+
+    # Written segments just before a run, transcribed again to stitch the overlap
+    seeds = []
+    if overlap:
+        for run in runs:
+            before = state["segments"].get(run[0]["segment"] - 1)
+            done = before is not None and "status" not in written.get(before["segment"], {"status": "missing"})
+            if done and os.path.exists(os.path.join(session_dir, before.get("file", ""))):
+                seeds.append(before)
+
+    results = {}
+
+    def transcribe_segment(segment):
+        num = segment["segment"]
+        try:
+            results[num] = model_cache.transcribe(model_name, os.path.join(session_dir, segment["file"]),
+                                                  language="fr", word_timestamps=bool(overlap))
+        except Exception as e:
+            results[num] = e
+            raise
+
+    scheduler = SegmentScheduler(transcribe_segment, workers=workers, max_queue=workers * 2)
+    for segment in seeds + pending:
+        scheduler.submit(segment)
+    scheduler.close()
+
+    # Runs are written in session order, keyed by their position in the output
+    writer = TranscriptWriter(master_file, jsonl_file, first=0)
+    position = 0
+    for run in runs:
+        first, last = run[0]["segment"], run[-1]["segment"]
+        span = segment_span({"offset": run[0]["offset"],
+                             "duration": run[-1]["offset"] + run[-1]["duration"] - run[0]["offset"]})
+        numbers = f"SEGMENT {first}" if first == last else f"SEGMENTS {first}-{last}"
+        text = f"\n--- RESUMED {numbers} {span} (after segment {first - 1}) ---\n"
+        stitcher = None
+        if overlap:
+            stitcher = TranscriptStitcher(overlap, first=first)
+            before = state["segments"].get(first - 1)
+            if before in seeds and not isinstance(results.get(first - 1), Exception):
+                # The tail of the segment before is already written if the session
+                # got to mark this one as failed or dropped
+                stitcher.seed(first - 1, before["offset"], before["duration"], results[first - 1],
+                              written=first in written)
+        for segment in run:
+            num = segment["segment"]
+            result = results.get(num)
+            record = {"segment": num, "model": model_name, "offset": segment["offset"],
+                      "duration": segment["duration"], "resumed": True}
+            if isinstance(result, Exception) or result is None:
+                manifest.record("failed", segment=num, stage="transcription", error=str(result))
+                text += f"[Segment {num} {segment_span(segment)}: transcription failed: {result}]\n"
+                if stitcher:
+                    text += words_line(stitcher.skip(num))
+                record.update(status="failed", error=str(result))
+            else:
+                record["text"] = result["text"].strip()
+                if stitcher:
+                    text += words_line(stitcher.add(num, segment["offset"], segment["duration"], result))
+                else:
+                    text += f"\n--- SEGMENT {num} {segment_span(segment)} (resumed) ---\n{result['text']}\n"
+            writer.put(position, text, record)
+            position += 1
+            text = ""
+            if "status" not in record:
+                manifest.record("transcribed", segment=num, model=model_name)
+                print(f"✅ Segment {num} transcribed")
+        if stitcher:
+            # The segment after the run may already have written its side of the overlap
+            after = state["segments"].get(last + 1)
+            until = after["offset"] if after and last + 1 in written else None
+            writer.put(position, words_line(stitcher.flush(until)))
+            position += 1
+    writer.close()
+    print(f"📊 {scheduler.metrics.summary()}")
+    print(f"📄 Complete transcription: {master_file}")
+
 if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "resume":
+        resume_session(sys.argv[2])
+        sys.exit(0)
+
     print("=" * 60)
     print("   CONTINUOUS AUDIO TRANSCRIBER (MLX)")
     print("=" * 60)
     
     model = input("\nModel size (tiny/base/small/medium/large/turbo) [base]: ").strip() or "base"
-    segment = input("Segment duration in minutes [5]: ").strip()
-    segment = int(segment) if segment else 5
+    segmentation = input("Segmentation (fixed/vad) [fixed]: ").strip() or "fixed"
+    segment, overlap = 5, 0
+    if segmentation != "vad":
+        segment = input("Segment duration in minutes [5]: ").strip()
+        segment = float(segment) if segment else 5
+        overlap = input("Overlap between segments in seconds (0 = none) [0]: ").strip()
+        overlap = float(overlap) if overlap else 0
+    policy = input("When transcription lags behind (block/drop/degrade) [block]: ").strip() or "block"
     
     try:
-        record_and_transcribe_continuous(model, segment)
+        record_and_transcribe_continuous(model, segment, policy=policy, overlap_seconds=overlap,
+                                         segmentation=segmentation)
     except Exception as e:
         print(f"\n❌ Error: {e}")
\ No newline at end of file
@@ -3,6 +3,14 @@ This code records audio from your microphone and automatically transcribes it to
 text using MLX Whisper (optimized for Apple Silicon), saving both the audio file 
 and timestamped transcription.
 
+By default the recording is transcribed while it goes: the audio is cut on
+pauses into windows of at most `window_seconds` (silence skipped), each window
+is transcribed in the background, and the WAV is written as it is recorded.
+The transcript is ready about one window after Ctrl+C instead of after the
+whole recording, and memory stays bounded. A window of 0 keeps the previous
+behavior (transcribe the whole file once recording stops). The output file
+has the same format in both modes.
+
 Installation:
 $ brew install portaudio
 $ uv add mlx-whisper pyaudio
@@ -11,13 +19,121 @@ Usage:
 $ uv run transcribe-mic.py
 Press CTRL+C to stop recording.
 """
-import mlx_whisper
+import numpy as np
 import pyaudio
+import time
 import wave
 from datetime import datetime
 import os
 
-def record_and_transcribe(model_size="base"):
+from audio_io import pcm16_to_float32
+from capture_clock import CaptureClock
+from model_registry import get_model_cache, resolve_model
+from segment_scheduler import SegmentScheduler
+from transcription_cache import get_transcription_cache
+from vad import SAMPLE_RATE, VADSegmenter
+
+
+def write_transcription(output_file, result):
+    """Writes the full text followed by the timestamped segments"""
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("=" * 50 + "\n")
+        f.write(f"TRANSCRIPTION - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write("=" * 50 + "\n\n")
+        f.write(result["text"] + "\n\n")
+        
+        f.write("-" * 50 + "\n")
+        f.write("DETAILS WITH TIMESTAMPS:\n")
+        f.write("-" * 50 + "\n\n")
+        
+        for segment in result["segments"]:
+            start = segment["start"]
+            end = segment["end"]
+            text = segment["text"]
+            f.write(f"[{start:.2f}s - {end:.2f}s] {text}\n")
+
+
+class RollingTranscriber:
+    """
+    Transcribes speech windows on a background thread while recording goes on.
+    Segment timestamps are shifted to the position of their window.
+
+    At most `max_pending` windows wait for the model so memory stays bounded:
+    if transcription falls behind, the next windows are only written to the WAV
+    and transcribed from it by finish(). Failed windows are marked as gaps.
+    """
+
+    def __init__(self, model_cache, model_name, window_seconds, language="fr", max_pending=2):
+        self.model_cache = model_cache
+        self.model_name = model_name
+        self.language = language
+        self.segmenter = VADSegmenter(min_seconds=min(5.0, window_seconds), max_seconds=window_seconds)
+        self.scheduler = SegmentScheduler(self._transcribe_job, workers=1, max_queue=max_pending,
+                                          policy="drop", on_drop=self._drop)
+        self._results = {}  # Window number -> segments
+        self._skipped = {}  # Window number -> (start, end) in samples, transcribed from the WAV
+        self._count = 0
+
+    def feed(self, data):
+        for window in self.segmenter.feed(data):
+            self._submit(window)
+
+    def _submit(self, window):
+        self._count += 1
+        self.scheduler.submit({"segment_num": self._count, "window": window})
+
+    def _transcribe_job(self, job):
+        window = job["window"]
+        self._transcribe(job["segment_num"], window.samples, window.start)
+
+    def _transcribe(self, num, samples, start):
+        offset = start / SAMPLE_RATE
+        end = (start + len(samples)) / SAMPLE_RATE
+        try:
+            result = self.model_cache.transcribe(self.model_name, pcm16_to_float32(samples),
+                                                 language=self.language)
+        except Exception as e:
+            self._results[num] = [{"start": offset, "end": end, "text": f" [Transcription failed: {e}]"}]
+            raise
+        segments = [{**seg, "start": seg["start"] + offset, "end": seg["end"] + offset}
+                    for seg in result["segments"]]
+        self._results[num] = segments
+        print(f"   📝 [{offset:.0f}s - {end:.0f}s] {result['text'].strip()}")
+
+    def _drop(self, job):
+        # Only the span is kept: the samples are read back from the WAV at the end
+        window = job["window"]
+        print(f"   ⚠️  Transcription is lagging, [{window.start / SAMPLE_RATE:.0f}s - "
+              f"{window.end / SAMPLE_RATE:.0f}s] will be transcribed at the end")
+        self._skipped[job["segment_num"]] = (window.start, window.end)
+
+    def finish(self, audio_file):
+        """
+        Transcribes the last window and the windows skipped while recording
+        (read from `audio_file`), and returns the whole result
+        """
+        last = self.segmenter.flush()
+        if last is not None:
+            self._submit(last)
+        self.scheduler.close()
+        if self._skipped:
+            print(f"📝 Transcribing {len(self._skipped)} window(s) skipped while recording...")
+            with wave.open(audio_file, 'rb') as wf:
+                for num, (start, end) in sorted(self._skipped.items()):
+                    wf.setpos(start)
+                    samples = np.frombuffer(wf.readframes(end - start), dtype=np.int16)
+                    try:
+                        self._transcribe(num, samples, start)
+                    except Exception as e:
+                        print(f"❌ Window {num} failed: {e}")
+        segments = [seg for num in sorted(self._results) for seg in self._results[num]]
+        return {
+            "text": " ".join(seg["text"].strip() for seg in segments if seg["text"].strip()),
+            "segments": segments
+        }
+
+
+def record_and_transcribe(model_size="base", window_seconds=30):
     """
     Records audio until the user presses Ctrl+C
     """
@@ -27,8 +143,10 @@ def record_and_transcribe(model_size="base"):
     CHANNELS = 1
     RATE = 16000
     
-    print(f"Loading MLX Whisper model '{model_size}'...")
-    # MLX Whisper charge automatiquement le modèle optimisé
+    model_cache = get_model_cache()
+    model_name = resolve_model(model_size)
+    print(f"Loading Whisper model '{model_name}' ({model_cache.backend.name} backend)...")
+    model_cache.warmup([model_name])
     
     # Create folder
     if not os.path.exists("transcriptions"):
@@ -51,10 +169,17 @@ def record_and_transcribe(model_size="base"):
     print("\n🎤 Recording in progress...")
     print("💡 Press Ctrl+C to stop\n")
     
+    if window_seconds:
+        record_rolling(stream, audio.get_sample_size(FORMAT), audio_file, output_file,
+                       model_cache, model_name, window_seconds, CHUNK, CHANNELS, RATE)
+        audio.terminate()
+        return
+    
     frames = []
+    clock = CaptureClock(RATE, CHANNELS)  # Overflows are counted instead of raising
     try:
         while True:
-            data = stream.read(CHUNK)
+            data = clock.read(stream, CHUNK)
             frames.append(data)
     except KeyboardInterrupt:
         print("\n✅ Recording completed")
@@ -74,30 +199,56 @@ def record_and_transcribe(model_size="base"):
     
     # Transcribe with MLX Whisper
     print("📝 Transcription in progress (using Apple Silicon acceleration)...")
-    result = mlx_whisper.transcribe(
+    transcription_cache = get_transcription_cache()
+    result = transcription_cache.transcribe(
+        lambda audio: model_cache.transcribe(model_name, audio, language="fr"),
         audio_file,
-        path_or_hf_repo=f"mlx-community/whisper-{model_size}-mlx",
+        model=f"{model_cache.backend.name}/{model_name}",
         language="fr"
     )
     
     # Save transcription
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write("=" * 50 + "\n")
-        f.write(f"TRANSCRIPTION - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write("=" * 50 + "\n\n")
-        f.write(result["text"] + "\n\n")
-        
-        f.write("-" * 50 + "\n")
-        f.write("DETAILS WITH TIMESTAMPS:\n")
-        f.write("-" * 50 + "\n\n")
-        
-        for segment in result["segments"]:
-            start = segment["start"]
-            end = segment["end"]
-            text = segment["text"]
-            f.write(f"[{start:.2f}s - {end:.2f}s] {text}\n")
+    write_transcription(output_file, result)
     
     print(f"\n✅ Transcription saved: {output_file}")
+    print(f"📊 {transcription_cache.stats.summary()}")
+    print(f"\n📄 Transcribed text:\n{'-'*50}\n{result['text']}\n{'-'*50}")
+
+
+def record_rolling(stream, sample_size, audio_file, output_file, model_cache, model_name,
+                   window_seconds, chunk, channels, rate):
+    """
+    Records until Ctrl+C, writing the WAV and transcribing windows as they close
+    """
+    transcriber = RollingTranscriber(model_cache, model_name, window_seconds)
+    clock = CaptureClock(rate, channels)  # Overflows are counted instead of raising
+    wf = wave.open(audio_file, 'wb')
+    wf.setnchannels(channels)
+    wf.setsampwidth(sample_size)
+    wf.setframerate(rate)
+    try:
+        while True:
+            data = clock.read(stream, chunk)
+            wf.writeframes(data)
+            transcriber.feed(data)
+    except KeyboardInterrupt:
+        print("\n✅ Recording completed")
+    finally:
+        # The WAV stays valid whatever stopped the recording
+        wf.close()
+        stream.stop_stream()
+        stream.close()
+    stopped = time.perf_counter()
+    
+    print("📝 Transcribing the last window...")
+    result = transcriber.finish(audio_file)
+    write_transcription(output_file, result)
+    
+    print(f"\n✅ Transcription saved: {output_file} "
+          f"({time.perf_counter() - stopped:.1f}s after the end of the recording)")
+    print(f"📊 {transcriber.segmenter.stats.summary()}")
+    print(f"📊 {transcriber.scheduler.metrics.summary()}")
+    print(f"📊 Capture: {clock.summary()}")
     print(f"\n📄 Transcribed text:\n{'-'*50}\n{result['text']}\n{'-'*50}")
 
 if __name__ == "__main__":
@@ -106,9 +257,10 @@ if __name__ == "__main__":
     print("=" * 60)
     
     model = input("\nModel size (tiny/base/small/medium/large) [base]: ").strip() or "base"
+    window = input("Window in seconds for live transcription (0 = after recording) [30]: ").strip() or "30"
     
     try:
-        record_and_transcribe(model)
+        record_and_transcribe(model, float(window))
         print("\n✨ Completed successfully!")
     except Exception as e:
         print(f"\n❌ Error: {e}")
\ No newline at end of file
@@ -6,7 +6,7 @@ for Apple Silicon), and identifies different speakers using pyannote.audio.
 
 Installation:
 $ brew install portaudio ffmpeg
-$ uv add mlx-whisper pyaudio pyannote.audio pydub torch python-dotenv soundfile onnxruntime
+$ uv add mlx-whisper pyaudio pyannote.audio pydub torch python-dotenv soundfile onnxruntime numpy
 
 Setup:
 1. Get a free HuggingFace token: https://huggingface.co/settings/tokens
@@ -34,26 +34,45 @@ import warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="pyannote.audio.core.io")
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pyannote.database")
 
-import mlx_whisper
 import pyaudio
-import wave
 from datetime import datetime
 import os
-import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pyannote.audio import Pipeline
 import json
 from dotenv import load_dotenv
 import soundfile as sf
 import torch
 
+from audio_io import ArchiveWriter, pcm16_to_float32, write_wav
+from capture_buffer import CaptureRing, fill_segment
+from capture_clock import CaptureClock
+from model_registry import get_model_cache, resolve_model
+from segment_scheduler import SegmentScheduler, StageError, run_stages
+from session_manifest import SessionManifest
+from transcript_writer import TranscriptWriter
+from speaker_index import SpeakerIndex, split_by_speaker
+from speaker_registry import SpeakerRegistry
+
 # Load environment variables from .env file
 load_dotenv()
 
-def record_and_transcribe_with_diarization(model_size="base", segment_minutes=5):
+def record_and_transcribe_with_diarization(model_size="base", segment_minutes=5,
+                                           workers=1, max_queue=2, policy="block",
+                                           fallback_model="base", in_memory=True):
     """
     Records and transcribes continuously with speaker identification
     Combines MLX Whisper (fast) with pyannote (speaker detection)
+
+    With `in_memory`, the captured samples are converted once to a float32
+    array shared by Whisper and pyannote, and the WAV file is only written
+    (in the background) for archival.
+
+    Segments are processed by a fixed pool of `workers` threads. When more
+    than `max_queue` segments are waiting, `policy` decides what happens:
+    "block" (wait), "drop" (keep the WAV only) or "degrade" (use `fallback_model`).
     """
     CHUNK = 1024
     FORMAT = pyaudio.paInt16
@@ -61,13 +80,11 @@ def record_and_transcribe_with_diarization(model_size="base", segment_minutes=5)
     RATE = 16000
     SEGMENT_SECONDS = segment_minutes * 60
     
-    print(f"🔄 Using MLX Whisper '{model_size}' (Apple Silicon optimized)...")
-    if model_size in ["tiny", "base", "small", "medium", "large"]:
-        mlx_model_path = f"mlx-community/whisper-{model_size}-mlx"
-    elif model_size == "turbo":
-        mlx_model_path = "mlx-community/whisper-large-v3-turbo"
-    else:
-        mlx_model_path = "mlx-community/whisper-medium-mlx"
+    # Shared model cache: the model stays loaded for the whole session
+    model_cache = get_model_cache()
+    model_name = resolve_model(model_size)
+    print(f"🔄 Loading Whisper '{model_name}' ({model_cache.backend.name} backend)...")
+    model_cache.warmup([model_name])
     
     print("🔄 Loading diarization model...")
     
@@ -110,9 +127,16 @@ def record_and_transcribe_with_diarization(model_size="base", segment_minutes=5)
         f.write("=" * 70 + "\n")
         f.write(f"TRANSCRIPTION SESSION WITH SPEAKER DIARIZATION\n")
         f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Model: {model_size} (MLX Whisper + Pyannote)\n")
+        f.write(f"Model: {model_name} (Whisper {model_cache.backend.name} + Pyannote)\n")
         f.write("=" * 70 + "\n\n")
     
+    # Crash-safe log of every segment's progress
+    manifest = SessionManifest(session_dir)
+    manifest.record("session", model=model_name, backend=model_cache.backend.name,
+                    rate=RATE, channels=CHANNELS, diarization=True)
+    # Only the writer appends to the transcripts, in segment order
+    writer = TranscriptWriter(master_file, f"{session_dir}/transcription.jsonl")
+    
     audio = pyaudio.PyAudio()
     stream = audio.open(
         format=FORMAT,
@@ -127,13 +151,26 @@ def record_and_transcribe_with_diarization(model_size="base", segment_minutes=5)
     
     segment_num = 1
     is_recording = True
+    # One executor per stage: diarization and transcription overlap
+    stage_executors = {
+        "diarization": ThreadPoolExecutor(max_workers=1, thread_name_prefix="diarization"),
+        "transcription": ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcription")
+    }
+    clock = CaptureClock(RATE, CHANNELS)  # Session time = frames read / rate
+    # Same person, same label in every segment
+    speaker_registry = SpeakerRegistry()
     
-    def transcribe_with_speakers(audio_file, segment_num):
+    def transcribe_with_speakers(job):
         """Transcribes a segment with speaker identification"""
+        audio_file, segment_num, model_name = job["audio_file"], job["segment_num"], job["model"]
         print(f"\n📝 Analyzing segment {segment_num}...")
 
-        # Load audio in memory (workaround for torchcodec issues)
-        waveform, sample_rate = sf.read(audio_file)
+        if "audio" in job:
+            # Decoded once by the recorder, shared by both models
+            waveform, sample_rate = job["audio"], RATE
+        else:
+            # Load audio in memory (workaround for torchcodec issues)
+            waveform, sample_rate = sf.read(audio_file, dtype="float32")
         # Convert to torch tensor and add channel dimension if needed
         waveform_tensor = torch.from_numpy(waveform).float()
         if waveform_tensor.ndim == 1:
@@ -144,76 +181,61 @@ def record_and_transcribe_with_diarization(model_size="base", segment_minutes=5)
             "sample_rate": sample_rate
         }
 
-        # 1. Diarization (who speaks when)
-        print(f"   👥 Identifying speakers...")
-        diarization = diarization_pipeline(audio_dict)
+        # 1. Diarization (who speaks when) and 2. transcription run concurrently
+        # on the same waveform, they only meet at the merge step
+        print(f"   👥 Identifying speakers and 🗣️  transcribing ({model_name})...")
+        try:
+            results, timings = run_stages({
+                "diarization": lambda: diarization_pipeline(audio_dict),
+                "transcription": lambda: model_cache.transcribe(
+                    model_name,
+                    waveform,
+                    language="fr",
+                    word_timestamps=True  # Important for syncing with diarization
+                )
+            }, stage_executors)
+        except StageError as e:
+            manifest.record("failed", segment=segment_num, stage=e.stage, error=str(e.__cause__))
+            writer.put(segment_num, segment_header(job) + f"[Analysis failed: {e}]\n\n",
+                       {"segment": segment_num, "offset": job["offset"], "duration": job["duration"],
+                        "status": "failed", "error": str(e)})
+            raise
+        diarization, result = results["diarization"], results["transcription"]
         
-        # 2. Transcription with MLX Whisper (fast!)
-        print(f"   🗣️  Transcribing audio (MLX)...")
-        result = mlx_whisper.transcribe(
-            audio_file,
-            path_or_hf_repo=mlx_model_path,
-            language="fr",
-            word_timestamps=True  # Important for syncing with diarization
-        )
-        
-        # 3. Merge diarization and transcription
+        # 3. Merge diarization and transcription, one speaker per word
         print(f"   🔗 Merging data...")
-        transcript_with_speakers = []
-        
-        for segment in result["segments"]:
-            start_time = segment["start"]
-            end_time = segment["end"]
-            text = segment["text"]
-            
-            # Find dominant speaker for this segment
-            speaker = get_speaker_for_time(diarization, start_time, end_time)
-            
-            transcript_with_speakers.append({
-                "speaker": speaker,
-                "start": start_time,
-                "end": end_time,
-                "text": text.strip()
-            })
+        # pyannote.audio 4.0+ DiarizeOutput has .speaker_diarization and
+        # .speaker_embeddings: relabel with the speakers known in the session
+        speakers = SpeakerIndex.from_pyannote(speaker_registry.match_pyannote(diarization))
+        # Split where the speaker changes, with session timestamps
+        merge_start = time.perf_counter()
+        transcript_with_speakers = split_by_speaker(result["segments"], speakers, offset=job["offset"])
+        timings["merge"] = time.perf_counter() - merge_start
         
-        # 4. Format and save
-        formatted_text = format_transcript(transcript_with_speakers, segment_num)
-        
-        with open(master_file, "a", encoding="utf-8") as f:
-            f.write(formatted_text)
+        # 4. Format and save (the writer appends segments in order)
+        record = {
+            "segment": segment_num,
+            "offset": job["offset"],
+            "duration": job["duration"],
+            "timings": {name: round(value, 3) for name, value in timings.items()},
+            "transcript": transcript_with_speakers
+        }
+        writer.put(segment_num, format_transcript(transcript_with_speakers, job), record)
         
         # Also save as JSON for later analysis
         json_file = f"{session_dir}/segment_{segment_num:03d}.json"
         with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(transcript_with_speakers, f, ensure_ascii=False, indent=2)
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        manifest.record("transcribed", segment=segment_num, model=model_name)
+        manifest.record("diarized", segment=segment_num)
         
-        print(f"✅ Segment {segment_num} completed")
+        print(f"✅ Segment {segment_num} completed in {timings['total']:.1f}s "
+              f"(diarization {timings['diarization']:.1f}s, transcription {timings['transcription']:.1f}s)")
         print_preview(transcript_with_speakers)
     
-    def get_speaker_for_time(diarization, start, end):
-        """Finds the main speaker for a time interval"""
-        speaker_time = {}
-
-        # pyannote.audio 4.0+ DiarizeOutput has .speaker_diarization attribute
-        for turn, speaker in diarization.speaker_diarization:
-            overlap_start = max(turn.start, start)
-            overlap_end = min(turn.end, end)
-
-            if overlap_start < overlap_end:
-                duration = overlap_end - overlap_start
-                speaker_time[speaker] = speaker_time.get(speaker, 0) + duration
-
-        if not speaker_time:
-            return "Unknown Speaker"
-
-        return max(speaker_time, key=speaker_time.get)
-    
-    def format_transcript(segments, segment_num):
+    def format_transcript(segments, job):
         """Formats transcription with speakers"""
-        output = f"\n{'='*70}\n"
-        output += f"SEGMENT {segment_num}\n"
-        output += f"{'='*70}\n\n"
-        
+        output = segment_header(job)
         current_speaker = None
         
         for seg in segments:
@@ -240,53 +262,115 @@ def record_and_transcribe_with_diarization(model_size="base", segment_minutes=5)
         secs = int(seconds % 60)
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
     
+    def segment_span(job):
+        """Absolute position of a segment in the session"""
+        return f"[{format_time(job['offset'])} - {format_time(job['offset'] + job['duration'])}]"
+    
+    def segment_header(job):
+        return f"\n{'='*70}\nSEGMENT {job['segment_num']} {segment_span(job)}\n{'='*70}\n\n"
+    
     def print_preview(segments):
         """Displays preview of first 3 sentences"""
         preview = segments[:3] if len(segments) > 3 else segments
         for seg in preview:
             print(f"   {seg['speaker']}: {seg['text'][:60]}...")
     
+    def degrade_segment(job):
+        print(f"⚠️  Processing is lagging, segment {job['segment_num']} uses '{fallback_model}'")
+        return {**job, "model": resolve_model(fallback_model)}
+    
+    def drop_segment(job):
+        print(f"⚠️  Processing is lagging, segment {job['segment_num']} kept on disk only")
+        manifest.record("dropped", segment=job["segment_num"])
+        writer.put(job["segment_num"],
+                   segment_header(job) + f"[Not transcribed: {os.path.basename(job['audio_file'])}]\n\n",
+                   {"segment": job["segment_num"], "offset": job["offset"], "duration": job["duration"],
+                    "status": "dropped"})
+    
+    scheduler = SegmentScheduler(
+        transcribe_with_speakers,
+        workers=workers,
+        max_queue=max_queue,
+        policy=policy,
+        degrade=degrade_segment,
+        on_drop=drop_segment
+    )
+    
+    # Preallocated int16 buffers: one being filled, the others being archived
+    ring = CaptureRing(SEGMENT_SECONDS * RATE, slots=3, channels=CHANNELS)
+    archive = ArchiveWriter(RATE, CHANNELS)
+    
+    def save_segment(buffer, segment_num, offset):
+        """Archives the buffer to a WAV file and queues its analysis"""
+        audio_file = f"{session_dir}/segment_{segment_num:03d}.wav"
+        job = {
+            "audio_file": audio_file,
+            "segment_num": segment_num,
+            "model": model_name,
+            "offset": offset,
+            "duration": buffer.length / (RATE * CHANNELS)
+        }
+        
+        def archived():
+            manifest.record("captured", segment=segment_num, file=os.path.basename(audio_file),
+                            offset=offset, duration=job["duration"])
+        
+        if in_memory:
+            job["audio"] = pcm16_to_float32(buffer.view())
+            # "captured" only once the WAV is on disk, the buffer goes back to the ring anyway
+            archive.submit(audio_file, buffer.view(), on_done=archived, release=partial(ring.release, buffer))
+        else:
+            try:
+                write_wav(audio_file, buffer.view(), RATE, CHANNELS)
+            finally:
+                ring.release(buffer)
+            archived()
+        
+        # Transcribe with diarization on the worker pool
+        scheduler.submit(job)
+    
     # Main recording loop
+    buffer = None
     try:
         while is_recording:
-            frames = []
-            segment_start = time.time()
+            buffer = ring.acquire()
             
             print(f"\n🔴 Recording segment {segment_num}...")
             
-            while time.time() - segment_start < SEGMENT_SECONDS and is_recording:
-                data = stream.read(CHUNK)
-                frames.append(data)
-            
-            if not frames:
-                break
-            
-            # Save segment
-            audio_file = f"{session_dir}/segment_{segment_num:03d}.wav"
-            wf = wave.open(audio_file, 'wb')
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(audio.get_sample_size(FORMAT))
-            wf.setframerate(RATE)
-            wf.writeframes(b''.join(frames))
-            wf.close()
-            
-            # Transcribe with diarization in separate thread
-            transcribe_thread = threading.Thread(
-                target=transcribe_with_speakers,
-                args=(audio_file, segment_num)
-            )
-            transcribe_thread.start()
+            offset = clock.seconds
+            overflows = clock.overflows
+            fill_segment(stream, buffer, CHUNK, clock=clock)
+            if clock.overflows > overflows:
+                print(f"⚠️  Input overflow: audio lost in segment {segment_num} ({clock.summary()})")
             
+            save_segment(buffer, segment_num, offset)
+            buffer = None
             segment_num += 1
             
     except KeyboardInterrupt:
         print("\n✅ Recording completed")
         is_recording = False
+        # Keep the partially recorded segment
+        if buffer is not None and buffer.length:
+            save_segment(buffer, segment_num, clock.seconds - buffer.length / (RATE * CHANNELS))
     
     stream.stop_stream()
     stream.close()
     audio.terminate()
     
+    print("\n⏳ Waiting for pending segments...")
+    archive.close()
+    scheduler.close()
+    writer.close()
+    for executor in stage_executors.values():
+        executor.shutdown()
+    print(f"📊 {scheduler.metrics.summary()}")
+    print(f"📊 Writer: {writer.stats.summary()}")
+    print(f"📊 {model_cache.summary()}")
+    print(f"📊 Capture: {clock.summary()}")
+    print(f"👥 Speakers in session: {', '.join(speaker_registry.labels) or 'none'}")
+    speaker_registry.save(f"{session_dir}/speakers.json")
+    
     print(f"\n✨ Session completed!")
     print(f"📁 Directory: {session_dir}")
     print(f"📄 Transcription: {master_file}")
@@ -305,9 +389,10 @@ if __name__ == "__main__":
     model = input("\nWhisper model (tiny/base/small/medium/large/turbo) [medium]: ").strip() or "medium"
     segment = input("Segment duration in minutes [5]: ").strip()
     segment = int(segment) if segment else 5
+    policy = input("When processing lags behind (block/drop/degrade) [block]: ").strip() or "block"
     
     try:
-        record_and_transcribe_with_diarization(model, segment)
+        record_and_transcribe_with_diarization(model, segment, policy=policy)
     except Exception as e:
         print(f"\n❌ Error: {e}")
         import traceback
@@ -0,0 +1,328 @@
+"""
+Transcript export: SRT, WebVTT, TSV subtitles and a compact word timeline.
+
+Works from any result in the mlx_whisper format ({"segments": [{"start",
+"end", "text", "words": [...]}]}) or any iterable of such segments, e.g. read
+line by line from a transcription.jsonl. Everything is written as it is
+produced, so a multi-hour transcript never has to be turned into one string.
+
+Subtitle cues are built from the word timestamps (word_timestamps=True): a cue
+ends before it would need more than `max_lines` lines of `max_chars`, last
+longer than `max_seconds` or span a pause longer than `max_gap`, and after a
+sentence end once it holds at least a full line. Lines are balanced. Segments
+without word timestamps are split the same way, with word times interpolated
+over the segment.
+
+Word timeline formats:
+- "wtl": binary, a header then per word uint32 start (ms), uint16 duration
+  (ms), uint8 probability, uint8 length and the UTF-8 text (at most 255
+  bytes): 8 bytes plus the text, ~15.5 bytes a word in French
+- "parquet": columns start, end, word, probability ($ uv add pyarrow)
+
+Every format has a reader, so exports can be checked by round trip
+(tests/test_transcript_export.py).
+
+Installation:
+$ uv add pyarrow   # only for parquet
+
+Usage:
+    from transcript_export import export
+    export(result, "meeting.srt")
+    export(result, "meeting.vtt", max_chars=37, max_lines=2)
+    export(result, "meeting.wtl")
+"""
+import math
+import re
+import struct
+import textwrap
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+SUBTITLE_FORMATS = ("srt", "vtt", "tsv")
+WORD_FORMATS = ("wtl", "parquet")
+EXPORT_FORMATS = SUBTITLE_FORMATS + WORD_FORMATS
+
+WTL_MAGIC = b"WTL1"
+_WTL_HEADER = struct.Struct("<4sI")
+_WTL_WORD = struct.Struct("<IHBB")
+_SENTENCE_END = re.compile(r"[.!?…]['\")»]?$")
+
+Segments = Union[dict, Iterable[dict]]
+
+
+@dataclass
+class Cue:
+    start: float
+    end: float
+    lines: List[str]
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.lines)
+
+
+# ============================================================
+# WORDS AND CUES
+# ============================================================
+
+def _segments(result: Segments) -> Iterable[dict]:
+    return result["segments"] if isinstance(result, dict) else result
+
+
+def iter_words(result: Segments) -> Iterator[dict]:
+    """Words of every segment; segments without word timestamps are interpolated"""
+    for segment in _segments(result):
+        words = segment.get("words") or []
+        if words:
+            yield from words
+            continue
+        tokens = segment["text"].split()
+        if not tokens:
+            continue
+        # Time shared out in proportion to the length of each word
+        total = sum(len(t) + 1 for t in tokens)
+        start, span = segment["start"], segment["end"] - segment["start"]
+        position = 0
+        for token in tokens:
+            word_start = start + span * position / total
+            position += len(token) + 1
+            yield {"word": f" {token}", "start": word_start, "end": start + span * position / total,
+                   "probability": 1.0}
+
+
+def wrap_lines(text: str, max_chars: int) -> List[str]:
+    """Wraps `text` in as few lines as textwrap would, of balanced lengths"""
+    lines = textwrap.wrap(text, max_chars)
+    if len(lines) < 2:
+        return lines
+    width = math.ceil(len(text) / len(lines))
+    while True:
+        balanced = textwrap.wrap(text, width)
+        if len(balanced) <= len(lines):
+            return balanced
+        width += 1
+
+
+def split_cues(result: Segments, max_chars: int = 42, max_lines: int = 2, max_seconds: float = 7.0,
+               max_gap: float = 1.0) -> Iterator[Cue]:
+    """Groups the words into subtitle cues, see the module docstring"""
+    words: List[Tuple[float, float, str]] = []
+    text = ""
+
+    def cue():
+        return Cue(words[0][0], words[-1][1], wrap_lines(text, max_chars))
+
+    for w in iter_words(result):
+        word = w["word"].strip()
+        if not word:
+            continue
+        if words:
+            candidate = f"{text} {word}"
+            # Balanced lines take as many lines as greedy wrapping: check the cheap one
+            too_long = len(candidate) > (max_chars + 1) * max_lines or (
+                len(candidate) > max_chars and len(textwrap.wrap(candidate, max_chars)) > max_lines)
+            if (too_long
+                    or w["end"] - words[0][0] > max_seconds
+                    or w["start"] - words[-1][1] > max_gap):
+                yield cue()
+                words, text = [], ""
+        words.append((w["start"], w["end"], word))
+        text = f"{text} {word}" if text else word
+        if _SENTENCE_END.search(word) and len(text) >= max_chars:
+            yield cue()
+            words, text = [], ""
+    if words:
+        yield cue()
+
+
+# ============================================================
+# SUBTITLES
+# ============================================================
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    """HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (VTT)"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def parse_timestamp(value: str) -> float:
+    """Seconds of an SRT or VTT timestamp (hours optional in VTT)"""
+    parts = value.strip().replace(",", ".").split(":")
+    seconds = float(parts[-1])
+    for i, part in enumerate(reversed(parts[:-1]), 1):
+        seconds += int(part) * 60 ** i
+    return seconds
+
+
+def write_srt(cues: Iterable[Cue], f) -> int:
+    count = 0
+    for count, cue in enumerate(cues, 1):
+        f.write(f"{count}\n{format_timestamp(cue.start)} --> {format_timestamp(cue.end)}\n"
+                + "\n".join(cue.lines) + "\n\n")
+    return count
+
+
+def write_vtt(cues: Iterable[Cue], f) -> int:
+    f.write("WEBVTT\n\n")
+    count = 0
+    for count, cue in enumerate(cues, 1):
+        f.write(f"{format_timestamp(cue.start, '.')} --> {format_timestamp(cue.end, '.')}\n"
+                + "\n".join(cue.lines) + "\n\n")
+    return count
+
+
+def write_tsv(cues: Iterable[Cue], f) -> int:
+    """Integer milliseconds, like openai-whisper's tsv output"""
+    f.write("start\tend\ttext\n")
+    count = 0
+    for count, cue in enumerate(cues, 1):
+        f.write(f"{round(cue.start * 1000)}\t{round(cue.end * 1000)}\t{cue.text}\n")
+    return count
+
+
+def _read_blocks(path) -> Iterator[List[str]]:
+    """Blank-line separated blocks of a text file, read line by line"""
+    block = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.strip():
+                block.append(line)
+            elif block:
+                yield block
+                block = []
+    if block:
+        yield block
+
+
+def read_srt(path) -> Iterator[Cue]:
+    for block in _read_blocks(path):
+        start, end = block[1].split(" --> ")
+        yield Cue(parse_timestamp(start), parse_timestamp(end), block[2:])
+
+
+def read_vtt(path) -> Iterator[Cue]:
+    for block in _read_blocks(path):
+        if block[0].startswith("WEBVTT"):
+            continue
+        timing = next(i for i, line in enumerate(block) if " --> " in line)
+        start, end = block[timing].split(" --> ")
+        yield Cue(parse_timestamp(start), parse_timestamp(end.split()[0]), block[timing + 1:])
+
+
+def read_tsv(path) -> Iterator[Cue]:
+    with open(path, encoding="utf-8") as f:
+        next(f)
+        for line in f:
+            start, end, text = line.rstrip("\n").split("\t", 2)
+            yield Cue(int(start) / 1000, int(end) / 1000, [text])
+
+
+# ============================================================
+# WORD TIMELINE
+# ============================================================
+
+class WordTimelineWriter:
+    """Writes words to a .wtl file as they come, the count is filled in on close()"""
+
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self._file.write(_WTL_HEADER.pack(WTL_MAGIC, 0))
+        self.count = 0
+
+    def write(self, words: Iterable[dict]):
+        for w in words:
+            # Cut on a character boundary, never in the middle of an "é"
+            text = w["word"].encode("utf-8")[:255].decode("utf-8", "ignore").encode("utf-8")
+            start = max(0, round(w["start"] * 1000))
+            duration = min(0xFFFF, max(0, round(w["end"] * 1000) - start))
+            probability = round(min(1.0, max(0.0, w.get("probability", 1.0))) * 255)
+            self._file.write(_WTL_WORD.pack(start, duration, probability, len(text)) + text)
+            self.count += 1
+
+    def close(self):
+        self._file.seek(0)
+        self._file.write(_WTL_HEADER.pack(WTL_MAGIC, self.count))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_word_timeline(path) -> Iterator[dict]:
+    with open(path, "rb") as f:
+        magic, count = _WTL_HEADER.unpack(f.read(_WTL_HEADER.size))
+        if magic != WTL_MAGIC:
+            raise ValueError(f"{path} is not a word timeline file")
+        for _ in range(count):
+            start, duration, probability, length = _WTL_WORD.unpack(f.read(_WTL_WORD.size))
+            yield {"word": f.read(length).decode("utf-8", errors="replace"), "start": start / 1000,
+                   "end": (start + duration) / 1000, "probability": probability / 255}
+
+
+def write_word_parquet(words: Iterable[dict], path, row_group: int = 100_000) -> int:
+    """Writes words in row groups of `row_group`, returns the number of words"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([("start", pa.float64()), ("end", pa.float64()), ("word", pa.string()),
+                        ("probability", pa.float32())])
+    count = 0
+    with pq.ParquetWriter(str(path), schema, compression="zstd") as writer:
+        batch = []
+        for w in words:
+            batch.append(w)
+            if len(batch) == row_group:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch or not count:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+def read_word_parquet(path) -> Iterator[dict]:
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(str(path))
+    for i in range(parquet.num_row_groups):
+        yield from parquet.read_row_group(i).to_pylist()
+
+
+# ============================================================
+# EXPORT
+# ============================================================
+
+def export(result: Segments, path, fmt: Optional[str] = None, **cue_options) -> int:
+    """
+    Writes `result` to `path` in `fmt` (default: the extension of `path`).
+    Returns the number of cues or words written.
+    """
+    fmt = fmt or Path(path).suffix.lstrip(".")
+    if fmt == "wtl":
+        with WordTimelineWriter(path) as writer:
+            writer.write(iter_words(result))
+        return writer.count
+    if fmt == "parquet":
+        return write_word_parquet(iter_words(result), path)
+    writers = {"srt": write_srt, "vtt": write_vtt, "tsv": write_tsv}
+    if fmt not in writers:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {EXPORT_FORMATS}")
+    with open(path, "w", encoding="utf-8") as f:
+        return writers[fmt](split_cues(result, **cue_options), f)
+
+
+def read_export(path, fmt: Optional[str] = None) -> Iterator:
+    """Cues (subtitle formats) or words (word timeline formats) of an export"""
+    fmt = fmt or Path(path).suffix.lstrip(".")
+    readers = {"srt": read_srt, "vtt": read_vtt, "tsv": read_tsv,
+               "wtl": read_word_timeline, "parquet": read_word_parquet}
+    return readers[fmt](path)
@@ -0,0 +1,161 @@
+"""
+Ordered, single-writer output for segment transcripts.
+
+Segments are transcribed on several workers and finish in any order, and each
+worker used to append to the master file itself: segments landed out of order
+and concurrent appends could interleave. TranscriptWriter is the only code
+touching the output files. Workers hand it (segment number, text, record) and
+a writer thread keeps a reorder buffer, so segments are written strictly in
+sequence, to the text transcript and to a JSON Lines file. Writes are flushed
+right away but fsynced in batches (every few segments or seconds).
+
+Every segment number must be put once (an empty text for a segment with
+nothing to write), otherwise the following ones wait until close().
+
+Usage:
+    writer = TranscriptWriter("transcript.txt", "transcript.jsonl")
+    writer.put(2, text, record)   # from any worker, in any order
+    writer.close()
+"""
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class WriterStats:
+    """Counters collected by the writer"""
+    written: int = 0
+    out_of_order: int = 0
+    max_pending: int = 0
+    fsyncs: int = 0
+    gaps: int = 0
+
+    def summary(self) -> str:
+        return (f"{self.written} segments written, {self.out_of_order} arrived early "
+                f"(max {self.max_pending} buffered), {self.fsyncs} fsyncs, {self.gaps} gaps")
+
+
+class TranscriptWriter:
+    """
+    Args:
+        text_path: Text transcript, opened in append mode (the header may already be there)
+        jsonl_path: Optional JSON Lines file, one line per segment with a record
+        first: Number of the first segment
+        fsync_every: fsync after this many segments...
+        fsync_seconds: ...or once the oldest unsynced write is this old
+    """
+
+    def __init__(self, text_path: str, jsonl_path: Optional[str] = None, first: int = 1,
+                 fsync_every: int = 10, fsync_seconds: float = 2.0):
+        self.fsync_every = fsync_every
+        self.fsync_seconds = fsync_seconds
+        self.stats = WriterStats()
+        self._next = first
+        self._pending = {}
+        self._queue = queue.Queue()
+        self._text = open(text_path, "a", encoding="utf-8")
+        self._jsonl = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+        self._unsynced = 0
+        self._dirty_since = None
+        self._tail = ""
+        self._thread = threading.Thread(target=self._run, name="transcript-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, num: int, text: str = "", record: Optional[dict] = None):
+        """Hands a finished segment to the writer (thread-safe, never blocks)"""
+        self._queue.put((num, text, record))
+
+    def close(self, text: str = ""):
+        """
+        Writes what is still buffered (skipping missing segments), then `text`
+        (e.g. the end of a stitched timeline), and closes the files
+        """
+        self._tail = text
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            timeout = None
+            if self._dirty_since is not None:
+                timeout = max(0.0, self._dirty_since + self.fsync_seconds - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._sync()
+                continue
+            if item is None:
+                break
+
+            num, text, record = item
+            if num < self._next or num in self._pending:
+                print(f"⚠️  Segment {num} written twice, ignored")
+                continue
+            if num != self._next:
+                self.stats.out_of_order += 1
+            self._pending[num] = (text, record)
+            self.stats.max_pending = max(self.stats.max_pending, len(self._pending))
+            while self._next in self._pending:
+                self._write(*self._pending.pop(self._next))
+                self._next += 1
+            if self._unsynced >= self.fsync_every or (
+                    self._dirty_since is not None
+                    and time.monotonic() - self._dirty_since >= self.fsync_seconds):
+                self._sync()
+
+        # Segments after a gap (e.g. a worker that never reported) are kept
+        if self._pending:
+            self.stats.gaps += max(self._pending) - self._next + 1 - len(self._pending)
+        for num in sorted(self._pending):
+            self._write(*self._pending[num])
+        self._pending.clear()
+        if self._tail:
+            self._text.write(self._tail)
+            self._unsynced += 1
+        self._sync()
+        self._text.close()
+        if self._jsonl:
+            self._jsonl.close()
+
+    def _write(self, text: str, record: Optional[dict]):
+        if text:
+            self._text.write(text)
+            self._text.flush()
+        if record is not None and self._jsonl:
+            self._jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._jsonl.flush()
+        self.stats.written += 1
+        self._unsynced += 1
+        if self._dirty_since is None:
+            self._dirty_since = time.monotonic()
+
+    def _sync(self):
+        if not self._unsynced:
+            return
+        os.fsync(self._text.fileno())
+        if self._jsonl:
+            os.fsync(self._jsonl.fileno())
+        self.stats.fsyncs += 1
+        self._unsynced = 0
+        self._dirty_since = None
+
+
+def read_records(jsonl_path: str) -> Dict[int, dict]:
+    """Records already written to a JSON Lines file, by segment (the last one wins)"""
+    records = {}
+    if not os.path.exists(jsonl_path):
+        return records
+    with open(jsonl_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn write from a crash
+            if isinstance(record, dict) and "segment" in record:
+                records[record["segment"]] = record
+    return records
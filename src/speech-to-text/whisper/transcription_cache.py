@@ -0,0 +1,220 @@
+"""
+Content-addressed cache of transcription results.
+
+Transcribing the same audio again (re-running a script, reprocessing an archive
+after changing the output format) used to redo the full decode. Results are
+stored as JSON on disk under a key derived from the audio content hash, the
+model and the transcription options, so a second run only costs a hash and a
+file read. The cache is size-bounded: least recently used entries are evicted
+once it grows past its budget.
+
+The cache directory and budget come from $TRANSCRIPTION_CACHE_DIR
+(default ~/.cache/speech-to-text/transcriptions) and $TRANSCRIPTION_CACHE_MB
+(default 512).
+
+Usage:
+    from transcription_cache import get_transcription_cache
+    cache = get_transcription_cache()
+    result = cache.transcribe(lambda audio: model_cache.transcribe("base", audio, language="fr"),
+                              "meeting.mp3", model="mlx/base", language="fr")
+    print(cache.stats.summary())
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_DIR = Path.home() / ".cache" / "speech-to-text" / "transcriptions"
+
+
+def file_hash(path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of the file content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Hashes of files already seen in this process, keyed by (path, size, mtime)
+_file_hashes: Dict[Tuple[str, int, int], str] = {}
+_file_hashes_lock = threading.Lock()
+
+
+def audio_hash(audio) -> str:
+    """Content hash of a file path or a NumPy sample array"""
+    if isinstance(audio, np.ndarray):
+        digest = hashlib.sha256(f"{audio.dtype}{audio.shape}".encode())
+        digest.update(np.ascontiguousarray(audio).data)
+        return digest.hexdigest()
+
+    path = os.path.abspath(os.fspath(audio))
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        if key in _file_hashes:
+            return _file_hashes[key]
+    digest = file_hash(path)
+    with _file_hashes_lock:
+        _file_hashes[key] = digest
+    return digest
+
+
+def _to_json(value):
+    # NumPy scalars and arrays in model outputs
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters of the cache"""
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    saved_seconds: float = 0  # Transcription time of the entries that were hit
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def summary(self) -> str:
+        return (f"cache {self.hits} hits / {self.misses} misses ({self.hit_rate:.0%}), "
+                f"{self.writes} writes, {self.evictions} evicted, "
+                f"{self.saved_seconds:.1f}s of transcription saved")
+
+
+class TranscriptionCache:
+    """
+    Args:
+        directory: Where the JSON entries are stored
+        max_mb: Size budget, least recently used entries are evicted above it
+    """
+
+    def __init__(self, directory=None, max_mb: float = 512):
+        self.directory = Path(directory or DEFAULT_DIR).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._size = None  # Running total of the entry sizes, scanned on the first write
+
+    @staticmethod
+    def key(content_hash: str, model: str, language: Optional[str] = None, **options) -> str:
+        """Cache key of (audio content, model, language, options)"""
+        description = json.dumps({"audio": content_hash, "model": model, "language": language,
+                                  "options": options}, sort_keys=True, default=str)
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        os.utime(path)  # Most recently used
+        with self._lock:
+            self.stats.hits += 1
+            self.stats.saved_seconds += entry.get("seconds", 0)
+        return entry["result"]
+
+    def put(self, key: str, result: dict, seconds: float = 0):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        # Atomic write: a crash never leaves a truncated entry
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"seconds": round(seconds, 3), "result": result}, f,
+                      ensure_ascii=False, default=_to_json)
+        size = os.path.getsize(tmp)
+        with self._lock:
+            replaced = _size_of(path)
+            os.replace(tmp, path)
+            self.stats.writes += 1
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += size - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan_size(self) -> int:
+        return sum(_size_of(p) for p in self.directory.glob("*/*.json"))
+
+    def _evict(self):
+        """Removes the least recently used entries (called under self._lock)"""
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Removed by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+        # Rescanned here anyway: also picks up other processes sharing the directory
+        self._size = sum(size for _, size, _ in entries)
+        # Down to 90% of the budget, so the next writes don't each trigger a scan
+        for _, size, path in sorted(entries):
+            if self._size <= self.max_bytes * 0.9:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+            self.stats.evictions += 1
+
+    def transcribe(self, transcribe: Callable[[object], dict], audio, model: str,
+                   language: Optional[str] = None, **options) -> dict:
+        """
+        Returns the cached result for `audio`, or calls `transcribe(audio)` and
+        caches its result. `model`, `language` and `options` must describe
+        everything that changes the output (backend, model, decoding options).
+        """
+        key = self.key(audio_hash(audio), model, language, **options)
+        result = self.get(key)
+        if result is None:
+            start = time.perf_counter()
+            result = transcribe(audio)
+            self.put(key, result, time.perf_counter() - start)
+        return result
+
+    def clear(self):
+        with self._lock:
+            for path in self.directory.glob("*/*.json"):
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+
+def _size_of(path: Path) -> int:
+    """Size of a file, 0 if it doesn't exist (anymore)"""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+_cache: Optional[TranscriptionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_transcription_cache() -> TranscriptionCache:
+    """Process-wide cache configured from $TRANSCRIPTION_CACHE_DIR and $TRANSCRIPTION_CACHE_MB"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranscriptionCache(os.getenv("TRANSCRIPTION_CACHE_DIR"),
+                                        float(os.getenv("TRANSCRIPTION_CACHE_MB", "512")))
+        return _cache
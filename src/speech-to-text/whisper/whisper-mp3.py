@@ -1,55 +1,30 @@
 """
 Transcribes an audio file in French using the MLX Whisper model and saves the
-result to a text file.
+result to a text file, with SRT subtitles and a word timeline next to it.
 See https://github.com/ml-explore/mlx-examples/tree/main/whisper
 See also https://simonwillison.net/2024/Aug/13/mlx-whisper/
 
 Installation:
 $ brew install ffmpeg
 $ uv add mlx-whisper
+
+Usage:
+$ uv run whisper-mp3.py                        # ~/Downloads/Recording.mp3
+$ uv run whisper-mp3.py ~/Recordings --formats txt,srt   # batch, see batch_transcribe.py
 """
+import sys
 import time
 from pathlib import Path
-import mlx_whisper
-
-# Available MLX Whisper models
-AVAILABLE_MODELS = {
-    "tiny": {
-        "repo": "mlx-community/whisper-tiny-mlx",
-        "speed": "Fastest",
-        "quality": "Basic"
-    },
-    "base": {
-        "repo": "mlx-community/whisper-base-mlx",
-        "speed": "Very Fast",
-        "quality": "Good"
-    },
-    "small": {
-        "repo": "mlx-community/whisper-small-mlx",
-        "speed": "Fast",
-        "quality": "Better"
-    },
-    "medium": {
-        "repo": "mlx-community/whisper-medium-mlx",
-        "speed": "Moderate",
-        "quality": "Very Good"
-    },
-    "large-v3": {
-        "repo": "mlx-community/whisper-large-v3-mlx",
-        "speed": "Slower",
-        "quality": "Excellent"
-    },
-    "large-v3-turbo": {
-        "repo": "mlx-community/whisper-large-v3-turbo",
-        "speed": "Fast",
-        "quality": "Excellent (50% faster than large-v3)"
-    },
-    "distil-large-v3": {
-        "repo": "mlx-community/distil-whisper-large-v3",
-        "speed": "Fast",
-        "quality": "Excellent (30% faster than large-v3)"
-    }
-}
+
+from model_registry import MODELS, get_model_cache
+from transcript_export import export
+from transcription_cache import get_transcription_cache
+
+# With arguments, transcribe files and directories in batch
+if len(sys.argv) > 1:
+    from batch_transcribe import main
+    main()
+    sys.exit(0)
 
 # pip install openai-whisper
 # whisper fichier.mp3 --language fr --output_format txt
@@ -61,11 +36,12 @@ SELECTED_MODEL = "large-v3-turbo"  # Options: tiny, base, small, medium, large-v
 
 start_time = time.time()
 
-model = AVAILABLE_MODELS[SELECTED_MODEL]["repo"]
-print(f"Using model: {SELECTED_MODEL}")
-print(f"  Repository: {model}")
-print(f"  Speed: {AVAILABLE_MODELS[SELECTED_MODEL]['speed']}")
-print(f"  Quality: {AVAILABLE_MODELS[SELECTED_MODEL]['quality']}\n")
+model_cache = get_model_cache()
+transcription_cache = get_transcription_cache()
+print(f"Using model: {SELECTED_MODEL} ({model_cache.backend.name} backend)")
+print(f"  Repository: {MODELS[SELECTED_MODEL]['repo']}")
+print(f"  Speed: {MODELS[SELECTED_MODEL]['speed']}")
+print(f"  Quality: {MODELS[SELECTED_MODEL]['quality']}\n")
 
 downloads_folder = Path.home() / "Downloads"
 audio_file_path = str(downloads_folder / "Recording.mp3")
@@ -74,9 +50,11 @@ txt_file_path = str(downloads_folder / "Transcription.txt")
 print(audio_file_path)
 
 try:
-    result = mlx_whisper.transcribe(
+    # Same file, model and options as a previous run: read from the cache
+    result = transcription_cache.transcribe(
+        lambda audio: model_cache.transcribe(SELECTED_MODEL, audio, language="fr", word_timestamps=True),
         audio_file_path,
-        path_or_hf_repo=model,
+        model=f"{model_cache.backend.name}/{SELECTED_MODEL}",
         language="fr",
         word_timestamps=True
     )
@@ -85,7 +63,11 @@ try:
     with open(txt_file_path, 'w', encoding='utf-8') as f:
         f.write(result['text'])
 
-    print(f"\nTranscription saved to: {txt_file_path}")
+    # Subtitles and word timeline from the word timestamps
+    for extension in ("srt", "wtl"):
+        export(result, str(Path(txt_file_path).with_suffix(f".{extension}")))
+
+    print(f"\nTranscription saved to: {txt_file_path} (+ .srt subtitles, .wtl word timeline)")
 
 except FileNotFoundError:
     print(f"Le fichier {audio_file_path} n'a pas été trouvé.")
@@ -93,4 +75,6 @@ except Exception as e:
     print(f"Une erreur s'est produite lors de la transcription : {e}")
 
 end_time = time.time()
+print(model_cache.summary())
+print(transcription_cache.stats.summary())
 print(f"Execution time: {(end_time - start_time)/60:.1f} minutes")
\ No newline at end of file